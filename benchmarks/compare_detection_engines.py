@@ -0,0 +1,47 @@
+"""
+Compares the accuracy and speed of the silence detection engines on a media file
+
+Usage: python benchmarks/compare_detection_engines.py [input_file] [--silence-level -35] [--silence-time-threshold 0.5]
+"""
+import argparse
+import time
+from pathlib import Path
+
+from unsilence.lib.detect_silence.DetectSilence import detect_silence
+from unsilence.lib.intervals.TimeCalculations import compare_intervals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the pcm detection engine with the silencedetect engine")
+    parser.add_argument("input_file", type=Path, help="Path to the file that contains silence")
+    parser.add_argument("-sl", "--silence-level", type=float, default=-35)
+    parser.add_argument("-stt", "--silence-time-threshold", type=float, default=0.5)
+    args = parser.parse_args()
+
+    detect_options = {
+        "silence_level": args.silence_level,
+        "silence_time_threshold": args.silence_time_threshold
+    }
+
+    results = {}
+    for detection_engine in ["silencedetect", "pcm"]:
+        start_time = time.perf_counter()
+        intervals = detect_silence(args.input_file, detection_engine=detection_engine, **detect_options)
+        results[detection_engine] = (intervals, time.perf_counter() - start_time)
+
+        print(f"{detection_engine:>13}: {len(intervals.intervals)} intervals in "
+              f"{results[detection_engine][1]:.2f} seconds")
+
+    comparison = compare_intervals(results["silencedetect"][0], results["pcm"][0])
+
+    print()
+    print(f"Agreement:          {comparison['agreement'] * 100:.2f}% of the time")
+    print(f"Silent precision:   {comparison['silent_precision'] * 100:.2f}%")
+    print(f"Silent recall:      {comparison['silent_recall'] * 100:.2f}%")
+    print(f"Boundary error:     {comparison['boundary_error']['mean']:.3f} seconds mean, "
+          f"{comparison['boundary_error']['max']:.3f} seconds max")
+    print(f"Speedup:            {results['silencedetect'][1] / results['pcm'][1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Measures how long importing unsilence takes (with python -X importtime) and fails if an import exceeds its budget or
+loads a module it should not need, so regressions of the startup time are noticed
+
+Usage: python benchmarks/import_time.py [--runs 5] [--budget-factor 1.0] [--verbose]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Label, interpreter arguments, budget (in milliseconds, on top of a bare interpreter), modules that must not be
+# imported
+TARGETS = [
+    ("unsilence --version", ["-m", "unsilence", "--version"], 60, ["numpy", "rich"]),
+    ("unsilence --help", ["-m", "unsilence", "--help"], 60, ["numpy", "rich"]),
+    ("import unsilence", ["-c", "import unsilence"], 10, ["numpy", "unsilence.Unsilence"]),
+    ("import unsilence.Unsilence", ["-c", "import unsilence.Unsilence"], 250,
+     ["unsilence.lib.render_media.MediaRenderer", "unsilence.lib.edit_decision_list.EditDecisionList"]),
+]
+
+
+def measure_import_time(arguments: list):
+    """
+    Runs a new interpreter with -X importtime
+    :param arguments: The arguments of the interpreter (e.g. ["-c", "import unsilence"])
+    :return: Tuple of the import time of all top-level imports (in milliseconds) and a dict of the cumulative import
+        times of all imported modules (in milliseconds)
+    """
+    console_output = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True
+    ).stderr
+
+    total_time = 0
+    module_times = {}
+    for line in console_output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        _, cumulative_time, name = line.split("|")
+        if not cumulative_time.strip().isdigit():
+            continue
+
+        module_times[name.strip()] = int(cumulative_time) / 1000
+
+        # Nested imports are indented and already contained in the cumulative time of their parent
+        if not name.startswith("  "):
+            total_time += int(cumulative_time) / 1000
+
+    return total_time, module_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time of unsilence against its budgets")
+    parser.add_argument("-r", "--runs", type=int, default=5, help="Number of runs, the median is compared")
+    parser.add_argument("-bf", "--budget-factor", type=float, default=1.0,
+                        help="Factor all budgets are multiplied with (e.g. for slow machines)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print the slowest modules of every target")
+    args = parser.parse_args()
+
+    baseline = statistics.median(measure_import_time(["-c", "pass"])[0] for _ in range(args.runs))
+    print(f"{'bare interpreter':>30}: {baseline:7.1f} ms")
+
+    failed = False
+    for label, arguments, budget, forbidden_modules in TARGETS:
+        runs = [measure_import_time(arguments) for _ in range(args.runs)]
+        import_time = statistics.median(total_time for total_time, _ in runs) - baseline
+        module_times = runs[-1][1]
+        budget *= args.budget_factor
+
+        problems = [f"imports {module}" for module in forbidden_modules if module in module_times]
+        if import_time > budget:
+            problems.append(f"over the budget of {budget:.0f} ms")
+
+        print(f"{label:>30}: {import_time:7.1f} ms  {'FAILED: ' + ', '.join(problems) if problems else 'ok'}")
+
+        if args.verbose:
+            for module, module_time in sorted(module_times.items(), key=lambda item: -item[1])[:10]:
+                print(f"{'':>32}{module_time:7.1f} ms  {module}")
+
+        failed = failed or len(problems) > 0
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Load test of the job server ("unsilence serve"): submits many jobs and measures the throughput (jobs per hour), the
+queue latency (time from submitting until a worker starts the job) and the turnaround time. The server has to be
+running already, all requests are local
+
+Usage: python benchmarks/job_server_load.py input_file [input_file ...] [--url http://127.0.0.1:8080 | --socket path]
+    [--jobs 20] [--rate 0] [--option render_engine=chunked]
+"""
+import argparse
+import http.client
+import json
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    HTTP connection over a Unix domain socket
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 30):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def request(args, method: str, path: str, body=None):
+    """
+    Sends a request to the job server
+    :param args: The parsed arguments (url or socket)
+    :param method: HTTP method
+    :param path: Path of the endpoint
+    :param body: JSON serializable body or None
+    :return: Tuple of the status code and the decoded response
+    """
+    if args.socket is not None:
+        connection = UnixHTTPConnection(args.socket)
+    else:
+        url = urlparse(args.url)
+        connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+
+    try:
+        connection.request(
+            method,
+            path,
+            body=json.dumps(body) if body is not None else None,
+            headers={"Content-Type": "application/json"}
+        )
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def parse_option(s):
+    """
+    Parses a key=value job option, the value is decoded as JSON if possible (e.g. numbers and booleans)
+    :param s: Input string
+    :return: Tuple of key and value
+    """
+    key, separator, value = s.partition("=")
+    if separator == "":
+        raise ValueError("Options have to be given as key=value")
+
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def percentile(values: list, fraction: float):
+    """
+    Gets a percentile of a list of values (nearest rank)
+    :param values: The values
+    :param fraction: The percentile as a fraction (e.g. 0.95)
+    :return: The percentile
+    """
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(fraction * len(values)) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure jobs per hour and queue latency of the unsilence job server")
+    parser.add_argument("input_files", type=Path, nargs="+", help="Files the jobs process (used round-robin)")
+    parser.add_argument("-u", "--url", type=str, default="http://127.0.0.1:8080", help="URL of the job server")
+    parser.add_argument("-s", "--socket", type=str, default=None,
+                        help="Unix domain socket of the job server (instead of --url)")
+    parser.add_argument("-j", "--jobs", type=int, default=20, help="Number of jobs that are submitted")
+    parser.add_argument("-r", "--rate", type=float, default=0,
+                        help="Jobs submitted per minute (0 submits all jobs at once)")
+    parser.add_argument("-o", "--option", type=parse_option, action="append", default=[],
+                        help="Option of every job as key=value (e.g. render_engine=chunked), can be repeated")
+    parser.add_argument("-od", "--output-dir", type=Path, default=None,
+                        help="Directory for the output files (default: a temporary directory)")
+    args = parser.parse_args()
+
+    output_dir = args.output_dir or Path(tempfile.mkdtemp(prefix="unsilence-load-"))
+    options = dict(args.option)
+
+    job_ids = []
+    for i in range(args.jobs):
+        input_file = args.input_files[i % len(args.input_files)].absolute()
+        status, job = request(args, "POST", "/jobs", {
+            "input_file": str(input_file),
+            "output_file": str(output_dir.absolute() / f"{input_file.stem}_{i}{input_file.suffix}"),
+            "options": options
+        })
+
+        if status != 201:
+            print(f"Submitting job {i} failed: {job.get('error', status)}")
+            sys.exit(1)
+
+        job_ids.append(job["id"])
+
+        if args.rate > 0 and i < args.jobs - 1:
+            time.sleep(60 / args.rate)
+
+    print(f"Submitted {len(job_ids)} jobs, waiting for them to finish...")
+
+    jobs = {}
+    while len(jobs) < len(job_ids):
+        for job_id in job_ids:
+            if job_id not in jobs:
+                _, job = request(args, "GET", f"/jobs/{job_id}")
+                if job["state"] in ["completed", "failed", "cancelled"]:
+                    jobs[job_id] = job
+
+        if len(jobs) < len(job_ids):
+            time.sleep(0.5)
+
+    completed_jobs = [job for job in jobs.values() if job["state"] == "completed"]
+    failed_jobs = [job for job in jobs.values() if job["state"] != "completed"]
+    started_jobs = [job for job in jobs.values() if job["started_at"] is not None]
+
+    duration = max(job["finished_at"] for job in jobs.values()) - min(job["created_at"] for job in jobs.values())
+    queue_latencies = [job["queue_latency"] for job in started_jobs]
+    turnaround_times = [job["finished_at"] - job["created_at"] for job in completed_jobs]
+
+    print()
+    print(f"Completed:          {len(completed_jobs)} of {len(jobs)} jobs in {duration:.1f} seconds")
+    print(f"Throughput:         {len(completed_jobs) / max(duration, 1e-9) * 3600:.1f} jobs per hour")
+
+    if len(queue_latencies) > 0:
+        print(f"Queue latency:      median {statistics.median(queue_latencies):.2f} s, "
+              f"p95 {percentile(queue_latencies, 0.95):.2f} s, max {max(queue_latencies):.2f} s")
+
+    if len(turnaround_times) > 0:
+        print(f"Turnaround time:    median {statistics.median(turnaround_times):.2f} s, "
+              f"p95 {percentile(turnaround_times, 0.95):.2f} s, max {max(turnaround_times):.2f} s")
+
+    for job in failed_jobs:
+        print(f"Job {job['id']} {job['state']}: {job['error']}")
+
+    sys.exit(1 if len(failed_jobs) > 0 else 0)
+
+
+if __name__ == "__main__":
+    main()
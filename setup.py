@@ -1,3 +1,5 @@
+import re
+
 import setuptools
 
 with open("README.md", "r") as f:
@@ -6,9 +8,12 @@ with open("README.md", "r") as f:
 with open('requirements.txt') as f:
     requirements = f.read().splitlines()
 
+with open('unsilence/__init__.py') as f:
+    version = re.search(r'^__version__ = "(.+)"$', f.read(), re.MULTILINE)[1]
+
 setuptools.setup(
     name='unsilence',
-    version='1.0.9',
+    version=version,
     install_requires=requirements,
     license='MIT License',
     author='Tim-Luca Lagmöller',
@@ -2,10 +2,11 @@ import atexit
 import shutil
 from pathlib import Path
 
-from unsilence.lib.detect_silence.DetectSilence import detect_silence
+from unsilence.lib.detect_silence.DetectSilence import detect_silence, detect_silence_stream
+from unsilence.lib.detect_silence.DetectionCache import DetectionCache
 from unsilence.lib.intervals.Intervals import Intervals
 from unsilence.lib.intervals.TimeCalculations import calculate_time
-from unsilence.lib.render_media.MediaRenderer import MediaRenderer
+from unsilence.lib.tools.cache_dir import resolve_cache_dir
 from unsilence.lib.tools.ffmpeg_version import is_ffmpeg_usable
 import sys
 
@@ -15,17 +16,37 @@ class Unsilence:
     Unsilence Class to remove (or isolate or many other use cases) silence from audible video parts
     """
 
-    def __init__(self, input_file: Path, temp_dir: Path = Path(".tmp")):
+    def __init__(self, input_file: Path, temp_dir: Path = Path(".tmp"), cache_dir: Path = None):
         """
         :param input_file: The file that should be processed
         :type input_file: Path
         :param temp_dir: The temp dir where temporary files can be saved
         :type temp_dir: Path
+        :param cache_dir: The dir where data that can be reused by later runs is persisted (default None: the directory
+            of lib.tools.cache_dir.get_cache_dir(), False disables caching)
+        :type cache_dir: Path
         """
         self.__input_file = Path(input_file)
         self.__temp_dir = Path(temp_dir)
+        self.__cache_dir = resolve_cache_dir(cache_dir)
+        self.__detection_cache = None
+        if self.__cache_dir is not None:
+            self.__detection_cache = DetectionCache(self.__cache_dir / "intervals")
         self.__intervals: Intervals = None
 
+        Unsilence.check_ffmpeg()
+
+        atexit.register(self.cleanup)
+
+    @staticmethod
+    def check_ffmpeg():
+        """
+        Checks whether a supported ffmpeg version is available
+
+        :raises: **EnvironmentError** -- If ffmpeg was not found or its version is not supported
+
+        :return: None
+        """
         ffmpeg_status = is_ffmpeg_usable()
         if ffmpeg_status == "not_detected":
             raise EnvironmentError("ffmpeg not found!")
@@ -35,20 +56,52 @@ class Unsilence:
             print("Could not detect ffmpeg version, proceed at your own risk! (version >= 4.2.4 required)",
                   file=sys.stderr)
 
-        atexit.register(self.cleanup)
-
-    def detect_silence(self, **kwargs):
+    def detect_silence(self, use_cache: bool = True, **kwargs):
         """
-        Detects silence of the file (Options can be specified in kwargs)
+        Detects silence of the file (Options can be specified in kwargs). If silence was already detected in the same
+        file with the same options, the cached Intervals are used instead
 
+        :param use_cache: Whether cached Intervals may be used
+        :type use_cache: bool
         :param `\**kwargs`: Remaining keyword arguments are passed to :func:`~unsilence.lib.detect_silence.DetectSilence.detect_silence`
 
         :return: A generated Intervals object
         :rtype: ~unsilence.lib.intervals.Intervals.Intervals
         """
+        if self.__detection_cache is not None and use_cache:
+            intervals = self.__detection_cache.load(self.__input_file, kwargs)
+
+            if intervals is not None:
+                on_silence_detect_progress_update = kwargs.get("on_silence_detect_progress_update", None)
+                if on_silence_detect_progress_update is not None:
+                    on_silence_detect_progress_update(1, 1)
+
+                self.__intervals = intervals
+                return self.__intervals
+
+        if self.__cache_dir is not None:
+            kwargs.setdefault("envelope_cache_dir", self.__cache_dir / "envelopes")
+            kwargs.setdefault("media_index_cache_dir", self.__cache_dir / "media_index")
+
         self.__intervals = detect_silence(self.__input_file, **kwargs)
+
+        if self.__detection_cache is not None:
+            self.__detection_cache.save(self.__input_file, kwargs, self.__intervals)
+
         return self.__intervals
 
+    def get_cache_statistics(self):
+        """
+        Get the hit/miss statistics of the detection cache
+
+        :return: Statistics dict (hits, misses, size, max_size) or None if caching is disabled
+        :rtype: dict
+        """
+        if self.__detection_cache is None:
+            return None
+
+        return self.__detection_cache.get_statistics()
+
     def set_intervals(self, intervals: Intervals):
         """
         Set the intervals so that they do not need to be re-detected
@@ -101,9 +154,225 @@ class Unsilence:
         if self.__intervals is None:
             raise ValueError("Silence detection was not yet run and no intervals where given manually!")
 
+        if self.__cache_dir is not None:
+            kwargs.setdefault("media_index_cache_dir", self.__cache_dir / "media_index")
+            kwargs.setdefault("segment_cache_dir", self.__cache_dir / "segments")
+
+        # The render stack is only imported when it is used, so detecting silence starts faster
+        from unsilence.lib.render_media.MediaRenderer import MediaRenderer
+
         renderer = MediaRenderer(self.__temp_dir)
         renderer.render(self.__input_file, output_file, self.__intervals, **kwargs)
 
+    def export_edit_decision_list(self, output_file: Path, **kwargs):
+        """
+        Exports the current intervals with their speeds and volumes as an edit decision list (CMX3600 EDL, FCPXML or
+        MLT XML, chosen by the file extension) and an ffconcat script with the same cuts, nothing is rendered
+
+        :param output_file: Where the edit decision list should be saved at
+        :type output_file: Path
+        :param `\**kwargs`: Remaining keyword arguments are passed to :func:`~unsilence.lib.edit_decision_list.EditDecisionList.export_edit_decision_list`
+
+        :raises: **ValueError** -- If silence detection was never run
+
+        :return: None
+        """
+        if self.__intervals is None:
+            raise ValueError("Silence detection was not yet run and no intervals where given manually!")
+
+        if self.__cache_dir is not None:
+            kwargs.setdefault("media_index_cache_dir", self.__cache_dir / "media_index")
+
+        from unsilence.lib.edit_decision_list.EditDecisionList import export_edit_decision_list
+
+        export_edit_decision_list(self.__input_file, Path(output_file), self.__intervals, **kwargs)
+
+    def get_time_mapping(self, **kwargs):
+        """
+        Get the mapping between the timestamps of the input and the output that the current intervals are rendered to
+
+        :param `\**kwargs`: The render options, see :func:`~unsilence.lib.render_media.MediaRenderer.MediaRenderer.render`
+
+        :raises: **ValueError** -- If silence detection was never run
+
+        :return: Mapping of input to output timestamps and back
+        :rtype: ~unsilence.lib.render_media.TimeMapping.TimeMapping
+        """
+        if self.__intervals is None:
+            raise ValueError("Silence detection was not yet run and no intervals where given manually!")
+
+        from unsilence.lib.render_media.TimeMapping import TimeMapping
+
+        return TimeMapping.from_intervals(self.__intervals, **kwargs)
+
+    def remap_timestamps(self, input_file: Path, output_file: Path, **kwargs):
+        """
+        Rewrites the timestamps of a subtitle (SRT, WebVTT) or chapter (ffmetadata) file of the input, so they match
+        the output that the current intervals are rendered to
+
+        :param input_file: The subtitle or chapter file of the input
+        :type input_file: Path
+        :param output_file: Where the remapped file should be saved at
+        :type output_file: Path
+        :param `\**kwargs`: The render options, see :func:`~unsilence.lib.render_media.MediaRenderer.MediaRenderer.render`
+
+        :return: None
+        """
+        from unsilence.lib.render_media.RemapTimestamps import remap_subtitle_file
+
+        remap_subtitle_file(Path(input_file), Path(output_file), self.get_time_mapping(**kwargs))
+
+    def detect_silence_and_render_media(self, output_file: Path, detect_options: dict = None, use_cache: bool = True,
+                                        **kwargs):
+        """
+        Detects silence and renders the intervals at the same time, every interval is rendered as soon as the
+        detection finalized it. If the Intervals of the file are already cached, they are rendered with
+        :func:`render_media` instead
+
+        :param output_file: Where the final file should be saved at
+        :type output_file: Path
+        :param detect_options: Keyword arguments that are passed to :func:`~unsilence.lib.detect_silence.DetectSilence.detect_silence_stream`
+        :type detect_options: dict
+        :param use_cache: Whether cached Intervals may be used
+        :type use_cache: bool
+        :param `\**kwargs`: Remaining keyword arguments are passed to :func:`~unsilence.lib.render_media.MediaRenderer.MediaRenderer.render_stream`
+
+        :return: The detected Intervals object
+        :rtype: ~unsilence.lib.intervals.Intervals.Intervals
+        """
+        if detect_options is None:
+            detect_options = {}
+
+        if self.__detection_cache is not None and use_cache:
+            intervals = self.__detection_cache.load(self.__input_file, detect_options)
+
+            if intervals is not None:
+                self.__intervals = intervals
+                self.render_media(output_file, **kwargs)
+                return self.__intervals
+
+        if self.__cache_dir is not None:
+            kwargs.setdefault("media_index_cache_dir", self.__cache_dir / "media_index")
+            kwargs.setdefault("segment_cache_dir", self.__cache_dir / "segments")
+
+        intervals = Intervals()
+
+        def interval_iterator():
+            for interval in detect_silence_stream(self.__input_file, **detect_options):
+                intervals.add_interval(interval)
+                yield interval.copy()
+
+        from unsilence.lib.render_media.MediaRenderer import MediaRenderer
+
+        renderer = MediaRenderer(self.__temp_dir)
+        renderer.render_stream(self.__input_file, Path(output_file), interval_iterator(), **kwargs)
+
+        self.__intervals = intervals
+
+        if self.__detection_cache is not None:
+            self.__detection_cache.save(self.__input_file, detect_options, self.__intervals)
+
+        return self.__intervals
+
+    def detect_silence_async(self, use_cache: bool = True, **kwargs):
+        """
+        Detects silence like :func:`detect_silence`, but without blocking the event loop: the ffmpeg processes are
+        started with asyncio and count towards the process limit of the event loop (see
+        :func:`~unsilence.lib.asynchronous.AsyncProcess.set_process_limit`). Has to be called from a running event
+        loop, only the silencedetect engine is supported
+
+        :param use_cache: Whether cached Intervals may be used
+        :type use_cache: bool
+        :param `\**kwargs`: Remaining keyword arguments are passed to :func:`~unsilence.lib.asynchronous.AsyncDetectSilence.detect_silence_async`
+
+        :return: Job that can be awaited for the Intervals, iterated (async for) for its progress updates (stage
+            "detect") and cancelled, which kills its ffmpeg processes
+        :rtype: ~unsilence.lib.asynchronous.ProgressJob.ProgressJob
+        """
+        from unsilence.lib.asynchronous.AsyncDetectSilence import detect_silence_async
+        from unsilence.lib.asynchronous.ProgressJob import ProgressJob
+
+        on_silence_detect_progress_update = kwargs.pop("on_silence_detect_progress_update", None)
+
+        async def detect(report):
+            def update_progress(current, total):
+                report("detect", current, total)
+                if on_silence_detect_progress_update is not None:
+                    on_silence_detect_progress_update(current, total)
+
+            if self.__detection_cache is not None and use_cache:
+                intervals = self.__detection_cache.load(self.__input_file, kwargs)
+
+                if intervals is not None:
+                    update_progress(1, 1)
+                    self.__intervals = intervals
+                    return self.__intervals
+
+            if self.__cache_dir is not None:
+                kwargs.setdefault("media_index_cache_dir", self.__cache_dir / "media_index")
+
+            intervals = await detect_silence_async(
+                self.__input_file,
+                on_silence_detect_progress_update=update_progress,
+                **kwargs
+            )
+            self.__intervals = intervals
+
+            if self.__detection_cache is not None:
+                self.__detection_cache.save(self.__input_file, kwargs, self.__intervals)
+
+            return self.__intervals
+
+        return ProgressJob(detect)
+
+    def render_media_async(self, output_file: Path, **kwargs):
+        """
+        Renders the current intervals like :func:`render_media`, but without blocking the event loop (see
+        :func:`detect_silence_async`). Only the filtergraph (default) and chunked render engines are supported
+
+        :param output_file: Where the final file should be saved at
+        :type output_file: Path
+        :param `\**kwargs`: Remaining keyword arguments are passed to :func:`~unsilence.lib.asynchronous.AsyncRender.render_media_async`
+
+        :raises: **ValueError** -- If silence detection was never run
+
+        :return: Job that can be awaited, iterated (async for) for its progress updates (stages "render" and
+            "concat") and cancelled, which kills its ffmpeg processes and removes the temporary files
+        :rtype: ~unsilence.lib.asynchronous.ProgressJob.ProgressJob
+        """
+        from unsilence.lib.asynchronous.AsyncRender import render_media_async
+        from unsilence.lib.asynchronous.ProgressJob import ProgressJob
+
+        if self.__intervals is None:
+            raise ValueError("Silence detection was not yet run and no intervals where given manually!")
+
+        intervals = self.__intervals
+        progress_handlers = {
+            "render": kwargs.pop("on_render_progress_update", None),
+            "concat": kwargs.pop("on_concat_progress_update", None)
+        }
+
+        async def render(report):
+            def update_progress(stage):
+                def handler(current, total):
+                    report(stage, current, total)
+                    if progress_handlers[stage] is not None:
+                        progress_handlers[stage](current, total)
+
+                return handler
+
+            await render_media_async(
+                self.__input_file,
+                Path(output_file),
+                intervals,
+                self.__temp_dir,
+                on_render_progress_update=update_progress("render"),
+                on_concat_progress_update=update_progress("concat"),
+                **kwargs
+            )
+
+        return ProgressJob(render)
+
     def cleanup(self):
         """
         Cleans up the temporary directories, called automatically when the program ends
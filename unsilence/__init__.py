@@ -1,3 +1,43 @@
-from unsilence.Unsilence import Unsilence
-from unsilence.lib.intervals.Interval import Interval
-from unsilence.lib.intervals.Intervals import Intervals
+import importlib
+import sys
+import types
+
+__version__ = "1.0.9"
+
+# The public classes are imported on first access, so importing a submodule (e.g. the command line) stays fast
+LAZY_ATTRIBUTES = {
+    "Unsilence": "unsilence.Unsilence",
+    "Interval": "unsilence.lib.intervals.Interval",
+    "Intervals": "unsilence.lib.intervals.Intervals",
+}
+
+__all__ = ["Unsilence", "Interval", "Intervals"]
+
+
+class UnsilenceModule(types.ModuleType):
+    """
+    Module type of the package: importing the submodule unsilence.Unsilence binds the submodule to the package, the
+    class of the same name is bound instead, like an eager "from unsilence.Unsilence import Unsilence" did
+    """
+
+    def __setattr__(self, name, value):
+        if name in LAZY_ATTRIBUTES and isinstance(value, types.ModuleType):
+            value = getattr(value, name)
+
+        super().__setattr__(name, value)
+
+
+def __getattr__(name):
+    if name not in LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(__all__))
+
+
+sys.modules[__name__].__class__ = UnsilenceModule
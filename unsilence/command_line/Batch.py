@@ -0,0 +1,213 @@
+import glob
+import sys
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+from unsilence.command_line.ParseArguments import parse_batch_arguments
+
+
+def run_batch(argv: list = None):
+    """
+    Run the batch mode ("unsilence batch") of the Console Interface for Unsilence
+    :param argv: The arguments after "batch" (default: sys.argv)
+    :return: None
+    """
+    args = parse_batch_arguments(argv)
+
+    # Everything else is imported after the arguments are parsed, so --help returns immediately
+    from rich.console import Console
+    from rich.progress import Progress
+
+    from unsilence.command_line.EntryPoint import get_render_arguments, get_silence_detect_arguments
+    from unsilence.command_line.PrettyTimeEstimate import format_timedelta
+    from unsilence.lib.batch.BatchProcessor import BatchProcessor
+
+    console = Console()
+
+    if args.debug:
+        sys.tracebacklimit = 1000
+
+    collected_jobs = collect_jobs(args)
+
+    conflicts = find_output_conflicts(collected_jobs)
+    if len(conflicts) > 0:
+        for output_file, input_files in conflicts.items():
+            console.print(f"[red]{output_file} would be written by more than one file or overwrite an input:[/red] "
+                          f"{', '.join(str(input_file) for input_file in input_files)}")
+        console.print("[red]Choose output files in the manifest or a different --output-dir or --output-suffix[/red]")
+        sys.exit(2)
+
+    jobs = []
+    for input_file, output_file in collected_jobs:
+        if output_file.exists() and not args.overwrite:
+            console.print(f"[yellow]Skipping {input_file}, {output_file} already exists (use --overwrite)[/yellow]")
+        else:
+            jobs.append((input_file, output_file))
+
+    if len(jobs) == 0:
+        console.print("[yellow]No files to process[/yellow]")
+        return
+
+    progress = Progress()
+
+    with progress:
+        file_tasks = [progress.add_task(f"{input_file.name}: waiting", total=1) for input_file, _ in jobs]
+        total_task = progress.add_task("Total", total=len(jobs))
+
+        # The files are weighted equally in the total, every file is one unit split between its stages
+        stage_weights = {"detect": 0.2, "render": 0.75, "concat": 0.05}
+        stage_offsets = {"detect": 0, "render": 0.2, "concat": 0.95}
+        file_progress = [0] * len(jobs)
+
+        def update_job(job_id, stage, current, total):
+            """
+            Nested function that shows the progress of a file and the combined progress of all files
+            :param job_id: ID of the job (index in jobs)
+            :param stage: Name of the stage of the job
+            :param current: Current progress of the stage
+            :param total: Total progress of the stage
+            :return: None
+            """
+            fraction = min(current / total, 1) if total else 0
+            file_progress[job_id] = stage_offsets[stage] + stage_weights[stage] * fraction
+
+            progress.update(file_tasks[job_id], description=f"{jobs[job_id][0].name}: {stage}",
+                            total=1, completed=file_progress[job_id])
+            progress.update(total_task, completed=sum(file_progress))
+
+        def complete_job(result):
+            """
+            Nested function that marks a file as finished or failed
+            :param result: The result of the job, see lib.batch.BatchProcessor.BatchProcessor.process
+            :return: None
+            """
+            file_progress[result.job_id] = 1
+            state = "done" if result.error is None else "[red]failed[/red]"
+
+            progress.update(file_tasks[result.job_id], description=f"{result.input_file.name}: {state}",
+                            total=1, completed=1)
+            progress.update(total_task, completed=sum(file_progress))
+
+        start_time = datetime.today()
+
+        results = BatchProcessor(threads=args.threads).process(
+            jobs,
+            detect_options=get_silence_detect_arguments(args),
+            render_options=get_render_arguments(args),
+            on_progress_update=update_job,
+            on_job_completed=complete_job
+        )
+
+    failed_results = [result for result in results if result.error is not None]
+
+    for result in failed_results:
+        console.print(f"[red]Failed to process {result.input_file}:[/red] {result.error}")
+
+        if args.debug:
+            console.print("".join(traceback.format_exception(type(result.error), result.error,
+                                                             result.error.__traceback__)), markup=False)
+
+    time_passed_str = format_timedelta((datetime.today() - start_time).seconds)
+    console.print(f"\n[green]Processed {len(results) - len(failed_results)} of {len(results)} files in "
+                  f"{time_passed_str}![/green]")
+    print()
+
+    if len(failed_results) > 0:
+        sys.exit(1)
+
+
+def collect_jobs(args):
+    """
+    Expands the glob patterns and the manifest of the batch arguments into the files that should be processed
+    :param args: The parsed batch arguments
+    :return: List of (input_file, output_file) tuples, without duplicate input files
+    """
+    jobs = {}
+
+    for pattern in args.input_files:
+        # A file that does not exist is kept, so it is reported as failed instead of being skipped silently
+        if glob.has_magic(pattern):
+            matches = [Path(match) for match in sorted(glob.glob(pattern, recursive=True)) if Path(match).is_file()]
+            base_dir = get_glob_base_dir(pattern)
+        else:
+            matches = [Path(pattern)]
+            base_dir = None
+
+        for input_file in matches:
+            jobs.setdefault(input_file.absolute(), get_output_file(input_file, args, base_dir))
+
+    if args.manifest is not None:
+        with open(args.manifest, encoding="utf-8") as file:
+            for line in file:
+                line = line.rstrip("\r\n")
+                if line.strip() == "" or line.lstrip().startswith("#"):
+                    continue
+
+                columns = line.split("\t")
+                input_file = args.manifest.parent / columns[0].strip()
+
+                if len(columns) > 1 and columns[1].strip() != "":
+                    output_file = args.manifest.parent / columns[1].strip()
+                else:
+                    output_file = get_output_file(input_file, args, args.manifest.parent)
+
+                jobs.setdefault(input_file.absolute(), output_file)
+
+    return [(input_file, output_file) for input_file, output_file in jobs.items()]
+
+
+def get_output_file(input_file: Path, args, base_dir: Path = None):
+    """
+    Names the output file of an input file, in --output-dir the directories of the input below base_dir are kept, so
+    files with the same name in different directories do not collide
+    :param input_file: The input file
+    :param args: The parsed batch arguments
+    :param base_dir: The directory the input file was found in (e.g. the start of a glob pattern or the directory of
+        the manifest), None places the output directly in --output-dir
+    :return: Path of the output file
+    """
+    output_dir = input_file.parent
+    if args.output_dir is not None:
+        output_dir = args.output_dir
+        if base_dir is not None:
+            try:
+                output_dir = output_dir / input_file.absolute().parent.relative_to(Path(base_dir).absolute())
+            except ValueError:
+                pass
+
+    return output_dir / f"{input_file.stem}{args.output_suffix}{input_file.suffix}"
+
+
+def get_glob_base_dir(pattern: str):
+    """
+    Gets the directory a glob pattern starts in, the part of the pattern before the first wildcard
+    :param pattern: The glob pattern
+    :return: Path of the directory
+    """
+    base_dir = Path()
+    for part in Path(pattern).parts[:-1]:
+        if glob.has_magic(part):
+            break
+        base_dir = base_dir / part
+
+    return base_dir
+
+
+def find_output_conflicts(jobs: list):
+    """
+    Finds output files that more than one job would write or that are the input of a job, the jobs run at the same
+    time and would overwrite each other
+    :param jobs: List of (input_file, output_file) tuples
+    :return: dict of every conflicting output file to the input files involved
+    """
+    input_files = {input_file.absolute() for input_file, _ in jobs}
+    writers = {}
+
+    for input_file, output_file in jobs:
+        writers.setdefault(output_file.absolute(), []).append(input_file)
+
+    return {
+        output_file: writing_input_files for output_file, writing_input_files in writers.items()
+        if len(writing_input_files) > 1 or output_file in input_files
+    }
@@ -1,13 +1,7 @@
 from datetime import datetime
 import sys
 
-from rich.console import Console
-from rich.progress import Progress
-
-from unsilence.Unsilence import Unsilence
-from unsilence.command_line.ChoiceDialog import choice_dialog
 from unsilence.command_line.ParseArguments import parse_arguments
-from unsilence.command_line.PrettyTimeEstimate import format_timedelta, pretty_time_estimate
 from unsilence.command_line.TerminalSupport import repair_console
 
 
@@ -33,7 +27,29 @@ def run():
     """
     sys.tracebacklimit = 0
 
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from unsilence.command_line.Batch import run_batch
+
+        run_batch(sys.argv[2:])
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from unsilence.command_line.Serve import run_serve
+
+        run_serve(sys.argv[2:])
+        return
+
     args = parse_arguments()
+
+    # Everything else is imported after the arguments are parsed, so --help and --version return immediately
+    from rich.console import Console
+    from rich.progress import Progress
+
+    from unsilence.Unsilence import Unsilence
+    from unsilence.command_line.ChoiceDialog import choice_dialog
+    from unsilence.command_line.PrettyTimeEstimate import format_timedelta, pretty_time_estimate
+    from unsilence.lib.edit_decision_list.EditDecisionList import EDIT_DECISION_LIST_FORMATS
+
     console = Console()
 
     if args.debug:
@@ -43,24 +59,18 @@ def run():
         if not choice_dialog(console, "File already exists. Overwrite?", default=False):
             return
 
-    args_dict = vars(args)
-
-    argument_list_for_silence_detect = [
-        "silence_level", "silence_time_threshold", "short_interval_threshold", "stretch_time"
-    ]
+    argument_dict_for_silence_detect = get_silence_detect_arguments(args)
+    argument_dict_for_renderer = get_render_arguments(args)
 
-    argument_dict_for_silence_detect = {
-        key: args_dict[key] for key in argument_list_for_silence_detect if key in args_dict.keys()
-    }
-
-    argument_list_for_renderer = [
-        "audio_only", "audible_speed", "silent_speed", "audible_volume", "silent_volume",
-        "drop_corrupted_intervals", "threads", "check_intervals", "minimum_interval_duration"
-    ]
-
-    argument_dict_for_renderer = {
-        key: args_dict[key] for key in argument_list_for_renderer if key in args_dict.keys()
-    }
+    def remap_timestamps():
+        """
+        Nested function that rewrites the subtitle and chapter files for the output
+        :return: None
+        """
+        for timestamp_file in args.remap_timestamps:
+            remapped_file = args.output_file.with_name(f"{args.output_file.stem}{timestamp_file.suffix}")
+            continual.remap_timestamps(timestamp_file, remapped_file, **argument_dict_for_renderer)
+            console.print(f"[green]Remapped the timestamps of {timestamp_file.name} to {remapped_file}[/green]")
 
     progress = Progress()
 
@@ -77,39 +87,119 @@ def run():
 
         start_time = datetime.today()
 
-        continual.detect_silence(
-            on_silence_detect_progress_update=update_task(silence_detect_task),
-            **argument_dict_for_silence_detect
-        )
-
-        progress.stop()
-        progress.remove_task(silence_detect_task)
-
-        print()
-
-        estimated_time = continual.estimate_time(args.audible_speed, args.silent_speed)
-        console.print(pretty_time_estimate(estimated_time))
+        if args.pipeline:
+            rendering_task = progress.add_task("Rendering Intervals...", total=1)
+            concat_task = progress.add_task("Combining Intervals...", total=1)
+
+            continual.detect_silence_and_render_media(
+                args.output_file,
+                detect_options=dict(
+                    on_silence_detect_progress_update=update_task(silence_detect_task),
+                    **argument_dict_for_silence_detect
+                ),
+                on_render_progress_update=update_task(rendering_task),
+                on_concat_progress_update=update_task(concat_task),
+                **argument_dict_for_renderer
+            )
+
+            progress.stop()
+        else:
+            continual.detect_silence(
+                on_silence_detect_progress_update=update_task(silence_detect_task),
+                **argument_dict_for_silence_detect
+            )
+
+            progress.stop()
+            progress.remove_task(silence_detect_task)
+
+            cache_statistics = continual.get_cache_statistics()
+            if cache_statistics is not None and cache_statistics["hits"] > 0:
+                console.print("[cyan]Reused the intervals of a previous run with the same options[/cyan]")
+
+            print()
+
+            estimated_time = continual.estimate_time(args.audible_speed, args.silent_speed)
+            console.print(pretty_time_estimate(estimated_time))
+
+            print()
+
+            if args.output_file.suffix.lower() in EDIT_DECISION_LIST_FORMATS:
+                continual.export_edit_decision_list(args.output_file, **argument_dict_for_renderer)
+                console.print(f"[green]Exported the edit decision list to {args.output_file}[/green]")
+                remap_timestamps()
+                return
 
-        print()
+            if not args.non_interactive_mode:
+                if not choice_dialog(console, "Continue with these options?", default=True):
+                    return
 
-        if not args.non_interactive_mode:
-            if not choice_dialog(console, "Continue with these options?", default=True):
-                return
+            progress.start()
+            rendering_task = progress.add_task("Rendering Intervals...", total=1)
+            concat_task = progress.add_task("Combining Intervals...", total=1)
 
-        progress.start()
-        rendering_task = progress.add_task("Rendering Intervals...", total=1)
-        concat_task = progress.add_task("Combining Intervals...", total=1)
+            continual.render_media(
+                args.output_file,
+                on_render_progress_update=update_task(rendering_task),
+                on_concat_progress_update=update_task(concat_task),
+                **argument_dict_for_renderer
+            )
 
-        continual.render_media(
-            args.output_file,
-            on_render_progress_update=update_task(rendering_task),
-            on_concat_progress_update=update_task(concat_task),
-            **argument_dict_for_renderer
-        )
+            progress.stop()
 
-        progress.stop()
+    remap_timestamps()
 
     time_passed = datetime.today() - start_time
     time_passed_str = format_timedelta(time_passed.seconds)
     console.print(f"\n[green]Finished in {time_passed_str}![/green] :tada:")
     print()
+
+
+def get_silence_detect_arguments(args):
+    """
+    Collects the keyword arguments for the silence detection from the console arguments
+    :param args: The parsed console arguments
+    :return: dict of keyword arguments, see lib.detect_silence.DetectSilence.detect_silence
+    """
+    from unsilence.lib.tools.cpu_count import get_available_cpu_count
+
+    args_dict = vars(args)
+
+    argument_list_for_silence_detect = [
+        "silence_level", "silence_time_threshold", "short_interval_threshold", "stretch_time", "detection_engine",
+        "threads"
+    ]
+
+    argument_dict_for_silence_detect = {
+        key: args_dict[key] for key in argument_list_for_silence_detect if key in args_dict.keys()
+    }
+
+    if argument_dict_for_silence_detect.get("threads", None) is None:
+        argument_dict_for_silence_detect["threads"] = get_available_cpu_count()
+
+    return argument_dict_for_silence_detect
+
+
+def get_render_arguments(args):
+    """
+    Collects the keyword arguments for the renderer from the console arguments
+    :param args: The parsed console arguments
+    :return: dict of keyword arguments, see lib.render_media.MediaRenderer.MediaRenderer.render
+    """
+    args_dict = vars(args)
+
+    argument_list_for_renderer = [
+        "audio_only", "audible_speed", "silent_speed", "audible_volume", "silent_volume",
+        "drop_corrupted_intervals", "threads", "check_intervals", "minimum_interval_duration", "render_engine",
+        "chunk_count", "smart_cut", "max_pending_segments"
+    ]
+
+    argument_dict_for_renderer = {
+        key: args_dict[key] for key in argument_list_for_renderer if key in args_dict.keys()
+    }
+
+    if args.segment_cache_size == 0:
+        argument_dict_for_renderer["segment_cache_dir"] = None
+    else:
+        argument_dict_for_renderer["segment_cache_size"] = args.segment_cache_size * 1024 * 1024
+
+    return argument_dict_for_renderer
@@ -1,6 +1,9 @@
 import argparse
 from pathlib import Path
 
+from unsilence import __version__
+from unsilence.lib.tools.cache_dir import get_cache_dir
+
 
 def convert_to_path(should_exist=True, should_parents_exist=True):
     """
@@ -42,21 +45,154 @@ def number_bigger_than_zero(s):
     return i
 
 
+def number_not_negative(s):
+    """
+    Returns the Number representation of s if it is not negative, else an error occurs
+    :param s: Input string
+    :return: Integer or None
+    """
+    i = int(s)
+
+    if i < 0:
+        raise ValueError("Value must not be negative")
+
+    return i
+
+
 def parse_arguments():
     """
     Parses console arguments for the Unsilence Console Interface
     :return: List of Console Line Arguments
     """
     parser = argparse.ArgumentParser(
-        description="Remove silence from media files",
+        prog="unsilence",
+        description="Remove silence from media files (use \"unsilence batch --help\" to process many files at "
+                    "once and \"unsilence serve --help\" to run a local job server)",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
 
+    parser.add_argument("-V", "--version", action="version", version=f"%(prog)s {__version__}")
+
     parser.add_argument("input_file", type=convert_to_path(should_exist=True),
                         help="Path to the file that contains silence")
     parser.add_argument("output_file", type=convert_to_path(should_exist=False, should_parents_exist=True),
-                        help="Path to where the finished media file should be")
+                        help="Path to where the finished media file should be, with the extension .edl, .fcpxml or "
+                             ".mlt an edit decision list (and an .ffconcat script) is exported instead of rendering")
+
+    add_processing_arguments(parser)
 
+    parser.add_argument("-p", "--pipeline", action="store_true",
+                        help="Start rendering while silence is still being detected (skips the time estimate, "
+                             "requires the interval render engine and the silencedetect detection engine)")
+
+    parser.add_argument("-rt", "--remap-timestamps", type=convert_to_path(should_exist=True), nargs="+", default=[],
+                        help="Subtitle (.srt, .vtt) or chapter (ffmetadata) files of the input whose timestamps should "
+                             "be rewritten to match the output, they are saved next to the output file")
+
+    parser.add_argument("-y", "--non-interactive-mode", action="store_true",
+                        help="Always answers yes if a dialog would show up")
+
+    parser.add_argument("-d", "--debug", action="store_true",
+                        help="Enable debug output (StackTrace)")
+
+    args = parser.parse_args()
+
+    if args.pipeline and (args.render_engine != "interval" or args.detection_engine != "silencedetect"):
+        parser.error("--pipeline requires the interval render engine and the silencedetect detection engine")
+
+    if args.pipeline and args.output_file.suffix.lower() in [".edl", ".fcpxml", ".mlt"]:
+        parser.error("--pipeline can not be used when an edit decision list is exported")
+
+    check_processing_arguments(parser, args)
+
+    return args
+
+
+def parse_batch_arguments(argv: list = None):
+    """
+    Parses console arguments for the batch mode ("unsilence batch") of the Unsilence Console Interface
+    :param argv: The arguments after "batch" (default: sys.argv)
+    :return: List of Console Line Arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="unsilence batch",
+        description="Remove silence from many media files at once, all files share one pool of ffmpeg processes",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+
+    parser.add_argument("input_files", nargs="*", default=[],
+                        help="Files or glob patterns (e.g. \"videos/**/*.mp4\") of the files that contain silence")
+    parser.add_argument("-m", "--manifest", type=convert_to_path(should_exist=True), default=None,
+                        help="Text file with one input file per line, optionally followed by a tab and the output "
+                             "file (relative paths are relative to the manifest, lines starting with # are ignored)")
+    parser.add_argument("-o", "--output-dir", type=convert_to_path(should_exist=False, should_parents_exist=False),
+                        default=None,
+                        help="Directory where the finished media files should be saved (default: next to the input)")
+    parser.add_argument("-os", "--output-suffix", type=str, default="_unsilenced",
+                        help="Suffix that is added to the name of the input files to name the output files")
+
+    add_processing_arguments(parser)
+
+    parser.add_argument("-y", "--overwrite", action="store_true",
+                        help="Overwrite output files that already exist instead of skipping their input")
+
+    parser.add_argument("-d", "--debug", action="store_true",
+                        help="Enable debug output (StackTrace)")
+
+    args = parser.parse_args(argv)
+
+    if len(args.input_files) == 0 and args.manifest is None:
+        parser.error("Input files or a --manifest are required")
+
+    check_processing_arguments(parser, args)
+
+    return args
+
+
+def parse_serve_arguments(argv: list = None):
+    """
+    Parses console arguments for the job server mode ("unsilence serve") of the Unsilence Console Interface
+    :param argv: The arguments after "serve" (default: sys.argv)
+    :return: List of Console Line Arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="unsilence serve",
+        description="Run a local job server: jobs are submitted over HTTP (POST /jobs), queued in a SQLite database "
+                    "and processed by a bounded pool of workers, progress is available as JSON (GET /jobs/<id>) and "
+                    "as server-sent events (GET /jobs/<id>/events)",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+
+    parser.add_argument("-H", "--host", type=str, default="127.0.0.1",
+                        help="Address the server listens on")
+    parser.add_argument("-P", "--port", type=number_not_negative, default=8080,
+                        help="Port the server listens on (0 chooses a free port)")
+    parser.add_argument("-s", "--socket", type=convert_to_path(should_exist=False), default=None,
+                        help="Listen on this Unix domain socket instead of host and port")
+    parser.add_argument("-db", "--database", type=convert_to_path(should_exist=False, should_parents_exist=False),
+                        default=get_cache_dir() / "jobs.sqlite3",
+                        help="SQLite database of the job queue, queued jobs are kept across restarts")
+    parser.add_argument("-o", "--output-dir", type=convert_to_path(should_exist=False, should_parents_exist=False),
+                        default=None,
+                        help="Only accept output files inside this directory, relative output files are relative to "
+                             "it (default: output files can be anywhere the server can write)")
+    parser.add_argument("-w", "--workers", type=number_bigger_than_zero, default=2,
+                        help="Number of jobs that are processed at the same time")
+    parser.add_argument("-t", "--threads", type=number_bigger_than_zero, default=None,
+                        help="Number of ffmpeg processes of all running jobs together, they are split evenly between "
+                             "the workers (default: one per available CPU)")
+    parser.add_argument("-d", "--debug", action="store_true",
+                        help="Enable debug output (StackTrace and every request)")
+
+    return parser.parse_args(argv)
+
+
+def add_processing_arguments(parser: argparse.ArgumentParser):
+    """
+    Adds the arguments that control how silence is detected and how the media is rendered
+    :param parser: The argument parser
+    :return: None
+    """
     parser.add_argument("-ao", "--audio-only", action="store_true",
                         help="Whether the output should not contain a video channel")
 
@@ -74,24 +210,54 @@ def parse_arguments():
                         help="Actively checks for invalid intervals and drops them (Takes longer)")
     parser.add_argument("-mid", "--minimum-interval-duration", type=float, default=0.25,
                         help="Minimum duration of an interval after speedup to ensure correct concatenation")
+    parser.add_argument("-re", "--render-engine", choices=["interval", "filtergraph", "chunked", "pcm", "cut"],
+                        default="interval",
+                        help="Whether every interval should be rendered in its own ffmpeg process (interval), all "
+                             "intervals in a single ffmpeg process (filtergraph), chunks of intervals in parallel "
+                             "ffmpeg processes (chunked), the decoded audio in process without temporary files "
+                             "(pcm, requires --audio-only) or whether the silent parts should only be cut out without "
+                             "re-encoding (cut, requires an audible speed and volume of 1)")
+    parser.add_argument("-sc", "--smart-cut", action="store_true",
+                        help="Copy audible parts that are neither sped up nor changed in volume between keyframes "
+                             "instead of re-encoding them (interval render engine, the output uses the codecs of "
+                             "the input), with the cut render engine the cuts are exact instead of at keyframes")
+    parser.add_argument("-scs", "--segment-cache-size", type=number_not_negative, default=1024,
+                        help="Maximum size (MiB) of the cache of rendered intervals, which lets later runs with "
+                             "slightly different options reuse the intervals that did not change (0 disables it)")
+    parser.add_argument("-mps", "--max-pending-segments", type=number_bigger_than_zero, default=None,
+                        help="Maximum number of intervals that may be rendered or wait on disk for their "
+                             "concatenation at the same time (default: four times the number of processes)")
+    parser.add_argument("-cc", "--chunk-count", type=number_bigger_than_zero, default=None,
+                        help="Number of chunks the chunked render engine splits the intervals into (default: twice "
+                             "the number of processes)")
 
-
-    parser.add_argument("-t", "--threads", type=number_bigger_than_zero, default=2,
-                        help="Number of threads to be used while rendering")
+    parser.add_argument("-t", "--threads", type=number_bigger_than_zero, default=None,
+                        help="Number of ffmpeg processes to be used while detecting silence and rendering, the "
+                             "available CPUs are split evenly between them (default: one per available CPU, "
+                             "respecting the CPU quota of a container)")
     parser.add_argument("-sl", "--silence-level", type=float, default=-35,
                         help="Minimum volume in decibel to be classified as audible")
     parser.add_argument("-stt", "--silence-time-threshold", type=float, default=0.5,
                         help="Resolution of the silence detection (seconds)")
     parser.add_argument("-sit", "--short-interval-threshold", type=float, default=0.3,
                         help="Intervals smaller than this value (seconds) get combined into a larger interval")
+    parser.add_argument("-de", "--detection-engine", choices=["silencedetect", "pcm"], default="silencedetect",
+                        help="Whether silence should be detected with the ffmpeg silencedetect filter or by analyzing "
+                             "the raw audio samples (pcm)")
     parser.add_argument("-st", "--stretch-time", type=float, default=0.25,
                         help="Time (seconds) that should be added to audible intervals and removed from silent "
                              "intervals")
 
-    parser.add_argument("-y", "--non-interactive-mode", action="store_true",
-                        help="Always answers yes if a dialog would show up")
 
-    parser.add_argument("-d", "--debug", action="store_true",
-                        help="Enable debug output (StackTrace)")
+def check_processing_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """
+    Checks that the arguments added by add_processing_arguments() can be combined, exits with an error otherwise
+    :param parser: The argument parser
+    :param args: The parsed arguments
+    :return: None
+    """
+    if args.render_engine == "pcm" and not args.audio_only:
+        parser.error("--render-engine pcm requires --audio-only")
 
-    return parser.parse_args()
+    if args.render_engine == "cut" and (args.audible_speed != 1 or args.audible_volume != 1):
+        parser.error("--render-engine cut requires an audible speed and volume of 1")
@@ -0,0 +1,42 @@
+import signal
+import sys
+import threading
+
+from unsilence.command_line.ParseArguments import parse_serve_arguments
+
+
+def run_serve(argv: list = None):
+    """
+    Run the job server mode ("unsilence serve") of the Console Interface for Unsilence
+    :param argv: The arguments after "serve" (default: sys.argv)
+    :return: None
+    """
+    args = parse_serve_arguments(argv)
+
+    from unsilence.Unsilence import Unsilence
+    from unsilence.lib.server.JobServer import JobServer
+
+    if args.debug:
+        sys.tracebacklimit = 1000
+
+    Unsilence.check_ffmpeg()
+
+    job_server = JobServer(args.database, workers=args.workers, threads=args.threads, output_dir=args.output_dir,
+                           verbose=args.debug)
+
+    def handle_terminate(signal_number, frame):
+        # shutdown() waits for the request loop, which runs in this thread
+        threading.Thread(target=job_server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, handle_terminate)
+
+    def print_address(address):
+        print(f"Serving on {address} with {job_server.job_runner.workers} workers, jobs are stored in "
+              f"{args.database} (press Ctrl+C to stop)", flush=True)
+
+    try:
+        job_server.serve(args.host, args.port, args.socket, on_started=print_address)
+    except KeyboardInterrupt:
+        pass
+
+    print("Stopped, queued jobs are processed after the next start")
@@ -1,6 +1,8 @@
 import os
+import sys
 
 
 def repair_console():
-    if os.name == "posix":
+    # Without a terminal (e.g. jobs started from a queue) there is nothing to repair, so no shell is started
+    if os.name == "posix" and sys.stdin is not None and sys.stdin.isatty():
         os.system("stty sane")
@@ -0,0 +1,138 @@
+from pathlib import Path
+
+from unsilence.lib.asynchronous.AsyncProcess import run_all, run_process
+from unsilence.lib.detect_silence.DetectSilence import SilenceDetectParser, generate_silence_detect_command, \
+    merge_silent_runs, split_into_ranges
+from unsilence.lib.intervals.Intervals import Intervals
+from unsilence.lib.media_index.MediaIndexCache import load_cached_media_index
+from unsilence.lib.tools.media_duration import parse_media_duration
+from unsilence.lib.tools.toolchain import get_ffmpeg_binary
+
+
+async def detect_silence_async(input_file: Path, **kwargs):
+    """
+    Detects silence in a file like lib.detect_silence.DetectSilence.detect_silence(), but the ffmpeg processes run
+    without blocking the event loop. Only the silencedetect engine is supported
+    :param input_file: File where silence should be detected
+    :param kwargs: Various Parameters, see lib.detect_silence.DetectSilence.detect_silence()
+    :return: An Intervals object with silent and audible intervals
+    """
+    input_file = Path(input_file).absolute()
+
+    if not input_file.exists():
+        raise FileNotFoundError(f"Input file {input_file} does not exist!")
+
+    if kwargs.get("detection_engine", "silencedetect") != "silencedetect":
+        raise ValueError("Only the silencedetect engine can detect silence asynchronously")
+
+    silent_detect_progress_update = kwargs.get("on_silence_detect_progress_update", None)
+    silence_level = kwargs.get('silence_level', -35)
+    silence_time_threshold = kwargs.get('silence_time_threshold', 0.5)
+    threads = kwargs.get("threads", 1)
+
+    media_duration = None
+    if threads > 1:
+        media_index = load_cached_media_index(input_file, kwargs.get("media_index_cache_dir", None))
+        if media_index is not None:
+            media_duration = media_index.media_duration
+        if media_duration is None:
+            media_duration = await get_media_duration_async(input_file)
+
+    if media_duration is None:
+        silent_runs, media_duration = await detect_silent_runs_async(
+            input_file,
+            silence_level,
+            silence_time_threshold,
+            on_progress_update=silent_detect_progress_update
+        )
+    else:
+        ranges = split_into_ranges(media_duration, silence_time_threshold, threads)
+        range_progress = [0] * len(ranges)
+        total_progress = sum(range_duration for _, range_duration in ranges)
+
+        def update_range_progress(range_id):
+            """
+            Creates a progress handler for a single time range that reports the combined progress of all ranges
+            :param range_id: ID of the time range
+            :return: Handler function
+            """
+            def handler(current, total):
+                range_progress[range_id] = max(0, min(current, ranges[range_id][1]))
+                if silent_detect_progress_update is not None:
+                    silent_detect_progress_update(sum(range_progress) / total_progress * media_duration,
+                                                  media_duration)
+
+            return handler
+
+        results = await run_all(
+            detect_silent_runs_async(
+                input_file,
+                silence_level,
+                silence_time_threshold,
+                start=range_start,
+                duration=range_duration,
+                on_progress_update=update_range_progress(i)
+            )
+            for i, (range_start, range_duration) in enumerate(ranges)
+        )
+        silent_runs = merge_silent_runs([silent_run for range_runs, _ in results for silent_run in range_runs])
+
+    intervals = Intervals.from_silent_runs(silent_runs, media_duration)
+
+    if silent_detect_progress_update is not None:
+        silent_detect_progress_update(media_duration, media_duration)
+
+    intervals.optimize(
+        kwargs.get('short_interval_threshold', 0.3),
+        kwargs.get('stretch_time', 0.25)
+    )
+
+    return intervals
+
+
+async def detect_silent_runs_async(input_file: Path, silence_level=-35, silence_time_threshold=0.5, start=0,
+                                   duration=None, on_progress_update=None):
+    """
+    Runs the ffmpeg silencedetect filter on (a time range of) a file and collects the silent parts, see
+    lib.detect_silence.DetectSilence.detect_silent_runs()
+    :param input_file: File where silence should be detected
+    :param silence_level: Threshold of what should be classified as silent/audible (in dB)
+    :param silence_time_threshold: Minimum length of a silent part (in seconds)
+    :param start: Time (in seconds) where the detection should start, the input is seeked to this position
+    :param duration: How long (in seconds) the detection should run after the start (default: until the end)
+    :param on_progress_update: Function that should be called on progress update
+        (called like: func(current, total), current is relative to the start)
+    :return: Tuple of the list of silent (start, end) tuples (in seconds, relative to the start of the file) and the
+        duration of the complete media file
+    """
+    parser = SilenceDetectParser(start, duration, on_progress_update)
+    silent_runs = []
+
+    await run_process(
+        generate_silence_detect_command(input_file, silence_level, silence_time_threshold, start, duration),
+        lambda line: silent_runs.extend(parser.parse_line(line))
+    )
+
+    silent_runs.extend(parser.finish())
+
+    return silent_runs, parser.media_duration
+
+
+async def get_media_duration_async(input_file: Path):
+    """
+    Gets the duration of a media file like lib.tools.media_duration.get_media_duration()
+    :param input_file: The media file
+    :return: Media duration in seconds or None if it could not be determined
+    """
+    media_durations = []
+
+    def handle_line(line):
+        if "Duration" in line:
+            media_duration = parse_media_duration(line)
+            if media_duration is not None:
+                media_durations.append(media_duration)
+
+    # ffmpeg exits with an error because no output is given, but the input information is printed anyway
+    await run_process([get_ffmpeg_binary(), "-hide_banner", "-i", str(input_file)], handle_line)
+
+    return media_durations[0] if len(media_durations) > 0 else None
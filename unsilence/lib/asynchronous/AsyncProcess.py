@@ -0,0 +1,90 @@
+import asyncio
+import subprocess
+import weakref
+
+from unsilence.lib.tools.cpu_count import get_available_cpu_count
+
+# One semaphore per event loop, it bounds the ffmpeg processes of all jobs of the loop
+PROCESS_SEMAPHORES = weakref.WeakKeyDictionary()
+process_limit = None
+
+
+def set_process_limit(limit: int = None):
+    """
+    Sets how many ffmpeg processes may run at the same time in an event loop, has to be called before the first
+    process of the event loop is started
+    :param limit: Maximum number of processes (None: one per available CPU)
+    :return: None
+    """
+    global process_limit
+    process_limit = limit
+
+
+def get_process_limit():
+    """
+    Gets how many ffmpeg processes may run at the same time in an event loop, see set_process_limit()
+    :return: Maximum number of processes
+    """
+    return process_limit if process_limit is not None else get_available_cpu_count()
+
+
+def get_process_semaphore():
+    """
+    Gets the semaphore that bounds the ffmpeg processes of the running event loop
+    :return: asyncio.Semaphore
+    """
+    loop = asyncio.get_running_loop()
+
+    if loop not in PROCESS_SEMAPHORES:
+        PROCESS_SEMAPHORES[loop] = asyncio.Semaphore(get_process_limit())
+
+    return PROCESS_SEMAPHORES[loop]
+
+
+async def run_process(command: list, on_output_line=None):
+    """
+    Runs a process without blocking the event loop, once the process semaphore of the loop is acquired. If the
+    calling task is cancelled (or on_output_line raises), the process is killed before the exception is passed on
+    :param command: The console command
+    :param on_output_line: Function that is called for every line the process writes to stdout or stderr
+        (called like: func(line))
+    :return: Return code of the process
+    """
+    async with get_process_semaphore():
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            limit=1024 * 1024
+        )
+
+        try:
+            async for line in process.stdout:
+                if on_output_line is not None:
+                    on_output_line(line.decode("utf-8", errors="replace"))
+
+            return await process.wait()
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+            raise
+
+
+async def run_all(coroutines):
+    """
+    Runs coroutines simultaneously, if one of them fails (or the calling task is cancelled), the others are cancelled
+    before the exception is passed on, so none of their processes keep running
+    :param coroutines: Iterable of coroutines
+    :return: List of the results, in the same order as the coroutines
+    """
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
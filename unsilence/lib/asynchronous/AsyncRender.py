@@ -0,0 +1,199 @@
+import os
+import shutil
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+from unsilence.lib.asynchronous.AsyncProcess import get_process_limit, run_all, run_process
+from unsilence.lib.intervals.Interval import Interval
+from unsilence.lib.intervals.Intervals import Intervals
+from unsilence.lib.render_media.FilterGraph import generate_filter_graph, generate_filter_graph_command, \
+    get_render_error, parse_progress_line
+from unsilence.lib.render_media.MediaRenderer import MediaRenderer
+from unsilence.lib.render_media.RenderScheduler import get_worker_plan
+
+
+async def render_media_async(input_file: Path, output_file: Path, intervals: Intervals, temp_path: Path, **kwargs):
+    """
+    Renders an input_file like lib.render_media.MediaRenderer.MediaRenderer.render(), but the ffmpeg processes run
+    without blocking the event loop. Only the "filtergraph" (default) and "chunked" render engines are supported, the
+    temporary files are removed even if the render fails or is cancelled
+    :param input_file: The file that should be processed
+    :param output_file: Where the processed file should be saved
+    :param intervals: The Intervals that should be processed
+    :param temp_path: The temp path where all temporary files should be stored
+    :param kwargs: Keyword Args, see lib.render_media.MediaRenderer.MediaRenderer.render()
+    :return: None
+    """
+    input_file = Path(input_file)
+    output_file = Path(output_file)
+
+    if not input_file.exists():
+        raise FileNotFoundError(f"Input file {input_file} does not exist!")
+
+    render_engine = kwargs.get("render_engine", "filtergraph")
+    if render_engine not in ["filtergraph", "chunked"]:
+        raise ValueError("Only the filtergraph and chunked render engines can render asynchronously")
+
+    render_options = MediaRenderer.get_render_options(**kwargs)
+
+    intervals = intervals.remove_short_intervals_from_start(
+        render_options.audible_speed,
+        render_options.silent_speed
+    )
+
+    os.makedirs(output_file.parent, exist_ok=True)
+
+    video_temp_path = Path(temp_path).absolute() / str(uuid.uuid4())
+    video_temp_path.mkdir(parents=True)
+
+    on_render_progress_update = kwargs.get("on_render_progress_update", None)
+    on_concat_progress_update = kwargs.get("on_concat_progress_update", None)
+
+    try:
+        final_output = video_temp_path / f"out_final{output_file.suffix}"
+
+        if render_engine == "filtergraph":
+            await render_filter_graph_async(
+                input_file,
+                final_output,
+                intervals.intervals,
+                render_options,
+                video_temp_path / "filter_graph.txt",
+                threads=kwargs.get("filter_graph_threads", None) or get_process_thread_count(),
+                on_progress_update=on_render_progress_update
+            )
+        else:
+            await render_chunks_async(input_file, final_output, intervals, render_options, video_temp_path, **kwargs)
+
+        if on_concat_progress_update is not None:
+            on_concat_progress_update(1, 1)
+
+        shutil.move(final_output, output_file)
+    finally:
+        shutil.rmtree(video_temp_path, ignore_errors=True)
+
+
+def get_process_thread_count():
+    """
+    Gets the number of threads (ffmpeg -threads) of a single process, the processes of all jobs in the event loop
+    share the available CPUs, so up to get_process_limit() concurrent processes do not oversubscribe them
+    :return: Number of threads
+    """
+    return get_worker_plan(processes=get_process_limit()).ffmpeg_threads
+
+
+async def render_filter_graph_async(input_file: Path, output_file: Path, interval_list: list,
+                                    render_options: SimpleNamespace, filter_script_file: Path, **kwargs):
+    """
+    Renders a list of intervals in a single ffmpeg process like lib.render_media.FilterGraph.render_filter_graph()
+    :param input_file: The file that should be processed
+    :param output_file: Where the rendered media should be saved
+    :param interval_list: List of contiguous lib.Intervals.Interval objects that should be rendered
+    :param render_options: The parameters on how the media should be processed
+    :param filter_script_file: Where the filtergraph script should be saved
+    :param kwargs: Keyword Args, see lib.render_media.FilterGraph.render_filter_graph()
+    :return: None
+    """
+    filter_graph, output_duration = generate_filter_graph(interval_list, render_options)
+    on_progress_update = kwargs.get("on_progress_update", None)
+
+    with open(str(filter_script_file), "w+") as file:
+        file.write(filter_graph)
+
+    error_output = []
+
+    def handle_line(line):
+        is_progress, current = parse_progress_line(line)
+
+        if not is_progress:
+            error_output.append(line.strip())
+        elif current is not None and on_progress_update is not None:
+            on_progress_update(min(current, output_duration), output_duration)
+
+    return_code = await run_process(
+        generate_filter_graph_command(input_file, output_file, render_options, filter_script_file, **kwargs),
+        handle_line
+    )
+
+    if return_code != 0:
+        raise get_render_error(error_output)
+
+    if on_progress_update is not None:
+        on_progress_update(output_duration, output_duration)
+
+
+async def render_chunks_async(input_file: Path, output_file: Path, intervals: Intervals,
+                              render_options: SimpleNamespace, video_temp_path: Path, **kwargs):
+    """
+    Splits the intervals into contiguous chunks, renders every chunk as a filtergraph (as many simultaneously as the
+    process limit of the event loop allows) and concatenates the chunk files afterwards
+    :param input_file: The file that should be processed
+    :param output_file: Where the concatenated file should be saved
+    :param intervals: The Intervals that should be processed
+    :param render_options: The parameters on how the media should be processed
+    :param video_temp_path: The temp path where the chunk files should be stored
+    :param kwargs: Keyword Args, see lib.render_media.MediaRenderer.MediaRenderer.render()
+    :return: None
+    """
+    chunk_count = kwargs.get("chunk_count", None)
+    if chunk_count is None:
+        chunk_count = 2 * get_worker_plan(processes=kwargs.get("threads", None)).processes
+
+    chunks = MediaRenderer.split_into_chunks(intervals, render_options, chunk_count)
+    worker_plan = get_worker_plan(len(chunks), kwargs.get("threads", None))
+
+    on_render_progress_update = kwargs.get("on_render_progress_update", None)
+    chunk_progress = [0] * len(chunks)
+    chunk_totals = [0] * len(chunks)
+
+    def update_chunk_progress(chunk_id):
+        """
+        Creates a progress handler for a single chunk that reports the combined progress of all chunks
+        :param chunk_id: ID of the chunk
+        :return: Handler function
+        """
+        def handler(current, total):
+            chunk_progress[chunk_id] = current
+            chunk_totals[chunk_id] = total
+
+            if on_render_progress_update is not None and all(chunk_totals):
+                on_render_progress_update(sum(chunk_progress), sum(chunk_totals))
+
+        return handler
+
+    async def render_chunk(chunk_id, chunk):
+        """
+        Renders a single chunk, the input is seeked to the start of the first interval of the chunk
+        :param chunk_id: ID of the chunk
+        :param chunk: List of contiguous intervals
+        :return: Path of the rendered chunk
+        """
+        chunk_start = chunk[0].start
+        chunk_output_file = video_temp_path / f"chunk_{chunk_id}{output_file.suffix}"
+
+        await render_filter_graph_async(
+            input_file,
+            chunk_output_file,
+            [Interval(interval.start - chunk_start, interval.end - chunk_start, interval.is_silent)
+             for interval in chunk],
+            render_options,
+            video_temp_path / f"filter_graph_{chunk_id}.txt",
+            input_offset=chunk_start,
+            input_duration=chunk[-1].end - chunk_start,
+            threads=min(worker_plan.ffmpeg_threads, get_process_thread_count()),
+            on_progress_update=update_chunk_progress(chunk_id)
+        )
+
+        return chunk_output_file
+
+    chunk_file_list = await run_all(render_chunk(i, chunk) for i, chunk in enumerate(chunks))
+
+    error_output = []
+    return_code = await run_process(
+        MediaRenderer.generate_concat_command(chunk_file_list, video_temp_path / "concat_list.txt", output_file),
+        lambda line: error_output.append(line.strip())
+    )
+
+    if return_code != 0:
+        raise IOError("Concatenating the chunks failed:\n" + "\n".join(error_output[-20:]))
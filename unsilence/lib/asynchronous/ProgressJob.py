@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+
+
+class ProgressJob:
+    """
+    A job that runs as an asyncio task: it can be awaited for its result, iterated (async for) for its progress updates
+    and cancelled, which kills the ffmpeg processes it started
+    """
+
+    def __init__(self, job_function):
+        """
+        Initializes a new ProgressJob and starts it on the running event loop
+        :param job_function: Coroutine function that runs the job, it gets a function to report progress
+            (called like: job_function(report), report is called like: report(stage, current, total))
+        """
+        self.__latest_update = None
+        self.__update_event = asyncio.Event()
+        self.__task = asyncio.ensure_future(job_function(self.__report))
+
+    def __report(self, stage: str, current: float, total: float):
+        """
+        Stores a progress update, updates that are not consumed before the next one arrives are skipped
+        :param stage: Name of the stage of the job (e.g. "detect", "render" or "concat")
+        :param current: Current progress
+        :param total: Total progress of the stage
+        :return: None
+        """
+        self.__latest_update = SimpleNamespace(stage=stage, current=current, total=total)
+        self.__update_event.set()
+
+    async def __iterate_updates(self):
+        """
+        Yields the progress updates until the job is done
+        :return: Async generator of progress updates (SimpleNamespace with stage, current and total)
+        """
+        while True:
+            update_waiter = asyncio.ensure_future(self.__update_event.wait())
+            try:
+                await asyncio.wait([update_waiter, self.__task], return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                update_waiter.cancel()
+
+            if self.__update_event.is_set():
+                self.__update_event.clear()
+                yield self.__latest_update
+            elif self.__task.done():
+                return
+
+    def __aiter__(self):
+        return self.__iterate_updates()
+
+    def __await__(self):
+        return self.__task.__await__()
+
+    def cancel(self):
+        """
+        Cancels the job, its running ffmpeg processes are killed
+        :return: Whether the job was cancelled (False if it was already done)
+        """
+        return self.__task.cancel()
+
+    def done(self):
+        """
+        Checks whether the job is done (completed, failed or cancelled)
+        :return: Whether the job is done
+        """
+        return self.__task.done()
@@ -0,0 +1,124 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from types import SimpleNamespace
+
+from unsilence.Unsilence import Unsilence
+from unsilence.lib.tools.cache_dir import resolve_cache_dir
+from unsilence.lib.tools.cpu_count import get_available_cpu_count
+
+# Render engines that split a file into tasks for the worker pool, the others render a file in a single task
+POOLED_RENDER_ENGINES = ["interval", "chunked"]
+
+
+class BatchProcessor:
+    """
+    Detects silence in and renders many files with one shared pool of worker threads (one per available CPU). Every
+    ffmpeg process of every file runs on this pool, so while one file is in its serial tail (its last intervals or the
+    concatenation), the intervals of the next files keep all CPUs busy
+    """
+
+    def __init__(self, temp_dir: Path = Path(".tmp"), cache_dir: Path = None, threads: int = None):
+        """
+        Initializes a new BatchProcessor
+        :param temp_dir: The temp dir where temporary files can be saved
+        :param cache_dir: The dir where data that can be reused by later runs is persisted (default None: the
+            directory of lib.tools.cache_dir.get_cache_dir(), False disables caching)
+        :param threads: Number of worker threads (ffmpeg processes) of the shared pool (default None: one per
+            available CPU)
+        """
+        self.__temp_dir = Path(temp_dir)
+        self.__cache_dir = resolve_cache_dir(cache_dir)
+        self.__threads = threads if threads is not None else get_available_cpu_count()
+
+    def process(self, jobs: list, detect_options: dict = None, render_options: dict = None,
+                on_progress_update=None, on_job_completed=None):
+        """
+        Processes all jobs, detection and rendering of different files overlap. A failing job does not stop the others
+        :param jobs: List of (input_file, output_file) tuples
+        :param detect_options: Keyword arguments for lib.detect_silence.DetectSilence.detect_silence (threads is
+            chosen per file)
+        :param render_options: Keyword arguments for lib.render_media.MediaRenderer.MediaRenderer.render (threads
+            and executor are set to the shared pool, engines that render a file in a single task get a share of the
+            CPUs instead)
+        :param on_progress_update: Function that should be called on progress update of a job, from any thread
+            (called like: func(job_id, stage, current, total), stage is "detect", "render" or "concat")
+        :param on_job_completed: Function that should be called when a job is completed or failed, from the calling
+            thread (called like: func(result), see the return value)
+        :return: List of results in the order of the jobs (SimpleNamespace with job_id, input_file, output_file,
+            intervals and error, the exception if the job failed or None)
+        """
+        detect_options = dict(detect_options or {})
+        render_options = dict(render_options or {})
+        render_engine = render_options.get("render_engine", "interval")
+
+        # Files are detected in parallel, a file only gets multiple detection ranges if there are fewer files than CPUs
+        threads_per_job = max(1, self.__threads // max(len(jobs), 1))
+        detect_options["threads"] = threads_per_job
+
+        if render_engine in POOLED_RENDER_ENGINES:
+            render_options["threads"] = self.__threads
+        else:
+            # Up to one file per worker renders at the same time, each of them only gets its share of the CPUs
+            render_options["threads"] = threads_per_job
+            render_options["filter_graph_threads"] = threads_per_job
+
+        results = [
+            SimpleNamespace(job_id=i, input_file=Path(input_file), output_file=Path(output_file), intervals=None,
+                            error=None)
+            for i, (input_file, output_file) in enumerate(jobs)
+        ]
+
+        def update_progress(job_id, stage):
+            """
+            Creates a progress handler for a stage of a job
+            :param job_id: ID of the job
+            :param stage: Name of the stage
+            :return: Handler function
+            """
+            def handler(current, total):
+                if on_progress_update is not None:
+                    on_progress_update(job_id, stage, current, total)
+
+            return handler
+
+        with ThreadPoolExecutor(max_workers=self.__threads) as executor:
+            def process_job(result):
+                """
+                Nested function that processes a single job, it runs on a coordinating thread and only waits while
+                its ffmpeg processes run on the shared pool
+                :param result: The result of the job that is filled in
+                :return: The result
+                """
+                try:
+                    unsilence = Unsilence(result.input_file, self.__temp_dir, self.__cache_dir or False)
+
+                    result.intervals = executor.submit(
+                        unsilence.detect_silence,
+                        on_silence_detect_progress_update=update_progress(result.job_id, "detect"),
+                        **detect_options
+                    ).result()
+
+                    render = dict(
+                        on_render_progress_update=update_progress(result.job_id, "render"),
+                        on_concat_progress_update=update_progress(result.job_id, "concat"),
+                        **render_options
+                    )
+
+                    if render_engine in POOLED_RENDER_ENGINES:
+                        unsilence.render_media(result.output_file, executor=executor, **render)
+                    else:
+                        executor.submit(unsilence.render_media, result.output_file, **render).result()
+                except Exception as error:
+                    result.error = error
+
+                return result
+
+            # Twice as many files as workers are in progress, so the pool never runs dry between two files
+            with ThreadPoolExecutor(max_workers=max(1, min(len(jobs), 2 * self.__threads))) as coordinators:
+                futures = [coordinators.submit(process_job, result) for result in results]
+
+                for future in as_completed(futures):
+                    if on_job_completed is not None:
+                        on_job_completed(future.result())
+
+        return results
@@ -1,9 +1,12 @@
 import re
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import os
-import sys
-from unsilence.lib.intervals.Intervals import Intervals, Interval
+from unsilence.lib.intervals.Intervals import Intervals
+from unsilence.lib.media_index.MediaIndexCache import load_cached_media_index
+from unsilence.lib.tools.media_duration import get_media_duration, parse_media_duration
+from unsilence.lib.tools.toolchain import get_ffmpeg_binary
 
 
 def detect_silence(input_file: Path, **kwargs):
@@ -20,25 +23,147 @@ def detect_silence(input_file: Path, **kwargs):
         stretch_time: Time the interval should be enlarged/shrunken (default 0.25) (in seconds)
         on_silence_detect_progress_update: Function that should be called on progress update
             (called like: func(current, total))
+        threads: Number of time ranges of the file that are detected simultaneously (default 1)
+        detection_engine: "silencedetect" parses the output of the ffmpeg silencedetect filter, "pcm" analyzes the
+            raw audio samples with NumPy, see lib.DetectSilencePcm.detect_silence_pcm (default "silencedetect")
+        media_index_cache_dir: Directory where the keyframe indexes of files are persisted, the media duration is taken
+            from the index of the file if it was indexed before (default None)
     """
     input_file = Path(input_file).absolute()
 
     if not input_file.exists():
         raise FileNotFoundError(f"Input file {input_file} does not exist!")
 
+    detection_engine = kwargs.get("detection_engine", "silencedetect")
+    if detection_engine == "pcm":
+        from unsilence.lib.detect_silence.DetectSilencePcm import detect_silence_pcm
+
+        return detect_silence_pcm(input_file, **kwargs)
+    elif detection_engine != "silencedetect":
+        raise ValueError(f"Unknown detection engine {detection_engine}")
+
     silent_detect_progress_update = kwargs.get("on_silence_detect_progress_update", None)
-    
-    ffmpeg_path = getattr(sys, '_MEIPASS', os.getcwd())
-    ffmpeg_binary = os.path.join(ffmpeg_path, 'ffmpeg')
-    command = [
-        ffmpeg_binary,
-        "-i", str(input_file),
-        "-vn",
-        "-af",
-        f"silencedetect=noise={kwargs.get('silence_level', -35)}dB:d={kwargs.get('silence_time_threshold', 0.5)}",
-        "-f", "null",
-        "-"
-    ]
+    silence_level = kwargs.get('silence_level', -35)
+    silence_time_threshold = kwargs.get('silence_time_threshold', 0.5)
+    threads = kwargs.get("threads", 1)
+
+    media_duration = None
+    if threads > 1:
+        # The duration of an already indexed file is known without probing it again
+        media_index = load_cached_media_index(input_file, kwargs.get("media_index_cache_dir", None))
+        if media_index is not None:
+            media_duration = media_index.media_duration
+        if media_duration is None:
+            media_duration = get_media_duration(input_file)
+
+    if media_duration is None:
+        silent_runs, media_duration = detect_silent_runs(
+            input_file,
+            silence_level,
+            silence_time_threshold,
+            on_progress_update=silent_detect_progress_update
+        )
+    else:
+        silent_runs = detect_silent_runs_in_parallel(
+            input_file,
+            media_duration,
+            silence_level,
+            silence_time_threshold,
+            threads,
+            silent_detect_progress_update
+        )
+
+    intervals = Intervals.from_silent_runs(silent_runs, media_duration)
+
+    if silent_detect_progress_update is not None:
+        silent_detect_progress_update(media_duration, media_duration)
+
+    intervals.optimize(
+        kwargs.get('short_interval_threshold', 0.3),
+        kwargs.get('stretch_time', 0.25)
+    )
+
+    return intervals
+
+
+def detect_silence_stream(input_file: Path, **kwargs):
+    """
+    Detects silence in a file like detect_silence(), but yields every interval as soon as it is final (it can not
+    be combined with later intervals by lib.Intervals.Intervals.optimize anymore), while ffmpeg is still running.
+    Only the silencedetect engine is supported and the detection always runs in a single thread
+    :param input_file: File where silence should be detected
+    :param kwargs: Various Parameters, see detect_silence()
+    :return: Generator of optimized lib.Interval.Interval objects
+    """
+    input_file = Path(input_file).absolute()
+
+    if not input_file.exists():
+        raise FileNotFoundError(f"Input file {input_file} does not exist!")
+
+    if kwargs.get("detection_engine", "silencedetect") != "silencedetect":
+        raise ValueError("Only the silencedetect engine can detect silence as a stream")
+
+    silent_run_iterator = iterate_silent_runs(
+        input_file,
+        kwargs.get('silence_level', -35),
+        kwargs.get('silence_time_threshold', 0.5),
+        on_progress_update=kwargs.get("on_silence_detect_progress_update", None)
+    )
+
+    return Intervals.optimize_stream(
+        Intervals.iterate_from_silent_runs(silent_run_iterator),
+        kwargs.get('short_interval_threshold', 0.3),
+        kwargs.get('stretch_time', 0.25)
+    )
+
+
+def detect_silent_runs(input_file: Path, silence_level=-35, silence_time_threshold=0.5, start=0, duration=None,
+                       on_progress_update=None):
+    """
+    Runs the ffmpeg silencedetect filter on (a time range of) a file and collects the silent parts
+    :param input_file: File where silence should be detected
+    :param silence_level: Threshold of what should be classified as silent/audible (in dB)
+    :param silence_time_threshold: Minimum length of a silent part (in seconds)
+    :param start: Time (in seconds) where the detection should start, the input is seeked to this position
+    :param duration: How long (in seconds) the detection should run after the start (default: until the end)
+    :param on_progress_update: Function that should be called on progress update
+        (called like: func(current, total), current is relative to the start)
+    :return: Tuple of the list of silent (start, end) tuples (in seconds, relative to the start of the file) and the
+        duration of the complete media file
+    """
+    silent_runs = []
+    silent_run_iterator = iterate_silent_runs(
+        input_file,
+        silence_level,
+        silence_time_threshold,
+        start=start,
+        duration=duration,
+        on_progress_update=on_progress_update
+    )
+
+    while True:
+        try:
+            silent_runs.append(next(silent_run_iterator))
+        except StopIteration as stop:
+            return silent_runs, stop.value
+
+
+def iterate_silent_runs(input_file: Path, silence_level=-35, silence_time_threshold=0.5, start=0, duration=None,
+                        on_progress_update=None):
+    """
+    Runs the ffmpeg silencedetect filter on (a time range of) a file and yields the silent parts while ffmpeg is
+    still running
+    :param input_file: File where silence should be detected
+    :param silence_level: Threshold of what should be classified as silent/audible (in dB)
+    :param silence_time_threshold: Minimum length of a silent part (in seconds)
+    :param start: Time (in seconds) where the detection should start, the input is seeked to this position
+    :param duration: How long (in seconds) the detection should run after the start (default: until the end)
+    :param on_progress_update: Function that should be called on progress update
+        (called like: func(current, total), current is relative to the start)
+    :return: Generator of silent (start, end) tuples (in seconds, relative to the start of the file), that returns
+        the duration of the complete media file when it is exhausted
+    """
+    command = generate_silence_detect_command(input_file, silence_level, silence_time_threshold, start, duration)
 
     console_output = subprocess.Popen(
         command,
@@ -47,51 +172,206 @@ def detect_silence(input_file: Path, **kwargs):
         universal_newlines=True
     ).stdout
 
-    intervals = Intervals()
-    current_interval = Interval(start=0, end=0, is_silent=False)
-    media_duration = None
+    parser = SilenceDetectParser(start, duration, on_progress_update)
 
     for line in console_output:
+        yield from parser.parse_line(line)
+
+    yield from parser.finish()
+
+    return parser.media_duration
+
+
+def generate_silence_detect_command(input_file: Path, silence_level=-35, silence_time_threshold=0.5, start=0,
+                                    duration=None):
+    """
+    Generates the ffmpeg command that runs the silencedetect filter on (a time range of) a file
+    :param input_file: File where silence should be detected
+    :param silence_level: Threshold of what should be classified as silent/audible (in dB)
+    :param silence_time_threshold: Minimum length of a silent part (in seconds)
+    :param start: Time (in seconds) where the detection should start, the input is seeked to this position
+    :param duration: How long (in seconds) the detection should run after the start (default: until the end)
+    :return: ffmpeg console command, its output (stdout and stderr) can be parsed with SilenceDetectParser
+    """
+    command = [get_ffmpeg_binary()]
+
+    if start > 0:
+        command.extend(["-ss", f"{start}"])
+
+    if duration is not None:
+        command.extend(["-t", f"{duration}"])
+
+    command.extend([
+        "-i", str(input_file),
+        "-vn",
+        "-af",
+        f"silencedetect=noise={silence_level}dB:d={silence_time_threshold}",
+        "-f", "null",
+        "-"
+    ])
+
+    return command
+
+
+class SilenceDetectParser:
+    """
+    Parses the console output of the ffmpeg silencedetect filter line by line, so it can be fed from a blocking pipe
+    as well as from an asyncio stream
+    """
+
+    def __init__(self, start=0, duration=None, on_progress_update=None):
+        """
+        Initializes a new SilenceDetectParser
+        :param start: Time (in seconds) where the detection started
+        :param duration: How long (in seconds) the detection runs after the start (default: until the end)
+        :param on_progress_update: Function that should be called on progress update
+            (called like: func(current, total), current is relative to the start)
+        """
+        self.__start = start
+        self.__duration = duration
+        self.__on_progress_update = on_progress_update
+        self.__silence_start = None
+        self.media_duration = None
+
+    def parse_line(self, line: str):
+        """
+        Parses a single line of the console output
+        :param line: The line
+        :return: List of the silent (start, end) tuples that were finished by this line (in seconds, relative to the
+            start of the file)
+        """
         if "[silencedetect" in line:
             capture = re.search("\\[silencedetect @ [0-9xa-f]+] silence_([a-z]+): (-?[0-9]+.?[0-9]*[e-]*[0-9]*)",
                                 line)
             if capture is None:
-                continue
-                
+                return []
+
             event = capture[1]
             time = float(capture[2])
 
-            if silent_detect_progress_update is not None:
-                silent_detect_progress_update(time, media_duration)
+            if self.__on_progress_update is not None:
+                self.__on_progress_update(time, self.media_duration if self.__duration is None else self.__duration)
 
             if event == "start":
-                if current_interval.start != time:
-                    current_interval.end = time
-                    intervals.add_interval(current_interval)
-                current_interval = Interval(start=time, is_silent=True)
+                self.__silence_start = self.__start + time
 
-            if event == "end":
-                current_interval.end = time
-                intervals.add_interval(current_interval)
-                current_interval = Interval(start=time, is_silent=False)
+            if event == "end" and self.__silence_start is not None:
+                silent_run = (self.__silence_start, self.__start + time)
+                self.__silence_start = None
+                return [silent_run]
 
         elif "Duration" in line:
-            capture = re.search("Duration: ([0-9:]+.?[0-9]*)", line)
-            if capture is None:
-                continue
-            hour, minute, second_millisecond = capture[1].split(":")
-            second, millisecond = second_millisecond.split(".")
-            media_duration = float(str(int(second) + 60 * (int(minute) + 60 * int(hour))) + "." + millisecond)
+            parsed_duration = parse_media_duration(line)
+            if parsed_duration is not None:
+                self.media_duration = parsed_duration
 
-    current_interval.end = media_duration
-    intervals.add_interval(current_interval)
+        return []
 
-    if silent_detect_progress_update is not None:
-        silent_detect_progress_update(media_duration, media_duration)
+    def finish(self):
+        """
+        Finishes parsing after the console output ended
+        :return: List of the silent part that lasts until the end of the (range of the) file (it is not always closed
+            by ffmpeg) or an empty list
+        """
+        if self.__silence_start is None:
+            return []
 
-    intervals.optimize(
-        kwargs.get('short_interval_threshold', 0.3),
-        kwargs.get('stretch_time', 0.25)
-    )
+        if self.__duration is None:
+            end = self.media_duration
+        else:
+            end = min(self.__start + self.__duration, self.media_duration)
 
-    return intervals
+        silent_run = (self.__silence_start, end)
+        self.__silence_start = None
+        return [silent_run]
+
+
+def detect_silent_runs_in_parallel(input_file: Path, media_duration: float, silence_level: float,
+                                     silence_time_threshold: float, threads: int, on_progress_update=None):
+    """
+    Splits the file into time ranges and detects silence in all of them simultaneously. The ranges overlap by more
+    than the silence time threshold, so every silent part that crosses a range boundary is detected completely by
+    the neighbouring ranges and can be merged afterwards
+    :param input_file: File where silence should be detected
+    :param media_duration: Duration of the media file (in seconds)
+    :param silence_level: Threshold of what should be classified as silent/audible (in dB)
+    :param silence_time_threshold: Minimum length of a silent part (in seconds)
+    :param threads: Number of time ranges that are detected simultaneously
+    :param on_progress_update: Function that should be called on progress update (called like: func(current, total))
+    :return: Sorted list of merged silent (start, end) tuples
+    """
+    ranges = split_into_ranges(media_duration, silence_time_threshold, threads)
+
+    progress_lock = threading.Lock()
+    range_progress = [0] * len(ranges)
+    total_progress = sum(range_duration for _, range_duration in ranges)
+
+    def update_range_progress(range_id):
+        """
+        Creates a progress handler for a single time range that reports the combined progress of all ranges
+        :param range_id: ID of the time range
+        :return: Handler function
+        """
+        def handler(current, total):
+            with progress_lock:
+                range_progress[range_id] = max(0, min(current, ranges[range_id][1]))
+                if on_progress_update is not None:
+                    on_progress_update(sum(range_progress) / total_progress * media_duration, media_duration)
+
+        return handler
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [
+            executor.submit(
+                detect_silent_runs,
+                input_file,
+                silence_level,
+                silence_time_threshold,
+                start=range_start,
+                duration=range_duration,
+                on_progress_update=update_range_progress(i)
+            )
+            for i, (range_start, range_duration) in enumerate(ranges)
+        ]
+        silent_runs = [silent_run for future in futures for silent_run in future.result()[0]]
+
+    return merge_silent_runs(silent_runs)
+
+
+def split_into_ranges(media_duration: float, silence_time_threshold: float, range_count: int):
+    """
+    Splits a file into time ranges for the parallel detection, the ranges overlap by more than the silence time
+    threshold
+    :param media_duration: Duration of the media file (in seconds)
+    :param silence_time_threshold: Minimum length of a silent part (in seconds)
+    :param range_count: Number of time ranges
+    :return: List of (start, duration) tuples (in seconds)
+    """
+    overlap = silence_time_threshold + 1
+    range_length = media_duration / range_count
+
+    ranges = []
+    for i in range(range_count):
+        range_start = max(i * range_length - overlap, 0)
+        range_end = min((i + 1) * range_length + overlap, media_duration)
+        ranges.append((range_start, range_end - range_start))
+
+    return ranges
+
+
+def merge_silent_runs(silent_runs: list, tolerance=0.001):
+    """
+    Merges overlapping or touching silent parts
+    :param silent_runs: List of silent (start, end) tuples (in seconds)
+    :param tolerance: Maximum gap (in seconds) between two silent parts that still counts as touching
+    :return: Sorted list of merged silent (start, end) tuples
+    """
+    merged_runs = []
+
+    for start, end in sorted(silent_runs):
+        if len(merged_runs) > 0 and start <= merged_runs[-1][1] + tolerance:
+            merged_runs[-1] = (merged_runs[-1][0], max(merged_runs[-1][1], end))
+        else:
+            merged_runs.append((start, end))
+
+    return merged_runs
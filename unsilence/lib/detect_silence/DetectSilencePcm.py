@@ -0,0 +1,318 @@
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from unsilence.lib.detect_silence.EnvelopeCache import EnvelopeCache
+from unsilence.lib.intervals.Intervals import Intervals
+from unsilence.lib.media_index.MediaIndexCache import load_cached_media_index
+from unsilence.lib.tools.media_duration import get_media_duration, parse_media_duration
+from unsilence.lib.tools.toolchain import get_ffmpeg_binary
+
+
+def detect_silence_pcm(input_file: Path, **kwargs):
+    """
+    Detects silence in a file by analyzing the raw audio samples instead of the silencedetect filter output, and
+    outputs the intervals (silent/not silent) as a lib.Intervals.Intervals object
+    :param input_file: File where silence should be detected
+    :param kwargs: Various Parameters, see below
+    :return: lib.Intervals.Intervals object
+
+    kwargs:
+        silence_level: Threshold of what should be classified as silent/audible (default -35) (in dB)
+        silence_time_threshold: Minimum length of a silent part (default 0.5) (in seconds)
+        short_interval_threshold : The shortest allowed interval length (default: 0.3) (in seconds)
+        stretch_time: Time the interval should be enlarged/shrunken (default 0.25) (in seconds)
+        on_silence_detect_progress_update: Function that should be called on progress update
+            (called like: func(current, total))
+        sample_rate: Sample rate the audio is resampled to before it is analyzed (default 8000) (in Hz)
+        window_duration: Length of the windows the loudness is calculated for (default 0.01) (in seconds)
+        threads: Number of time ranges of the file that are analyzed simultaneously (default 1)
+        envelope_cache_dir: Directory where the loudness envelope of the file is persisted, so later calls (e.g.
+            with different thresholds) do not need to decode the file again (default None, nothing is persisted)
+        media_index_cache_dir: Directory where the keyframe indexes of files are persisted, the media duration is taken
+            from the index of the file if it was indexed before (default None)
+    """
+    input_file = Path(input_file).absolute()
+
+    if not input_file.exists():
+        raise FileNotFoundError(f"Input file {input_file} does not exist!")
+
+    sample_rate = kwargs.get("sample_rate", 8000)
+    window_duration = kwargs.get("window_duration", 0.01)
+    on_progress_update = kwargs.get("on_silence_detect_progress_update", None)
+
+    envelope_cache = None
+    cached_envelope = None
+    if kwargs.get("envelope_cache_dir", None) is not None:
+        envelope_cache = EnvelopeCache(kwargs["envelope_cache_dir"])
+        cached_envelope = envelope_cache.load(input_file, sample_rate, window_duration)
+
+    if cached_envelope is not None:
+        envelope, media_duration = cached_envelope
+
+        if on_progress_update is not None:
+            on_progress_update(media_duration, media_duration)
+    else:
+        threads = kwargs.get("threads", 1)
+        media_duration = None
+        if threads > 1:
+            # The duration of an already indexed file is known without probing it again
+            media_index = load_cached_media_index(input_file, kwargs.get("media_index_cache_dir", None))
+            if media_index is not None:
+                media_duration = media_index.media_duration
+            if media_duration is None:
+                media_duration = get_media_duration(input_file)
+
+        if media_duration is None:
+            envelope, media_duration = calculate_loudness_envelope(
+                input_file,
+                sample_rate=sample_rate,
+                window_duration=window_duration,
+                on_progress_update=on_progress_update
+            )
+        else:
+            envelope = calculate_loudness_envelope_in_parallel(
+                input_file,
+                media_duration,
+                sample_rate,
+                window_duration,
+                threads,
+                on_progress_update
+            )
+
+        if envelope_cache is not None:
+            envelope_cache.save(input_file, sample_rate, window_duration, envelope, media_duration)
+
+    intervals = intervals_from_envelope(
+        envelope,
+        window_duration,
+        media_duration,
+        silence_level=kwargs.get("silence_level", -35),
+        silence_time_threshold=kwargs.get("silence_time_threshold", 0.5)
+    )
+
+    intervals.optimize(
+        kwargs.get('short_interval_threshold', 0.3),
+        kwargs.get('stretch_time', 0.25)
+    )
+
+    return intervals
+
+
+def calculate_loudness_envelope(input_file: Path, sample_rate=8000, window_duration=0.01, start=0, duration=None,
+                                on_progress_update=None):
+    """
+    Decodes the audio track of a file to mono PCM and calculates the loudness (RMS in dB) of consecutive windows
+    :param input_file: File that should be analyzed
+    :param sample_rate: Sample rate the audio is resampled to (in Hz)
+    :param window_duration: Length of a window (in seconds)
+    :param start: Time (in seconds) where the analysis should start, the input is seeked to this position
+    :param duration: How long (in seconds) the analysis should run after the start (default: until the end)
+    :param on_progress_update: Function that should be called on progress update
+        (called like: func(current, total), current is relative to the start)
+    :return: Tuple of the envelope (numpy float32 array, one value in dB per window) and the duration of the complete
+        media file
+    """
+    window_size = max(1, int(round(sample_rate * window_duration)))
+    block_size = window_size * 4096
+    sample_size = np.dtype(np.float32).itemsize
+
+    ffmpeg_binary = get_ffmpeg_binary()
+    command = [ffmpeg_binary, "-nostats"]
+
+    if start > 0:
+        command.extend(["-ss", f"{start}"])
+
+    if duration is not None:
+        command.extend(["-t", f"{duration}"])
+
+    command.extend([
+        "-i", str(input_file),
+        "-vn",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-f", "f32le",
+        "-"
+    ])
+
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+
+    # The stderr output has to be consumed simultaneously, otherwise ffmpeg blocks as soon as the pipe is full
+    console_output = SimpleNamespace(media_duration=None, lines=[])
+
+    def read_console_output():
+        """
+        Nested function that reads the ffmpeg console output and extracts the media duration
+        :return: None
+        """
+        for line in process.stderr:
+            line = line.decode(errors="replace")
+            console_output.lines.append(line)
+            if console_output.media_duration is None and "Duration" in line:
+                console_output.media_duration = parse_media_duration(line)
+
+    console_thread = threading.Thread(target=read_console_output, daemon=True)
+    console_thread.start()
+
+    envelope_blocks = []
+    remainder = np.empty(0, dtype=np.float32)
+    sample_count = 0
+
+    while True:
+        data = process.stdout.read(block_size * sample_size)
+        if not data:
+            break
+
+        samples = np.frombuffer(data[:len(data) - len(data) % sample_size], dtype=np.float32)
+        sample_count += len(samples)
+
+        if len(remainder) > 0:
+            samples = np.concatenate((remainder, samples))
+
+        full_windows = len(samples) // window_size
+        remainder = samples[full_windows * window_size:]
+        envelope_blocks.append(calculate_window_loudness(samples[:full_windows * window_size], window_size))
+
+        progress_total = duration if duration is not None else console_output.media_duration
+        if on_progress_update is not None and progress_total is not None:
+            on_progress_update(min(sample_count / sample_rate, progress_total), progress_total)
+
+    if len(remainder) > 0:
+        envelope_blocks.append(calculate_window_loudness(remainder, len(remainder)))
+
+    process.wait()
+    console_thread.join()
+
+    if process.returncode != 0:
+        raise IOError(f"Decoding the audio of {input_file} failed:\n{''.join(console_output.lines[-10:])}")
+
+    media_duration = console_output.media_duration
+    if media_duration is None:
+        media_duration = sample_count / sample_rate
+
+    if on_progress_update is not None:
+        progress_total = duration if duration is not None else media_duration
+        on_progress_update(progress_total, progress_total)
+
+    if len(envelope_blocks) == 0:
+        return np.empty(0, dtype=np.float32), media_duration
+
+    return np.concatenate(envelope_blocks), media_duration
+
+
+def calculate_loudness_envelope_in_parallel(input_file: Path, media_duration: float, sample_rate: int,
+                                            window_duration: float, threads: int, on_progress_update=None):
+    """
+    Splits the file into time ranges that are aligned to the windows, calculates the loudness envelopes of all ranges
+    simultaneously and joins them
+    :param input_file: File that should be analyzed
+    :param media_duration: Duration of the media file (in seconds)
+    :param sample_rate: Sample rate the audio is resampled to (in Hz)
+    :param window_duration: Length of a window (in seconds)
+    :param threads: Number of time ranges that are analyzed simultaneously
+    :param on_progress_update: Function that should be called on progress update (called like: func(current, total))
+    :return: The envelope of the complete file (numpy float32 array, one value in dB per window)
+    """
+    total_windows = int(np.ceil(media_duration / window_duration))
+    if total_windows == 0:
+        return np.empty(0, dtype=np.float32)
+
+    windows_per_range = int(np.ceil(total_windows / threads))
+    range_window_counts = [
+        min(windows_per_range, total_windows - i * windows_per_range)
+        for i in range(threads) if i * windows_per_range < total_windows
+    ]
+
+    progress_lock = threading.Lock()
+    range_progress = [0] * len(range_window_counts)
+
+    def update_range_progress(range_id):
+        """
+        Creates a progress handler for a single time range that reports the combined progress of all ranges
+        :param range_id: ID of the time range
+        :return: Handler function
+        """
+        def handler(current, total):
+            with progress_lock:
+                range_progress[range_id] = current
+                if on_progress_update is not None:
+                    on_progress_update(min(sum(range_progress), media_duration), media_duration)
+
+        return handler
+
+    def calculate_range_envelope(range_id):
+        """
+        Calculates the envelope of a single time range, it always contains exactly the expected number of windows
+        :param range_id: ID of the time range
+        :return: The envelope of the time range
+        """
+        window_count = range_window_counts[range_id]
+        range_envelope, _ = calculate_loudness_envelope(
+            input_file,
+            sample_rate=sample_rate,
+            window_duration=window_duration,
+            start=range_id * windows_per_range * window_duration,
+            duration=window_count * window_duration,
+            on_progress_update=update_range_progress(range_id)
+        )
+
+        # The decoders can return a few samples more or less than requested, which must not shift the later ranges
+        if len(range_envelope) < window_count:
+            padding_value = range_envelope[-1] if len(range_envelope) > 0 else -120
+            range_envelope = np.concatenate(
+                (range_envelope, np.full(window_count - len(range_envelope), padding_value, dtype=np.float32))
+            )
+
+        return range_envelope[:window_count]
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        range_envelopes = list(executor.map(calculate_range_envelope, range(len(range_window_counts))))
+
+    return np.concatenate(range_envelopes)
+
+
+def intervals_from_envelope(envelope: np.ndarray, window_duration: float, media_duration: float, silence_level=-35,
+                            silence_time_threshold=0.5):
+    """
+    Derives the silent and audible intervals from a loudness envelope. Runs of windows quieter than the silence level
+    that last at least the silence time threshold are silent, everything else is audible
+    :param envelope: Loudness envelope (one value in dB per window)
+    :param window_duration: Length of a window (in seconds)
+    :param media_duration: Duration of the media file (in seconds)
+    :param silence_level: Threshold of what should be classified as silent/audible (in dB)
+    :param silence_time_threshold: Minimum length of a silent part (in seconds)
+    :return: lib.Intervals.Intervals object (not optimized yet)
+    """
+    is_silent = np.concatenate(([False], np.asarray(envelope) < silence_level, [False]))
+    changes = np.flatnonzero(is_silent[1:] != is_silent[:-1])
+    run_starts = changes[0::2]
+    run_ends = changes[1::2]
+
+    long_runs = (run_ends - run_starts) * window_duration >= silence_time_threshold
+    starts = run_starts[long_runs] * window_duration
+    ends = np.minimum(run_ends[long_runs] * window_duration, media_duration)
+
+    return Intervals.from_silent_runs(np.stack((starts, ends), axis=1), media_duration)
+
+
+def calculate_window_loudness(samples: np.ndarray, window_size: int):
+    """
+    Calculates the RMS loudness (in dB) of consecutive windows
+    :param samples: Samples (the length has to be a multiple of the window size)
+    :param window_size: Number of samples per window
+    :return: numpy float32 array with one value per window
+    """
+    if len(samples) == 0:
+        return np.empty(0, dtype=np.float32)
+
+    windows = samples.reshape(-1, window_size).astype(np.float64)
+    mean_square = np.einsum("ij,ij->i", windows, windows) / window_size
+    return (10 * np.log10(mean_square + 1e-12)).astype(np.float32)
@@ -0,0 +1,91 @@
+import hashlib
+import json
+from pathlib import Path
+
+from unsilence.lib.intervals.Intervals import Intervals
+from unsilence.lib.tools.FileCache import FileCache
+from unsilence.lib.tools.fingerprint import file_fingerprint
+
+
+class DetectionCache:
+    """
+    Caches the detected Intervals of files, keyed by a fingerprint of the file and the detection options
+    """
+
+    # Options that do not change the detected Intervals
+    IGNORED_OPTIONS = ["threads", "envelope_cache_dir", "media_index_cache_dir"]
+
+    # Defaults of lib.DetectSilence.detect_silence, a detection with the default values and one that passes them
+    # explicitly (like the command line) share their cache entry
+    DEFAULT_OPTIONS = {
+        "silence_level": -35,
+        "silence_time_threshold": 0.5,
+        "short_interval_threshold": 0.3,
+        "stretch_time": 0.25,
+        "detection_engine": "silencedetect",
+    }
+
+    def __init__(self, cache_dir: Path, max_size: int = 64 * 1024 * 1024):
+        """
+        Initializes a new DetectionCache
+        :param cache_dir: Directory where the Intervals should be stored
+        :param max_size: Maximum size of all cached Intervals together (in bytes), None means unlimited
+        """
+        self.__file_cache = FileCache(cache_dir, max_size)
+
+    def load(self, input_file: Path, detect_options: dict):
+        """
+        Loads the cached Intervals of a file
+        :param input_file: The file silence was detected in
+        :param detect_options: The options that were passed to the detection (see lib.DetectSilence.detect_silence)
+        :return: lib.Intervals.Intervals object or None if there are no cached Intervals
+        """
+        cached_file = self.__file_cache.get(DetectionCache.__get_name(input_file, detect_options))
+        if cached_file is None:
+            return None
+
+        try:
+            with open(cached_file, "rb") as file:
+                return Intervals.from_bytes(file.read())
+        except (OSError, ValueError):
+            return None
+
+    def save(self, input_file: Path, detect_options: dict, intervals: Intervals):
+        """
+        Saves the detected Intervals of a file
+        :param input_file: The file silence was detected in
+        :param detect_options: The options that were passed to the detection (see lib.DetectSilence.detect_silence)
+        :param intervals: The detected Intervals
+        :return: None
+        """
+        self.__file_cache.put_bytes(
+            DetectionCache.__get_name(input_file, detect_options),
+            intervals.to_bytes()
+        )
+
+    def get_statistics(self):
+        """
+        Gets the hit/miss statistics and the size of the cache
+        :return: Statistics dict (hits, misses, size, max_size)
+        """
+        return self.__file_cache.get_statistics()
+
+    @staticmethod
+    def __get_name(input_file: Path, detect_options: dict):
+        """
+        Gets the name of the cache file for a file and the detection options
+        :param input_file: The file silence was detected in
+        :param detect_options: The options that were passed to the detection
+        :return: Name of the cache file
+        """
+        relevant_options = dict(DetectionCache.DEFAULT_OPTIONS)
+        relevant_options.update({
+            key: value for key, value in detect_options.items()
+            if not key.startswith("on_") and key not in DetectionCache.IGNORED_OPTIONS
+        })
+        options_hash = hashlib.blake2b(
+            json.dumps(relevant_options, sort_keys=True, default=str).encode(),
+            digest_size=8
+        ).hexdigest()
+
+        return f"{file_fingerprint(input_file)}_{options_hash}.intervals"
@@ -0,0 +1,86 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from unsilence.lib.tools.FileCache import FileCache
+from unsilence.lib.tools.fingerprint import file_fingerprint
+
+
+class EnvelopeCache:
+    """
+    Persists loudness envelopes as .npy sidecar files, so silence can be re-detected with different thresholds without
+    decoding the media file again
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int = 512 * 1024 * 1024):
+        """
+        Initializes a new EnvelopeCache
+        :param cache_dir: Directory where the envelopes should be stored
+        :param max_size: Maximum size of all envelopes together (in bytes), None means unlimited
+        """
+        self.__file_cache = FileCache(cache_dir, max_size)
+
+    def load(self, input_file: Path, sample_rate: int, window_duration: float):
+        """
+        Loads a previously saved envelope of a file (memory-mapped, so loading is instant even for long files)
+        :param input_file: The file the envelope was calculated for
+        :param sample_rate: Sample rate the audio was resampled to (in Hz)
+        :param window_duration: Length of a window (in seconds)
+        :return: Tuple of the envelope and the media duration, or None if no envelope is saved for this file
+        """
+        name = EnvelopeCache.__get_name(input_file, sample_rate, window_duration)
+
+        metadata_file = self.__file_cache.get(f"{name}.json")
+        if metadata_file is None:
+            return None
+
+        envelope_file = self.__file_cache.get(f"{name}.npy")
+        if envelope_file is None:
+            return None
+
+        try:
+            with open(metadata_file) as file:
+                metadata = json.load(file)
+            envelope = np.load(envelope_file, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+        return envelope, metadata["media_duration"]
+
+    def save(self, input_file: Path, sample_rate: int, window_duration: float, envelope: np.ndarray,
+             media_duration: float):
+        """
+        Saves the envelope of a file
+        :param input_file: The file the envelope was calculated for
+        :param sample_rate: Sample rate the audio was resampled to (in Hz)
+        :param window_duration: Length of a window (in seconds)
+        :param envelope: The loudness envelope
+        :param media_duration: Duration of the media file (in seconds)
+        :return: None
+        """
+        name = EnvelopeCache.__get_name(input_file, sample_rate, window_duration)
+
+        temp_envelope_file = self.__file_cache.create_temp_path(".npy")
+        np.save(temp_envelope_file, np.asarray(envelope, dtype=np.float32))
+
+        self.__file_cache.put(f"{name}.npy", temp_envelope_file)
+        self.__file_cache.put_bytes(f"{name}.json", json.dumps({"media_duration": media_duration}).encode())
+
+    def get_statistics(self):
+        """
+        Gets the hit/miss statistics and the size of the cache
+        :return: Statistics dict (hits, misses, size, max_size)
+        """
+        return self.__file_cache.get_statistics()
+
+    @staticmethod
+    def __get_name(input_file: Path, sample_rate: int, window_duration: float):
+        """
+        Gets the name of the sidecar files of an envelope (without suffix)
+        :param input_file: The file the envelope was calculated for
+        :param sample_rate: Sample rate the audio was resampled to (in Hz)
+        :param window_duration: Length of a window (in seconds)
+        :return: Name of the sidecar files
+        """
+        return f"{file_fingerprint(input_file)}_{sample_rate}_{round(window_duration * 1000000)}"
@@ -0,0 +1,369 @@
+import math
+import os
+import pathlib
+import subprocess
+import xml.etree.ElementTree as ElementTree
+from fractions import Fraction
+from types import SimpleNamespace
+from xml.dom import minidom
+
+from unsilence.lib.intervals.Intervals import Intervals
+from unsilence.lib.media_index.MediaIndexCache import load_cached_media_index
+from unsilence.lib.render_media.CutRenderer import generate_concat_script
+from unsilence.lib.render_media.IntervalRenderer import IntervalRenderer
+from unsilence.lib.render_media.MediaRenderer import MediaRenderer
+from unsilence.lib.tools.toolchain import get_ffprobe_binary
+
+# Formats of the edit decision lists, chosen by the file extension of the output
+EDIT_DECISION_LIST_FORMATS = {
+    ".edl": "cmx3600",
+    ".fcpxml": "fcpxml",
+    ".mlt": "mlt",
+}
+
+# Frame rate of the timecodes if the input has no video stream
+DEFAULT_FRAME_RATE = Fraction(25)
+
+
+def export_edit_decision_list(input_file: pathlib.Path, output_file: pathlib.Path, intervals: Intervals, **kwargs):
+    """
+    Exports the intervals with their speeds and volumes as an edit decision list instead of rendering them, so they
+    can be edited further in a video editor. An ffconcat script with the same cuts is written next to it
+    :param input_file: The file the intervals belong to
+    :param output_file: Where the edit decision list should be saved
+    :param intervals: The Intervals that should be exported
+    :param kwargs: Keyword Args, see below (and the render options of
+        lib.render_media.MediaRenderer.MediaRenderer.render(), e.g. audible_speed or silent_volume)
+    :return: None
+
+    kwargs:
+        edit_decision_list_format: "cmx3600", "fcpxml" or "mlt" (default: chosen by the file extension of the output)
+        frame_rate: Frame rate of the timecodes (str like "30000/1001" or number, default: the frame rate of the
+            input)
+        concat_file: Where the ffconcat script should be saved (default: the output file with the extension
+            .ffconcat, None skips it)
+        media_index_cache_dir: Directory where the keyframe indexes of files are persisted, the frame rate is taken
+            from the index of the input if it was indexed before (default None)
+    """
+    input_file = pathlib.Path(input_file).absolute()
+    output_file = pathlib.Path(output_file)
+
+    edit_decision_list_format = kwargs.get("edit_decision_list_format", None)
+    if edit_decision_list_format is None:
+        edit_decision_list_format = EDIT_DECISION_LIST_FORMATS.get(output_file.suffix.lower(), None)
+
+    if edit_decision_list_format not in EDIT_DECISION_LIST_FORMATS.values():
+        raise ValueError(f"Unknown edit decision list format for {output_file.name}")
+
+    render_options = MediaRenderer.get_render_options(**kwargs)
+
+    frame_rate = kwargs.get("frame_rate", None)
+    if frame_rate is None:
+        frame_rate = get_frame_rate(input_file, kwargs.get("media_index_cache_dir", None))
+    frame_rate = Fraction(frame_rate).limit_denominator(1001)
+
+    intervals = intervals.remove_short_intervals_from_start(render_options.audible_speed, render_options.silent_speed)
+    edits = get_edits(intervals, render_options, frame_rate)
+
+    if edit_decision_list_format == "cmx3600":
+        content = generate_cmx3600(input_file, edits, frame_rate, render_options.audio_only)
+    elif edit_decision_list_format == "fcpxml":
+        content = generate_fcpxml(input_file, edits, frame_rate, render_options.audio_only)
+    else:
+        content = generate_mlt(input_file, edits, frame_rate, render_options.audio_only)
+
+    os.makedirs(output_file.parent, exist_ok=True)
+
+    with open(output_file, "w", encoding="utf-8") as file:
+        file.write(content)
+
+    concat_file = kwargs.get("concat_file", output_file.with_suffix(".ffconcat"))
+    if concat_file is not None:
+        with open(concat_file, "w", encoding="utf-8") as file:
+            file.write(generate_concat_script(
+                [(input_file, edit.start, edit.end) for edit in edits],
+                [f"speed {round(edit.speed, 4)} volume {edit.volume}" for edit in edits]
+            ))
+
+
+def get_edits(intervals: Intervals, render_options: SimpleNamespace, frame_rate: Fraction):
+    """
+    Converts the intervals into edits on a frame grid, with the speeds and volumes the intervals would be rendered with
+    :param intervals: The Intervals that should be converted
+    :param render_options: The parameters on how the media should be processed
+    :param frame_rate: Frame rate of the grid
+    :return: List of edits (with start, end, speed, volume, is_silent, source_in, source_out, record_in and
+        record_out, the last four in frames, the outs are exclusive)
+    """
+    edits = []
+    record_frame = 0
+
+    for interval in intervals.intervals:
+        speed, volume = IntervalRenderer.get_speed_and_volume(interval, render_options)
+
+        source_in = int(round(interval.start * frame_rate))
+        source_out = int(round(interval.end * frame_rate))
+        record_duration = int(round((source_out - source_in) / speed))
+        if record_duration <= 0:
+            continue
+
+        edits.append(SimpleNamespace(
+            start=interval.start,
+            end=interval.end,
+            speed=speed,
+            volume=volume,
+            is_silent=interval.is_silent,
+            source_in=source_in,
+            source_out=source_out,
+            record_in=record_frame,
+            record_out=record_frame + record_duration
+        ))
+
+        record_frame += record_duration
+
+    return edits
+
+
+def generate_cmx3600(input_file: pathlib.Path, edits: list, frame_rate: Fraction, audio_only: bool):
+    """
+    Generates a CMX3600 edit decision list, speed changes are written as M2 motion effects and volume changes as
+    audio level comments
+    :param input_file: The file the edits belong to
+    :param edits: List of edits, see get_edits()
+    :param frame_rate: Frame rate of the timecodes
+    :param audio_only: Whether only the audio track should be edited
+    :return: The edit decision list
+    """
+    timebase = int(round(frame_rate))
+    reel = "AX"
+    track = "AA" if audio_only else "AA/V"
+
+    lines = [f"TITLE: {input_file.stem}", "FCM: NON-DROP FRAME", ""]
+
+    for event, edit in enumerate(edits, start=1):
+        source_in = format_timecode(edit.source_in, timebase)
+        source_out = format_timecode(edit.source_out, timebase)
+        record_in = format_timecode(edit.record_in, timebase)
+        record_out = format_timecode(edit.record_out, timebase)
+
+        lines.append(f"{event:03d}  {reel:<8} {track:<5} C        {source_in} {source_out} {record_in} {record_out}")
+
+        if edit.speed != 1:
+            lines.append(f"M2   {reel:<8}      {float(edit.speed * frame_rate):05.1f}                {source_in}")
+
+        lines.append(f"* FROM CLIP NAME: {input_file.name}")
+
+        if edit.volume != 1:
+            lines.append(f"* AUDIO LEVEL AT {record_in} IS {volume_to_decibel(edit.volume):.2f} DB  (REEL {reel} A1)")
+
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def generate_fcpxml(input_file: pathlib.Path, edits: list, frame_rate: Fraction, audio_only: bool):
+    """
+    Generates a Final Cut Pro XML (1.9) project, speed changes are written as time maps and volume changes as volume
+    adjustments of the clips
+    :param input_file: The file the edits belong to
+    :param edits: List of edits, see get_edits()
+    :param frame_rate: Frame rate of the sequence
+    :param audio_only: Whether only the audio track should be edited
+    :return: The FCPXML document
+    """
+    frame_duration = 1 / frame_rate
+    total_frames = edits[-1].record_out if len(edits) > 0 else 0
+    asset_frames = max((edit.source_out for edit in edits), default=0)
+
+    def rational_time(frames):
+        """
+        Nested function that formats a number of frames as rational time
+        :param frames: Number of frames
+        :return: Time string (e.g. "1001/30000s")
+        """
+        time = Fraction(frames) * frame_duration
+        return f"{time.numerator}s" if time.denominator == 1 else f"{time.numerator}/{time.denominator}s"
+
+    root = ElementTree.Element("fcpxml", version="1.9")
+    resources = ElementTree.SubElement(root, "resources")
+    ElementTree.SubElement(resources, "format", id="r1", frameDuration=rational_time(1))
+    asset = ElementTree.SubElement(
+        resources, "asset",
+        id="r2",
+        name=input_file.stem,
+        start="0s",
+        duration=rational_time(asset_frames),
+        hasVideo="0" if audio_only else "1",
+        hasAudio="1",
+        format="r1"
+    )
+    ElementTree.SubElement(asset, "media-rep", kind="original-media", src=input_file.as_uri())
+
+    library = ElementTree.SubElement(root, "library")
+    event = ElementTree.SubElement(library, "event", name="Unsilence")
+    project = ElementTree.SubElement(event, "project", name=input_file.stem)
+    sequence = ElementTree.SubElement(
+        project, "sequence", format="r1", duration=rational_time(total_frames), tcStart="0s", tcFormat="NDF"
+    )
+    spine = ElementTree.SubElement(sequence, "spine")
+
+    for edit in edits:
+        # The clip times are in the retimed timeline of the clip, the time map links it to the asset
+        clip = ElementTree.SubElement(
+            spine, "asset-clip",
+            ref="r2",
+            name=input_file.stem,
+            offset=rational_time(edit.record_in),
+            start=rational_time(int(round(edit.source_in / edit.speed))),
+            duration=rational_time(edit.record_out - edit.record_in),
+            format="r1",
+            tcFormat="NDF"
+        )
+
+        if edit.volume != 1:
+            ElementTree.SubElement(clip, "adjust-volume", amount=f"{volume_to_decibel(edit.volume):.2f}dB")
+
+        if edit.speed != 1:
+            time_map = ElementTree.SubElement(clip, "timeMap")
+            ElementTree.SubElement(time_map, "timept", time="0s", value="0s", interp="linear")
+            ElementTree.SubElement(
+                time_map, "timept",
+                time=rational_time(int(round(asset_frames / edit.speed))),
+                value=rational_time(asset_frames),
+                interp="linear"
+            )
+
+    document = minidom.parseString(ElementTree.tostring(root, encoding="unicode"))
+    content = document.toprettyxml(indent="    ", encoding="UTF-8").decode("utf-8")
+
+    return content.replace("?>", "?>\n<!DOCTYPE fcpxml>", 1)
+
+
+def generate_mlt(input_file: pathlib.Path, edits: list, frame_rate: Fraction, audio_only: bool):
+    """
+    Generates an MLT XML project (e.g. for Shotcut, Kdenlive or melt), speed changes are written as timewarp
+    producers and volume changes as volume filters of the playlist entries
+    :param input_file: The file the edits belong to
+    :param edits: List of edits, see get_edits()
+    :param frame_rate: Frame rate of the profile
+    :param audio_only: Whether only the audio track should be edited
+    :return: The MLT XML document
+    """
+    root = ElementTree.Element("mlt", LC_NUMERIC="C", producer="tractor0")
+    ElementTree.SubElement(
+        root, "profile",
+        frame_rate_num=str(frame_rate.numerator),
+        frame_rate_den=str(frame_rate.denominator)
+    )
+
+    def add_properties(element, properties):
+        """
+        Nested function that adds MLT properties to an element
+        :param element: The element
+        :param properties: Dict of the property names and values
+        :return: None
+        """
+        for name, value in properties.items():
+            ElementTree.SubElement(element, "property", name=name).text = str(value)
+
+    # Every speed needs its own producer, the frames of a timewarp producer are in its retimed timeline
+    producers = {}
+    for edit in edits:
+        if edit.speed in producers:
+            continue
+
+        producer_id = f"producer{len(producers)}"
+        producer = ElementTree.SubElement(root, "producer", id=producer_id)
+
+        if edit.speed == 1:
+            add_properties(producer, {"resource": input_file.as_posix(), "mlt_service": "avformat"})
+        else:
+            add_properties(producer, {
+                "resource": f"{round(edit.speed, 4)}:{input_file.as_posix()}",
+                "mlt_service": "timewarp",
+                "warp_speed": round(edit.speed, 4),
+                "warp_resource": input_file.as_posix()
+            })
+
+        if audio_only:
+            add_properties(producer, {"video_index": -1})
+
+        producers[edit.speed] = producer_id
+
+    playlist = ElementTree.SubElement(root, "playlist", id="playlist0")
+    for edit in edits:
+        entry_in = int(round(edit.source_in / edit.speed))
+        entry = ElementTree.SubElement(
+            playlist, "entry",
+            producer=producers[edit.speed],
+            # MLT frame ranges are inclusive
+            **{"in": str(entry_in), "out": str(entry_in + edit.record_out - edit.record_in - 1)}
+        )
+
+        if edit.volume != 1:
+            volume_filter = ElementTree.SubElement(entry, "filter")
+            add_properties(volume_filter, {"mlt_service": "volume", "gain": edit.volume})
+
+    tractor = ElementTree.SubElement(root, "tractor", id="tractor0")
+    ElementTree.SubElement(tractor, "track", producer="playlist0")
+
+    document = minidom.parseString(ElementTree.tostring(root, encoding="unicode"))
+    return document.toprettyxml(indent="    ", encoding="utf-8").decode("utf-8")
+
+
+def get_frame_rate(input_file: pathlib.Path, media_index_cache_dir: pathlib.Path = None):
+    """
+    Gets the frame rate of the first video stream of a file, from its cached index if it was indexed before
+    :param input_file: The media file
+    :param media_index_cache_dir: Directory where the keyframe indexes of files are persisted
+    :return: Frame rate (Fraction), DEFAULT_FRAME_RATE if the file has no video stream
+    """
+    media_index = load_cached_media_index(input_file, media_index_cache_dir)
+    if media_index is not None:
+        video_stream = media_index.streams.get("video", None)
+        frame_rate = video_stream.get("r_frame_rate", None) if video_stream is not None else None
+    else:
+        ffprobe_binary = get_ffprobe_binary()
+
+        frame_rate = subprocess.run(
+            [
+                ffprobe_binary,
+                "-loglevel", "error",
+                "-select_streams", "v:0",
+                "-show_entries", "stream=r_frame_rate",
+                "-of", "default=noprint_wrappers=1:nokey=1",
+                f"{input_file}"
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True
+        ).stdout.strip()
+
+    try:
+        frame_rate = Fraction(frame_rate).limit_denominator(1001)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return DEFAULT_FRAME_RATE
+
+    return frame_rate if frame_rate > 0 else DEFAULT_FRAME_RATE
+
+
+def format_timecode(frame: int, timebase: int):
+    """
+    Formats a frame number as a non-drop-frame timecode
+    :param frame: Frame number
+    :param timebase: Frames per timecode second
+    :return: Timecode (HH:MM:SS:FF)
+    """
+    seconds, frames = divmod(frame, timebase)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}:{frames:02d}"
+
+
+def volume_to_decibel(volume: float):
+    """
+    Converts a linear volume factor to decibel
+    :param volume: Volume factor (1 keeps the volume)
+    :return: Gain in decibel (-96 for silence)
+    """
+    return 20 * math.log10(volume) if volume > 0 else -96.0
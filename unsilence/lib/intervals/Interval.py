@@ -3,6 +3,8 @@ class Interval:
     Represents a section in time where the media file is either silent or audible
     """
 
+    __slots__ = ("__start", "__end", "is_silent")
+
     def __init__(self, start=0, end=0, is_silent=False):
         """
         Initializes an Interval object
@@ -12,7 +14,6 @@ class Interval:
         """
         self.__start = start
         self.__end = end
-        self.__duration = self.__end - self.__start
         self.is_silent = is_silent
 
     @property
@@ -26,12 +27,11 @@ class Interval:
     @start.setter
     def start(self, new_start):
         """
-        Sets the new start time and updates the duration
+        Sets the new start time
         :param new_start: start time in seconds
         :return: None
         """
         self.__start = new_start
-        self.__duration = self.__end - self.__start
 
     @property
     def end(self):
@@ -44,12 +44,11 @@ class Interval:
     @end.setter
     def end(self, new_end):
         """
-        Sets the new end time and updates the duration
-        :param new_end: start time in seconds
+        Sets the new end time
+        :param new_end: end time in seconds
         :return: None
         """
         self.__end = new_end
-        self.__duration = self.__end - self.__start
 
     @property
     def duration(self):
@@ -57,7 +56,7 @@ class Interval:
         Returns the duration of the interval
         :return: Duration of the interval
         """
-        return self.__duration
+        return self.end - self.start
 
     def enlarge_audible_interval(self, stretch_time, is_start_interval=False, is_end_interval=False):
         """
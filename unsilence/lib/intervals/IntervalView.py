@@ -0,0 +1,70 @@
+from unsilence.lib.intervals.Interval import Interval
+
+
+class IntervalView(Interval):
+    """
+    Interval that reads and writes its values from/to a row of the arrays of a lib.Intervals.Intervals collection,
+    so changes to the view are applied to the collection
+    """
+
+    __slots__ = ("__intervals", "__index")
+
+    def __init__(self, intervals, index: int):
+        """
+        Initializes a view of an interval of a collection
+        :param intervals: The lib.Intervals.Intervals collection the interval belongs to
+        :param index: Position of the interval in the collection
+        """
+        self.__intervals = intervals
+        self.__index = index
+
+    @property
+    def start(self):
+        """
+        Get the start time
+        :return: start time in seconds
+        """
+        return float(self.__intervals.starts[self.__index])
+
+    @start.setter
+    def start(self, new_start):
+        """
+        Sets the new start time
+        :param new_start: start time in seconds
+        :return: None
+        """
+        self.__intervals.starts[self.__index] = new_start
+
+    @property
+    def end(self):
+        """
+        Get the end time
+        :return: end time in seconds
+        """
+        return float(self.__intervals.ends[self.__index])
+
+    @end.setter
+    def end(self, new_end):
+        """
+        Sets the new end time
+        :param new_end: end time in seconds
+        :return: None
+        """
+        self.__intervals.ends[self.__index] = new_end
+
+    @property
+    def is_silent(self):
+        """
+        Get whether the interval is silent
+        :return: Whether the interval is silent or not
+        """
+        return bool(self.__intervals.silent_flags[self.__index])
+
+    @is_silent.setter
+    def is_silent(self, new_is_silent):
+        """
+        Sets whether the interval is silent
+        :param new_is_silent: Whether the interval is silent or not
+        :return: None
+        """
+        self.__intervals.silent_flags[self.__index] = new_is_silent
@@ -1,11 +1,22 @@
+import struct
+
+import numpy as np
+
 from unsilence.lib.intervals.Interval import Interval
+from unsilence.lib.intervals.IntervalView import IntervalView
 
 
 class Intervals:
     """
-    Collection of lib.Intervals.Interval
+    Collection of lib.Intervals.Interval, stored as columns (start, end and silent flag arrays) so that even hundreds
+    of thousands of intervals can be processed without a Python object per interval
     """
 
+    # Header of the binary format: magic, version, reserved flags and number of intervals
+    __BINARY_HEADER = struct.Struct("<4sHHQ")
+    __BINARY_MAGIC = b"USIV"
+    __BINARY_VERSION = 1
+
     def __init__(self, interval_list: list = None):
         """
         Initializes a new Interval Collection
@@ -14,7 +25,33 @@ class Intervals:
         if interval_list is None:
             interval_list = []
 
-        self.__interval_list = interval_list
+        self.__length = len(interval_list)
+        capacity = max(self.__length, 16)
+        self.__starts = np.zeros(capacity, dtype=np.float64)
+        self.__ends = np.zeros(capacity, dtype=np.float64)
+        self.__silent_flags = np.zeros(capacity, dtype=bool)
+
+        for i, interval in enumerate(interval_list):
+            self.__starts[i] = interval.start
+            self.__ends[i] = interval.end
+            self.__silent_flags[i] = bool(interval.is_silent)
+
+    @staticmethod
+    def from_arrays(starts, ends, silent_flags):
+        """
+        Creates a new Instance from the columns of the intervals
+        :param starts: Start times of the intervals (in seconds)
+        :param ends: End times of the intervals (in seconds)
+        :param silent_flags: Whether the intervals are silent or not
+        :return: New instance of Intervals
+        """
+        intervals = Intervals()
+        intervals.__set_columns(
+            np.asarray(starts, dtype=np.float64),
+            np.asarray(ends, dtype=np.float64),
+            np.asarray(silent_flags, dtype=bool)
+        )
+        return intervals
 
     def add_interval(self, interval):
         """
@@ -22,15 +59,56 @@ class Intervals:
         :param interval: interval to be added
         :return: None
         """
-        self.__interval_list.append(interval)
+        if self.__length == len(self.__starts):
+            capacity = max(2 * len(self.__starts), 16)
+            self.__starts = np.resize(self.__starts, capacity)
+            self.__ends = np.resize(self.__ends, capacity)
+            self.__silent_flags = np.resize(self.__silent_flags, capacity)
+
+        self.__starts[self.__length] = interval.start
+        self.__ends[self.__length] = interval.end
+        self.__silent_flags[self.__length] = bool(interval.is_silent)
+        self.__length += 1
 
     @property
     def intervals(self):
         """
-        Returns the list of intervals
-        :return:
+        Returns the list of intervals, changing an interval of the list changes the collection
+        :return: List of lib.IntervalView.IntervalView objects
+        """
+        return [IntervalView(self, i) for i in range(self.__length)]
+
+    @property
+    def starts(self):
+        """
+        Returns the start times of all intervals, changing the array changes the collection
+        :return: numpy float64 array (in seconds)
+        """
+        return self.__starts[:self.__length]
+
+    @property
+    def ends(self):
+        """
+        Returns the end times of all intervals, changing the array changes the collection
+        :return: numpy float64 array (in seconds)
+        """
+        return self.__ends[:self.__length]
+
+    @property
+    def silent_flags(self):
+        """
+        Returns whether the intervals are silent, changing the array changes the collection
+        :return: numpy bool array
+        """
+        return self.__silent_flags[:self.__length]
+
+    @property
+    def durations(self):
+        """
+        Returns the durations of all intervals
+        :return: numpy float64 array (in seconds)
         """
-        return self.__interval_list
+        return self.ends - self.starts
 
     def optimize(self, short_interval_threshold=0.3, stretch_time=0.25):
         """
@@ -39,19 +117,96 @@ class Intervals:
         :param stretch_time: The time that should be added/removed from a audible/silent interval
         :return: None
         """
-        self.__combine_intervals(short_interval_threshold)
-        self.__enlarge_audible_intervals(stretch_time)
+        self.__set_columns(*Intervals.__combine_interval_arrays(
+            self.starts,
+            self.ends,
+            self.silent_flags,
+            short_interval_threshold
+        ))
+        self.__enlarge_audible_interval_arrays(stretch_time)
 
-    def __combine_intervals(self, short_interval_threshold):
+    @staticmethod
+    def __combine_interval_arrays(starts, ends, silent_flags, short_interval_threshold):
         """
-        Combines multiple intervals in order to remove intervals smaller than a threshold
+        Combines multiple intervals in order to remove intervals smaller than a threshold, all intervals at once.
+        Produces the same intervals as __combine_intervals: short intervals are merged into the preceding interval and
+        a new interval only starts where a long interval has another type than the previous long interval
+        :param starts: Start times of contiguous intervals
+        :param ends: End times of contiguous intervals
+        :param silent_flags: Whether the intervals are silent
         :param short_interval_threshold: Threshold for the shortest allowed interval
+        :return: Tuple of the start, end and silent flag arrays of the combined intervals
+        """
+        long_indices = np.flatnonzero(ends - starts > short_interval_threshold)
+        long_silent_flags = silent_flags[long_indices]
+
+        type_changes = np.flatnonzero(long_silent_flags[1:] != long_silent_flags[:-1]) + 1
+        first_indices = long_indices[type_changes]
+
+        first_silent_flag = long_silent_flags[:1] if len(long_indices) > 0 else np.zeros(1, dtype=bool)
+        last_end = ends[-1:] if len(ends) > 0 else np.zeros(1)
+
+        return (
+            np.concatenate(([0.0], starts[first_indices])),
+            np.concatenate((ends[first_indices - 1], last_end)),
+            np.concatenate((first_silent_flag, long_silent_flags[type_changes]))
+        )
+
+    def __enlarge_audible_interval_arrays(self, stretch_time):
+        """
+        Enlarges/Shrinks all intervals based on if they are silent or audible, like __enlarge_audible_intervals
+        :param stretch_time: Time the intervals should be enlarged/shrunken
         :return: None
         """
-        intervals = []
+        if np.any(stretch_time >= self.durations):
+            raise Exception("Stretch time to large, please choose smaller size")
+
+        stretch_time_parts = np.where(self.silent_flags, -1, 1) * stretch_time / 2
+
+        self.starts[1:] -= stretch_time_parts[1:]
+        self.ends[:-1] += stretch_time_parts[:-1]
+
+    def __set_columns(self, starts, ends, silent_flags, copy=True):
+        """
+        Replaces all intervals of the collection
+        :param starts: Start times of the intervals
+        :param ends: End times of the intervals
+        :param silent_flags: Whether the intervals are silent
+        :param copy: Whether the arrays should be copied, otherwise the collection uses them directly
+        :return: None
+        """
+        convert = np.array if copy else np.asarray
+
+        self.__length = len(starts)
+        self.__starts = convert(starts, dtype=np.float64)
+        self.__ends = convert(ends, dtype=np.float64)
+        self.__silent_flags = convert(silent_flags, dtype=bool)
+
+    @staticmethod
+    def optimize_stream(interval_iterator, short_interval_threshold=0.3, stretch_time=0.25):
+        """
+        Optimizes a stream of intervals like optimize(), but yields every interval as soon as it is final, so the
+        intervals can already be processed while the stream is still being generated. An interval is final as soon as
+        it can not be combined with the following intervals anymore
+        :param interval_iterator: Iterable of contiguous intervals (e.g. a generator)
+        :param short_interval_threshold: The shortest allowed interval length (in seconds)
+        :param stretch_time: The time that should be added/removed from a audible/silent interval
+        :return: Generator of optimized intervals
+        """
+        combined_intervals = Intervals.__combine_intervals(interval_iterator, short_interval_threshold)
+        return Intervals.__enlarge_audible_intervals(combined_intervals, stretch_time)
+
+    @staticmethod
+    def __combine_intervals(interval_iterator, short_interval_threshold):
+        """
+        Combines multiple intervals in order to remove intervals smaller than a threshold
+        :param interval_iterator: Iterable of contiguous intervals
+        :param short_interval_threshold: Threshold for the shortest allowed interval
+        :return: Generator of combined intervals
+        """
         current_interval = Interval(is_silent=None)
 
-        for interval in self.__interval_list:
+        for interval in interval_iterator:
             if interval.duration <= short_interval_threshold or current_interval.is_silent == interval.is_silent:
                 current_interval.end = interval.end
 
@@ -60,28 +215,41 @@ class Intervals:
                     current_interval.is_silent = interval.is_silent
                     current_interval.end = interval.end
                 else:
-                    intervals.append(current_interval)
+                    yield current_interval
                     current_interval = interval.copy()
 
         if current_interval.is_silent is None:
             current_interval.is_silent = False
 
-        intervals.append(current_interval)
+        yield current_interval
 
-        self.__interval_list = intervals
-
-    def __enlarge_audible_intervals(self, stretch_time):
+    @staticmethod
+    def __enlarge_audible_intervals(interval_iterator, stretch_time):
         """
         Enlarges/Shrinks intervals based on if they are silent or audible
+        :param interval_iterator: Iterable of combined intervals
         :param stretch_time: Time the intervals should be enlarged/shrunken
-        :return: None
+        :return: Generator of enlarged/shrunken intervals
         """
-        for i, interval in enumerate(self.__interval_list):
-            interval.enlarge_audible_interval(
+        previous_interval = None
+        is_start_interval = True
+
+        # Every interval is held back until the next one arrives, because the last interval must not be enlarged
+        for interval in interval_iterator:
+            if previous_interval is not None:
+                previous_interval.enlarge_audible_interval(stretch_time, is_start_interval=is_start_interval)
+                yield previous_interval
+                is_start_interval = False
+
+            previous_interval = interval
+
+        if previous_interval is not None:
+            previous_interval.enlarge_audible_interval(
                 stretch_time,
-                is_start_interval=(i == 0),
-                is_end_interval=(i == len(self.__interval_list) - 1)
+                is_start_interval=is_start_interval,
+                is_end_interval=True
             )
+            yield previous_interval
 
     def remove_short_intervals_from_start(self, audible_speed=1, silent_speed=2):
         """
@@ -91,46 +259,179 @@ class Intervals:
         :param silent_speed: The speed at which the silent intervals get played back at (float)
         :return: The new, possibly shorter, Intervals object
         """
-        for i, interval in enumerate(self.__interval_list):
-            if interval.is_silent:
-                speed = silent_speed
-            else:
-                speed = audible_speed
+        speeds = np.where(self.silent_flags, silent_speed, audible_speed)
+        long_indices = np.flatnonzero(self.durations / speeds > 0.5)
 
-            if interval.duration / speed > 0.5:
-                return Intervals(self.__interval_list[i:])
+        if len(long_indices) > 0:
+            i = long_indices[0]
+            return Intervals.from_arrays(self.starts[i:], self.ends[i:], self.silent_flags[i:])
 
         raise Exception("No interval has a length over 0.5 seconds after speed changes! This is required.")
 
+    @staticmethod
+    def from_silent_runs(silent_runs: list, media_duration: float):
+        """
+        Creates a new Instance from the silent parts of a media file, the gaps between them are audible
+        :param silent_runs: Sorted list (or n x 2 array) of non-overlapping (start, end) tuples of the silent parts (in
+            seconds)
+        :param media_duration: Duration of the media file (in seconds)
+        :return: New instance of Intervals
+        """
+        silent_runs = np.asarray(silent_runs, dtype=np.float64).reshape(-1, 2)
+        run_starts = silent_runs[:, 0]
+        run_ends = silent_runs[:, 1]
+        previous_ends = np.concatenate(([0.0], run_ends))[:-1]
+
+        # Every silent run is preceded by the audible gap since the previous run, empty gaps are dropped
+        starts = np.stack((previous_ends, run_starts), axis=1).ravel()
+        ends = np.stack((run_starts, run_ends), axis=1).ravel()
+        silent_flags = np.tile([False, True], len(silent_runs))
+        keep = np.stack((run_starts > previous_ends, np.ones(len(silent_runs), dtype=bool)), axis=1).ravel()
+
+        current_start = run_ends[-1] if len(silent_runs) > 0 else 0.0
+        if current_start < media_duration or len(silent_runs) == 0:
+            starts = np.append(starts[keep], current_start)
+            ends = np.append(ends[keep], media_duration)
+            silent_flags = np.append(silent_flags[keep], False)
+        else:
+            starts, ends, silent_flags = starts[keep], ends[keep], silent_flags[keep]
+
+        return Intervals.from_arrays(starts, ends, silent_flags)
+
+    @staticmethod
+    def iterate_from_silent_runs(silent_run_iterator):
+        """
+        Generates intervals from a stream of silent parts of a media file, the gaps between them are audible
+        :param silent_run_iterator: Generator of sorted, non-overlapping (start, end) tuples of the silent parts (in
+            seconds), that returns the duration of the media file when it is exhausted
+        :return: Generator of intervals
+        """
+        current_start = 0
+        is_empty = True
+
+        while True:
+            try:
+                start, end = next(silent_run_iterator)
+            except StopIteration as stop:
+                media_duration = stop.value
+                break
+
+            if start > current_start:
+                yield Interval(start=current_start, end=start, is_silent=False)
+            yield Interval(start=start, end=end, is_silent=True)
+            current_start = end
+            is_empty = False
+
+        if current_start < media_duration or is_empty:
+            yield Interval(start=current_start, end=media_duration, is_silent=False)
+
     def copy(self):
         """
         Creates a deep copy
         :return: Deep copy of Intervals
         """
-        new_interval_list = [interval.copy() for interval in self.__interval_list]
-
-        return Intervals(new_interval_list)
+        return Intervals.from_arrays(self.starts, self.ends, self.silent_flags)
 
     def serialize(self):
         """
         Serializes this collection
         :return: Serialized list
         """
-        return [interval.serialize() for interval in self.__interval_list]
+        return [
+            {"start": start, "end": end, "is_silent": is_silent}
+            for start, end, is_silent in zip(self.starts.tolist(), self.ends.tolist(), self.silent_flags.tolist())
+        ]
+
+    def to_bytes(self):
+        """
+        Serializes this collection into a compact binary format: a 16 byte header (magic "USIV", version, flags and
+        the number of intervals), the start and the end times as little-endian float64 arrays and the silent flags as
+        a packed bitmap
+        :return: Serialized bytes
+        """
+        header = Intervals.__BINARY_HEADER.pack(Intervals.__BINARY_MAGIC, Intervals.__BINARY_VERSION, 0, self.__length)
+
+        return b"".join([
+            header,
+            self.starts.astype("<f8").tobytes(),
+            self.ends.astype("<f8").tobytes(),
+            np.packbits(self.silent_flags, bitorder="little").tobytes()
+        ])
+
+    @staticmethod
+    def from_bytes(buffer, copy=True):
+        """
+        Creates a new Instance from the binary format of to_bytes()
+        :param buffer: Serialized bytes (any object that supports the buffer protocol, e.g. bytes, memoryview or mmap)
+        :param copy: Whether the start and end times should be copied, otherwise they are read-only views of the
+            buffer (no copy), which stay valid as long as the buffer does. Intervals can still be added and optimized,
+            but not changed in place
+        :raises: **ValueError** -- If the buffer is not in the binary format
+        :return: New instance of Intervals
+        """
+        buffer = memoryview(buffer).cast("B")
+        header_size = Intervals.__BINARY_HEADER.size
+
+        if len(buffer) < header_size:
+            raise ValueError("Buffer is too short to contain serialized Intervals")
+
+        magic, version, _, length = Intervals.__BINARY_HEADER.unpack_from(buffer)
+        if magic != Intervals.__BINARY_MAGIC or version != Intervals.__BINARY_VERSION:
+            raise ValueError("Buffer does not contain serialized Intervals")
+
+        flag_size = (length + 7) // 8
+        if len(buffer) < header_size + 16 * length + flag_size:
+            raise ValueError("Buffer is too short for the number of serialized Intervals")
+
+        starts = np.frombuffer(buffer, dtype="<f8", count=length, offset=header_size)
+        ends = np.frombuffer(buffer, dtype="<f8", count=length, offset=header_size + 8 * length)
+        packed_flags = np.frombuffer(buffer, dtype=np.uint8, count=flag_size, offset=header_size + 16 * length)
+
+        intervals = Intervals()
+        intervals.__set_columns(
+            starts,
+            ends,
+            np.unpackbits(packed_flags, count=length, bitorder="little").view(bool),
+            copy=copy
+        )
+        return intervals
 
     @staticmethod
     def deserialize(serialized_obj):
         """
         Deserializes a previously serialized object and creates a new Instance from it
-        :param serialized_obj: Serialized list
+        :param serialized_obj: Serialized list (or any iterable of serialized intervals, e.g. from
+            lib.intervals.JsonLines.read_json_lines) or bytes in the binary format of to_bytes()
         :return: New instance of Intervals
         """
-        interval_list = [Interval.deserialize(serialized_interval) for serialized_interval in serialized_obj]
-        return Intervals(interval_list)
+        if isinstance(serialized_obj, (bytes, bytearray, memoryview)):
+            return Intervals.from_bytes(serialized_obj)
+
+        serialized_obj = list(serialized_obj)
+
+        return Intervals.from_arrays(
+            [serialized_interval["start"] for serialized_interval in serialized_obj],
+            [serialized_interval["end"] for serialized_interval in serialized_obj],
+            [serialized_interval["is_silent"] for serialized_interval in serialized_obj]
+        )
+
+    def __len__(self):
+        """
+        Number of intervals in the collection
+        :return: Number of intervals
+        """
+        return self.__length
+
+    def __iter__(self):
+        """
+        Iterates over the intervals of the collection
+        :return: Iterator of lib.IntervalView.IntervalView objects
+        """
+        return (IntervalView(self, i) for i in range(self.__length))
 
     def __repr__(self):
         """
         String representation
         :return: String representation
         """
-        return str(self.__interval_list)
+        return str(self.intervals)
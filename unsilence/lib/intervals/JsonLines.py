@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+from unsilence.lib.intervals.Interval import Interval
+
+
+class JsonLinesWriter:
+    """
+    Writes intervals to a JSON Lines file (one serialized interval per line) as soon as they arrive, e.g. while silence
+    is still being detected. The file can be read with read_json_lines() at any time, even while it is still written
+    """
+
+    def __init__(self, output_file: Path, append: bool = False):
+        """
+        Initializes a new JsonLinesWriter
+        :param output_file: Where the intervals should be written to
+        :param append: Whether the intervals should be appended to an existing file instead of replacing it
+        """
+        self.__file = open(output_file, "a" if append else "w", encoding="utf-8")
+
+    def write(self, interval: Interval):
+        """
+        Writes a single interval and flushes it to the file
+        :param interval: The interval that should be written
+        :return: None
+        """
+        self.__file.write(json.dumps(interval.serialize()) + "\n")
+        self.__file.flush()
+
+    def write_stream(self, interval_iterator):
+        """
+        Writes every interval of a stream as soon as it arrives and passes it on
+        :param interval_iterator: Iterable of intervals (e.g. lib.detect_silence.DetectSilence.detect_silence_stream)
+        :return: Generator of the same intervals
+        """
+        for interval in interval_iterator:
+            self.write(interval)
+            yield interval
+
+    def close(self):
+        """
+        Closes the file
+        :return: None
+        """
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_json_lines(input_file: Path):
+    """
+    Reads the serialized intervals of a JSON Lines file one by one, an incomplete last line (e.g. because the file is
+    still being written) is skipped. The result can be passed to lib.intervals.Intervals.Intervals.deserialize
+    :param input_file: The JSON Lines file
+    :return: Generator of serialized intervals (dicts with start, end and is_silent)
+    """
+    with open(input_file, "r", encoding="utf-8") as file:
+        for line in file:
+            if not line.endswith("\n") or line.strip() == "":
+                continue
+
+            yield json.loads(line)
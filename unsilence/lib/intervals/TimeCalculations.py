@@ -1,3 +1,5 @@
+import bisect
+
 from unsilence.lib.intervals.Intervals import Intervals
 
 
@@ -10,13 +12,9 @@ def calculate_time(intervals: Intervals, audible_speed: float, silent_speed: flo
     :return: Time calculation dict
     """
     time_data = {"before": {}, "after": {}, "delta": {}}
-    audible = 0
-    silent = 0
-    for interval in intervals.intervals:
-        if interval.is_silent:
-            silent += interval.duration
-        else:
-            audible += interval.duration
+    durations = intervals.durations
+    silent = float(durations[intervals.silent_flags].sum())
+    audible = float(durations[~intervals.silent_flags].sum())
 
     time_data["before"]["all"] = (audible + silent, 1)
     time_data["before"]["audible"] = (audible, audible / time_data["before"]["all"][0])
@@ -47,3 +45,55 @@ def calculate_time(intervals: Intervals, audible_speed: float, silent_speed: flo
     # Timedelta not working like i want
 
     return time_data
+
+
+def compare_intervals(reference: Intervals, candidate: Intervals):
+    """
+    Compares two Intervals objects of the same media file, e.g. to measure how accurate a detection engine is
+    :param reference: Intervals that are assumed to be correct (lib.Intervals.Intervals)
+    :param candidate: Intervals that should be compared to the reference (lib.Intervals.Intervals)
+    :return: Comparison dict (agreement: share of the time both classify the same way, silent_precision and
+        silent_recall: share of the silent time of the candidate/reference that is silent in both, boundary_error:
+        mean and max distance (in seconds) of a candidate boundary to the closest reference boundary)
+    """
+    overlap = {(True, True): 0, (True, False): 0, (False, True): 0, (False, False): 0}
+
+    reference_intervals = reference.intervals
+    candidate_intervals = candidate.intervals
+    i = 0
+    j = 0
+    while i < len(reference_intervals) and j < len(candidate_intervals):
+        reference_interval = reference_intervals[i]
+        candidate_interval = candidate_intervals[j]
+
+        start = max(reference_interval.start, candidate_interval.start)
+        end = min(reference_interval.end, candidate_interval.end)
+        if end > start:
+            overlap[(reference_interval.is_silent, candidate_interval.is_silent)] += end - start
+
+        if reference_interval.end <= candidate_interval.end:
+            i += 1
+        else:
+            j += 1
+
+    total = sum(overlap.values())
+    reference_silent = overlap[(True, True)] + overlap[(True, False)]
+    candidate_silent = overlap[(True, True)] + overlap[(False, True)]
+
+    reference_boundaries = [interval.start for interval in reference_intervals[1:]]
+    boundary_errors = []
+    for interval in candidate_intervals[1:]:
+        position = bisect.bisect_left(reference_boundaries, interval.start)
+        neighbours = reference_boundaries[max(position - 1, 0):position + 1]
+        if len(neighbours) > 0:
+            boundary_errors.append(min(abs(interval.start - boundary) for boundary in neighbours))
+
+    return {
+        "agreement": (overlap[(True, True)] + overlap[(False, False)]) / total if total > 0 else 1,
+        "silent_precision": overlap[(True, True)] / candidate_silent if candidate_silent > 0 else 1,
+        "silent_recall": overlap[(True, True)] / reference_silent if reference_silent > 0 else 1,
+        "boundary_error": {
+            "mean": sum(boundary_errors) / len(boundary_errors) if len(boundary_errors) > 0 else 0,
+            "max": max(boundary_errors, default=0)
+        }
+    }
@@ -0,0 +1,187 @@
+import bisect
+import io
+import json
+import subprocess
+from pathlib import Path
+
+import numpy as np
+from unsilence.lib.tools.toolchain import get_ffprobe_binary
+
+
+class MediaIndex:
+    """
+    Index of the packets of the first video stream of a media file (timestamps, byte offsets and keyframe flags) and
+    the parameters of its streams, so keyframes can be looked up without probing the file again
+    """
+
+    def __init__(self, packet_times: np.ndarray, packet_offsets: np.ndarray, keyframe_flags: np.ndarray,
+                 streams: dict, media_duration: float = None):
+        """
+        Initializes a new MediaIndex
+        :param packet_times: Sorted presentation timestamps of the video packets (in seconds)
+        :param packet_offsets: Byte offsets of the video packets in the file (-1 if unknown)
+        :param keyframe_flags: Whether the video packets are keyframes
+        :param streams: Dict with the keys "video" and "audio" (dicts of the stream parameters or None)
+        :param media_duration: Duration of the media file (in seconds), None if unknown
+        """
+        self.__packet_times = np.asarray(packet_times, dtype=np.float64)
+        self.__packet_offsets = np.asarray(packet_offsets, dtype=np.int64)
+        self.__keyframe_flags = np.asarray(keyframe_flags, dtype=bool)
+        self.__keyframe_times = self.__packet_times[self.__keyframe_flags].tolist()
+        self.streams = streams
+        self.media_duration = media_duration
+
+    @property
+    def keyframe_times(self):
+        """
+        Returns the timestamps of all keyframes
+        :return: Sorted list of keyframe timestamps (in seconds)
+        """
+        return self.__keyframe_times
+
+    def keyframe_at_or_before(self, time: float):
+        """
+        Finds the last keyframe at or before a time, that is where decoding has to start to reach the time
+        :param time: Time in seconds
+        :return: Keyframe timestamp (in seconds) or None if there is no keyframe before the time
+        """
+        position = bisect.bisect_right(self.__keyframe_times, time)
+        return self.__keyframe_times[position - 1] if position > 0 else None
+
+    def keyframe_at_or_after(self, time: float):
+        """
+        Finds the first keyframe at or after a time
+        :param time: Time in seconds
+        :return: Keyframe timestamp (in seconds) or None if there is no keyframe after the time
+        """
+        position = bisect.bisect_left(self.__keyframe_times, time)
+        return self.__keyframe_times[position] if position < len(self.__keyframe_times) else None
+
+    def keyframes_between(self, start: float, end: float):
+        """
+        Finds all keyframes in a time range
+        :param start: Start of the range (in seconds, inclusive)
+        :param end: End of the range (in seconds, inclusive)
+        :return: Sorted list of keyframe timestamps (in seconds)
+        """
+        return self.__keyframe_times[
+            bisect.bisect_left(self.__keyframe_times, start):bisect.bisect_right(self.__keyframe_times, end)
+        ]
+
+    def get_seek_cost(self, time: float):
+        """
+        Estimates how much has to be decoded and discarded when the input is seeked to a time
+        :param time: Time in seconds
+        :return: Distance to the previous keyframe (in seconds), the time itself if there is no keyframe before it
+        """
+        keyframe = self.keyframe_at_or_before(time)
+        return time - keyframe if keyframe is not None else time
+
+    def get_offset(self, time: float):
+        """
+        Gets the byte offset of the video packet that is presented at a time
+        :param time: Time in seconds
+        :return: Byte offset in the file or None if it is unknown
+        """
+        position = np.searchsorted(self.__packet_times, time, side="right") - 1
+        if position < 0 or self.__packet_offsets[position] < 0:
+            return None
+
+        return int(self.__packet_offsets[position])
+
+    def to_bytes(self):
+        """
+        Serializes the index into a compact binary format (uncompressed numpy .npz)
+        :return: Serialized index
+        """
+        metadata = json.dumps({"streams": self.streams, "media_duration": self.media_duration}).encode()
+
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            packet_times=self.__packet_times,
+            packet_offsets=self.__packet_offsets,
+            keyframe_flags=self.__keyframe_flags,
+            metadata=np.frombuffer(metadata, dtype=np.uint8)
+        )
+        return buffer.getvalue()
+
+    @staticmethod
+    def from_bytes(data: bytes):
+        """
+        Deserializes an index that was serialized with to_bytes()
+        :param data: Serialized index
+        :return: New instance of MediaIndex
+        """
+        with np.load(io.BytesIO(data)) as arrays:
+            metadata = json.loads(arrays["metadata"].tobytes().decode())
+            return MediaIndex(
+                arrays["packet_times"],
+                arrays["packet_offsets"],
+                arrays["keyframe_flags"],
+                metadata["streams"],
+                metadata["media_duration"]
+            )
+
+    @staticmethod
+    def build(input_file: Path):
+        """
+        Builds the index of a media file with a single ffprobe run, only the packet headers are read (nothing is
+        decoded)
+        :param input_file: The media file
+        :raises: **IOError** -- If the file could not be probed
+        :return: New instance of MediaIndex
+        """
+        ffprobe_binary = get_ffprobe_binary()
+
+        console_output = subprocess.run(
+            [
+                ffprobe_binary,
+                "-loglevel", "error",
+                "-show_entries", "packet=stream_index,pts_time,pos,flags:stream:format=duration",
+                "-of", "compact",
+                str(input_file)
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+
+        streams = {"video": None, "audio": None}
+        packets = []
+        media_duration = None
+
+        for line in console_output.stdout.splitlines():
+            section, _, fields = line.strip().partition("|")
+            values = dict(field.partition("=")[::2] for field in fields.split("|"))
+
+            if section == "packet" and values.get("pts_time", "N/A") != "N/A":
+                packets.append((
+                    values.get("stream_index", None),
+                    float(values["pts_time"]),
+                    int(values["pos"]) if values.get("pos", "N/A").isdigit() else -1,
+                    "K" in values.get("flags", "")
+                ))
+            elif section == "stream":
+                codec_type = values.get("codec_type", None)
+                if codec_type in streams and streams[codec_type] is None:
+                    streams[codec_type] = values
+            elif section == "format" and values.get("duration", "N/A") != "N/A":
+                media_duration = float(values["duration"])
+
+        if console_output.returncode != 0:
+            raise IOError(f"Probing {input_file} failed:\n{console_output.stderr}")
+
+        video_stream_index = streams["video"]["index"] if streams["video"] is not None else None
+        video_packets = sorted(
+            (packet[1:] for packet in packets if packet[0] == video_stream_index),
+            key=lambda packet: packet[0]
+        )
+
+        return MediaIndex(
+            [packet_time for packet_time, _, _ in video_packets],
+            [offset for _, offset, _ in video_packets],
+            [is_keyframe for _, _, is_keyframe in video_packets],
+            streams,
+            media_duration
+        )
@@ -0,0 +1,93 @@
+from pathlib import Path
+
+from unsilence.lib.media_index.MediaIndex import MediaIndex
+from unsilence.lib.tools.FileCache import FileCache
+from unsilence.lib.tools.fingerprint import file_fingerprint
+
+
+class MediaIndexCache:
+    """
+    Persists the MediaIndex of files as binary sidecar files, keyed by a fingerprint of the file
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int = 256 * 1024 * 1024):
+        """
+        Initializes a new MediaIndexCache
+        :param cache_dir: Directory where the indexes should be stored
+        :param max_size: Maximum size of all indexes together (in bytes), None means unlimited
+        """
+        self.__file_cache = FileCache(cache_dir, max_size)
+
+    def load(self, input_file: Path):
+        """
+        Loads the index of a file
+        :param input_file: The indexed file
+        :return: lib.media_index.MediaIndex.MediaIndex object or None if the file was not indexed yet
+        """
+        cached_file = self.__file_cache.get(MediaIndexCache.__get_name(input_file))
+        if cached_file is None:
+            return None
+
+        try:
+            with open(cached_file, "rb") as file:
+                return MediaIndex.from_bytes(file.read())
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, input_file: Path, media_index: MediaIndex):
+        """
+        Saves the index of a file
+        :param input_file: The indexed file
+        :param media_index: The index of the file
+        :return: None
+        """
+        self.__file_cache.put_bytes(MediaIndexCache.__get_name(input_file), media_index.to_bytes())
+
+    def get_statistics(self):
+        """
+        Gets the hit/miss statistics and the size of the cache
+        :return: Statistics dict (hits, misses, size, max_size)
+        """
+        return self.__file_cache.get_statistics()
+
+    @staticmethod
+    def __get_name(input_file: Path):
+        """
+        Gets the name of the sidecar file of an index
+        :param input_file: The indexed file
+        :return: Name of the sidecar file
+        """
+        return f"{file_fingerprint(input_file)}.npz"
+
+
+def get_media_index(input_file: Path, cache_dir: Path = None):
+    """
+    Gets the index of a media file, it is only built (probed) if it is not cached yet
+    :param input_file: The media file
+    :param cache_dir: Directory where indexes are persisted (default None, the index is always built)
+    :return: lib.media_index.MediaIndex.MediaIndex object
+    """
+    if cache_dir is None:
+        return MediaIndex.build(input_file)
+
+    media_index_cache = MediaIndexCache(cache_dir)
+
+    media_index = media_index_cache.load(input_file)
+    if media_index is None:
+        media_index = MediaIndex.build(input_file)
+        media_index_cache.save(input_file, media_index)
+
+    return media_index
+
+
+def load_cached_media_index(input_file: Path, cache_dir: Path = None):
+    """
+    Gets the index of a media file only if it was already built before, so no probing is needed
+    :param input_file: The media file
+    :param cache_dir: Directory where indexes are persisted
+    :return: lib.media_index.MediaIndex.MediaIndex object or None if the file was not indexed yet
+    """
+    if cache_dir is None:
+        return None
+
+    return MediaIndexCache(cache_dir).load(input_file)
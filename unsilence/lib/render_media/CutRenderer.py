@@ -0,0 +1,227 @@
+import pathlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from unsilence.lib.intervals.Interval import Interval
+from unsilence.lib.intervals.Intervals import Intervals
+from unsilence.lib.media_index.MediaIndex import MediaIndex
+from unsilence.lib.render_media.IntervalRenderer import IntervalRenderer
+from unsilence.lib.tools.encoder_arguments import get_matching_encoder_arguments
+from unsilence.lib.tools.toolchain import get_ffmpeg_binary
+
+
+def get_cut_ranges(intervals: Intervals, media_index: MediaIndex = None):
+    """
+    Gets the time ranges of the input that are kept when the silent intervals are cut out. Without stream-copying
+    across keyframes, every range has to start at a keyframe, so the start is moved back to the previous keyframe and
+    ranges that overlap afterwards are joined
+    :param intervals: The Intervals of the input
+    :param media_index: Index of the input, if it is given the ranges start at keyframes
+    :return: List of (start, end) tuples (in seconds)
+    """
+    cut_ranges = []
+
+    for start, end, is_silent in zip(intervals.starts, intervals.ends, intervals.silent_flags):
+        if is_silent:
+            continue
+
+        start = float(start)
+        end = float(end)
+
+        if media_index is not None:
+            keyframe = media_index.keyframe_at_or_before(start)
+            if keyframe is not None:
+                start = keyframe
+
+        if len(cut_ranges) > 0 and start <= cut_ranges[-1][1]:
+            cut_ranges[-1] = (cut_ranges[-1][0], max(cut_ranges[-1][1], end))
+        else:
+            cut_ranges.append((start, end))
+
+    return cut_ranges
+
+
+def generate_concat_script(pieces: list, comments: list = None):
+    """
+    Generates an ffconcat script that joins files and ranges of files
+    :param pieces: List of (file, inpoint, outpoint) tuples, inpoint and outpoint are None for complete files
+    :param comments: List of comments that are written before the pieces (one per piece, None skips a piece)
+    :return: The ffconcat script
+    """
+    lines = ["ffconcat version 1.0"]
+
+    for i, (file, inpoint, outpoint) in enumerate(pieces):
+        if comments is not None and comments[i] is not None:
+            lines.append(f"# {comments[i]}")
+
+        escaped_path = pathlib.Path(file).absolute().as_posix().replace("'", "'\\''")
+        lines.append(f"file '{escaped_path}'")
+
+        if inpoint is not None:
+            lines.append(f"inpoint {inpoint}")
+
+        if outpoint is not None:
+            lines.append(f"outpoint {outpoint}")
+
+    return "\n".join(lines) + "\n"
+
+
+def render_cut(input_file: pathlib.Path, output_file: pathlib.Path, intervals: Intervals,
+               render_options: SimpleNamespace, temp_path: pathlib.Path, **kwargs):
+    """
+    Cuts the silent intervals out of a file without re-encoding it: the audible ranges are listed with inpoint and
+    outpoint directives in an ffconcat script, which is stream-copied into the output in a single pass. With the
+    smart_cut option the ranges are cut exactly, only the part of every range before its first keyframe is re-encoded
+    (with the codec parameters of the input), otherwise every range is extended back to the previous keyframe
+    :param input_file: The file that should be processed
+    :param output_file: Where the cut file should be saved
+    :param intervals: The Intervals of the input
+    :param render_options: The parameters on how the media should be processed (the audible intervals have to be
+        played back at their original speed and volume)
+    :param temp_path: The temp path where the script and the re-encoded range starts should be stored
+    :param kwargs: Keyword Args, see below
+    :return: None
+
+    kwargs:
+        media_index: Index of the input, it is required for videos
+        threads: Number of range starts that are re-encoded simultaneously with the smart_cut option (default 2)
+        on_progress_update: Function that should be called on progress update
+            (called like: func(current, total), both in seconds of the output file)
+    """
+    if render_options.audible_speed != 1 or render_options.audible_volume != 1:
+        raise ValueError("Cutting requires the audible intervals to keep their speed and volume")
+
+    media_index = kwargs.get("media_index", None)
+    on_progress_update = kwargs.get("on_progress_update", None)
+
+    # Every audio packet can be decoded on its own, so only videos have to be cut at keyframes
+    if render_options.audio_only:
+        media_index = None
+
+    smart_cut = render_options.smart_cut and media_index is not None and get_matching_encoder_arguments(
+        media_index.streams, output_file) is not None
+
+    cut_ranges = get_cut_ranges(intervals, None if smart_cut else media_index)
+    if len(cut_ranges) == 0:
+        raise ValueError("There is no audible interval that could be kept")
+
+    if smart_cut:
+        pieces = render_range_starts(
+            input_file,
+            output_file,
+            cut_ranges,
+            render_options,
+            media_index,
+            temp_path,
+            kwargs.get("threads", 2)
+        )
+    else:
+        pieces = [(input_file, start, end) for start, end in cut_ranges]
+
+    output_duration = sum(end - start for start, end in cut_ranges)
+
+    concat_script = temp_path / "cut_list.ffconcat"
+    with open(str(concat_script), "w+") as file:
+        file.write(generate_concat_script(pieces))
+
+    ffmpeg_binary = get_ffmpeg_binary()
+    command = [
+        ffmpeg_binary,
+        "-f", "concat",
+        "-safe", "0",
+        "-i", f"{concat_script}",
+    ]
+
+    if not render_options.audio_only:
+        command.extend(["-map", "0:v:0"])
+
+    command.extend([
+        "-map", "0:a:0?",
+        "-c", "copy",
+        "-avoid_negative_ts", "make_zero",
+        "-nostats",
+        "-loglevel", "error",
+        "-progress", "pipe:1",
+        "-y",
+        f"{output_file}"
+    ])
+
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True
+    )
+
+    error_output = []
+    for line in process.stdout:
+        key, _, value = line.strip().partition("=")
+
+        if key in ["out_time_us", "out_time_ms"]:
+            if on_progress_update is not None and value.isdigit():
+                on_progress_update(min(int(value) / 1000000, output_duration), output_duration)
+        elif key not in ["frame", "fps", "bitrate", "total_size", "out_time", "dup_frames", "drop_frames", "speed",
+                         "progress"] and not key.startswith("stream_"):
+            error_output.append(line.strip())
+
+    process.wait()
+
+    if process.returncode != 0:
+        error_message = "\n".join(error_output)
+        raise IOError(f"Cutting the file failed:\n{error_message}")
+
+    if on_progress_update is not None:
+        on_progress_update(output_duration, output_duration)
+
+
+def render_range_starts(input_file: pathlib.Path, output_file: pathlib.Path, cut_ranges: list,
+                        render_options: SimpleNamespace, media_index: MediaIndex, temp_path: pathlib.Path,
+                        threads: int):
+    """
+    Re-encodes the part of every range before its first keyframe, ranges without a keyframe are re-encoded
+    completely
+    :param input_file: The file that should be processed
+    :param output_file: Where the cut file should be saved (the range starts are written in its container)
+    :param cut_ranges: List of (start, end) tuples (in seconds)
+    :param render_options: The parameters on how the media should be processed
+    :param media_index: Index of the input
+    :param temp_path: The temp path where the range starts should be stored
+    :param threads: Number of range starts that are re-encoded simultaneously
+    :return: List of (file, inpoint, outpoint) tuples for generate_concat_script()
+    """
+    renderer = IntervalRenderer(input_file, render_options, media_index)
+    range_pieces = []
+    tasks = []
+
+    for i, (start, end) in enumerate(cut_ranges):
+        keyframe = media_index.keyframe_at_or_after(start)
+        copy_start = keyframe if keyframe is not None and keyframe < end else end
+        pieces = []
+
+        if copy_start > start:
+            task = SimpleNamespace(
+                task_id=i,
+                interval_output_file=temp_path / f"range_start_{i}{output_file.suffix}",
+                interval=Interval(start, copy_start, False)
+            )
+            tasks.append(task)
+            pieces.append(task)
+
+        if copy_start < end:
+            pieces.append((input_file, copy_start, end))
+
+        range_pieces.append(pieces)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = {task.task_id: completed for task, completed in executor.map(renderer.render, tasks)}
+
+    concat_pieces = []
+    for pieces in range_pieces:
+        for piece in pieces:
+            if isinstance(piece, tuple):
+                concat_pieces.append(piece)
+            elif results[piece.task_id]:
+                concat_pieces.extend((file, None, None) for file in piece.output_files)
+
+    return concat_pieces
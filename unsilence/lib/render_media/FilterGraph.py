@@ -0,0 +1,214 @@
+import pathlib
+import subprocess
+from types import SimpleNamespace
+
+from unsilence.lib.render_media.IntervalRenderer import IntervalRenderer
+from unsilence.lib.tools.ffmpeg_filters import is_filter_available
+from unsilence.lib.tools.toolchain import get_ffmpeg_binary
+
+
+def generate_filter_graph(interval_list: list, render_options: SimpleNamespace):
+    """
+    Generates a single filtergraph that cuts, speeds up and changes the volume of all intervals and concatenates them
+    :param interval_list: List of contiguous lib.Intervals.Interval objects that should be rendered
+    :param render_options: The parameters on how the media should be processed
+    :return: Tuple of the filtergraph string and the expected output duration (in seconds)
+    """
+    if len(interval_list) == 0:
+        raise ValueError("At least one interval is required to generate a filtergraph")
+
+    interval_count = len(interval_list)
+    streams = ["a"] if render_options.audio_only else ["v", "a"]
+
+    filter_graph = []
+    output_duration = 0
+
+    # The segment filters split a stream by timestamps, so every frame only passes through one branch. The trim
+    # filters are the fallback for older ffmpeg builds, but every frame has to pass through every branch there.
+    use_segment_filter = all(is_filter_available(name) for name in ["segment", "asegment"])
+
+    for stream in streams:
+        prefix = "" if stream == "v" else "a"
+
+        if use_segment_filter:
+            boundaries = [interval.start for interval in interval_list[1:]]
+            discard_head = interval_list[0].start > 0
+            if discard_head:
+                boundaries.insert(0, interval_list[0].start)
+
+            outputs = [f"[{stream}{i}_in]" for i in range(interval_count)]
+            if discard_head:
+                outputs.insert(0, f"[{stream}_head]")
+
+            if len(boundaries) > 0:
+                timestamps = "|".join(str(boundary) for boundary in boundaries)
+                filter_graph.append(f"[0:{stream}]{prefix}segment=timestamps={timestamps}{''.join(outputs)}")
+            else:
+                filter_graph.append(f"[0:{stream}]{prefix}null{''.join(outputs)}")
+
+            if discard_head:
+                filter_graph.append(f"[{stream}_head]{prefix}nullsink")
+        else:
+            outputs = "".join(f"[{stream}{i}_in]" for i in range(interval_count))
+            filter_graph.append(f"[0:{stream}]{prefix}split={interval_count}{outputs}")
+
+    for i, interval in enumerate(interval_list):
+        current_speed, current_volume = IntervalRenderer.get_speed_and_volume(interval, render_options)
+        output_duration += interval.duration / current_speed
+
+        if use_segment_filter:
+            video_cut = ""
+            audio_cut = ""
+        else:
+            video_cut = f"trim=start={interval.start}:end={interval.end},"
+            audio_cut = f"atrim=start={interval.start}:end={interval.end},"
+
+        if not render_options.audio_only:
+            filter_graph.append(
+                f"[v{i}_in]{video_cut}setpts=(PTS-STARTPTS)/{round(current_speed, 4)}[v{i}]"
+            )
+
+        filter_graph.append(
+            f"[a{i}_in]{audio_cut}asetpts=PTS-STARTPTS,"
+            f"atempo={round(current_speed, 4)},volume={current_volume}[a{i}]"
+        )
+
+    concat_inputs = "".join(
+        "".join(f"[{stream}{i}]" for stream in streams) for i in range(interval_count)
+    )
+    concat_outputs = "".join(f"[{stream}]" for stream in streams)
+    filter_graph.append(
+        f"{concat_inputs}concat=n={interval_count}:v={0 if render_options.audio_only else 1}:a=1{concat_outputs}"
+    )
+
+    return ";\n".join(filter_graph), output_duration
+
+
+def render_filter_graph(input_file: pathlib.Path, output_file: pathlib.Path, interval_list: list,
+                        render_options: SimpleNamespace, filter_script_file: pathlib.Path, **kwargs):
+    """
+    Renders a list of intervals in a single ffmpeg process, so the input is decoded once and the output encoded once
+    :param input_file: The file that should be processed
+    :param output_file: Where the rendered media should be saved
+    :param interval_list: List of contiguous lib.Intervals.Interval objects that should be rendered
+    :param render_options: The parameters on how the media should be processed
+    :param filter_script_file: Where the filtergraph script should be saved (can be large for long media files)
+    :param kwargs: Keyword Args, see below
+    :return: None
+
+    kwargs:
+        input_offset: Time (in seconds) the input should be seeked to before decoding, the interval times have to be
+            relative to this offset (default 0)
+        input_duration: How much of the input (in seconds) should be decoded after the offset (default: all)
+        threads: Number of threads the ffmpeg process may use (default None, ffmpeg decides)
+        on_progress_update: Function that should be called on progress update
+            (called like: func(current, total), both in seconds of the output file)
+    """
+    filter_graph, output_duration = generate_filter_graph(interval_list, render_options)
+    on_progress_update = kwargs.get("on_progress_update", None)
+
+    with open(str(filter_script_file), "w+") as file:
+        file.write(filter_graph)
+
+    process = subprocess.Popen(
+        generate_filter_graph_command(input_file, output_file, render_options, filter_script_file, **kwargs),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True
+    )
+
+    error_output = []
+    for line in process.stdout:
+        is_progress, current = parse_progress_line(line)
+
+        if not is_progress:
+            error_output.append(line.strip())
+        elif current is not None and on_progress_update is not None:
+            on_progress_update(min(current, output_duration), output_duration)
+
+    process.wait()
+
+    if process.returncode != 0:
+        raise get_render_error(error_output)
+
+    if on_progress_update is not None:
+        on_progress_update(output_duration, output_duration)
+
+
+def generate_filter_graph_command(input_file: pathlib.Path, output_file: pathlib.Path,
+                                  render_options: SimpleNamespace, filter_script_file: pathlib.Path, **kwargs):
+    """
+    Generates the ffmpeg command that renders a filtergraph script, its progress is written to stdout
+    :param input_file: The file that should be processed
+    :param output_file: Where the rendered media should be saved
+    :param render_options: The parameters on how the media should be processed
+    :param filter_script_file: The filtergraph script (see generate_filter_graph())
+    :param kwargs: Keyword Args, see render_filter_graph() (input_offset, input_duration and threads)
+    :return: ffmpeg console command
+    """
+    input_offset = kwargs.get("input_offset", 0)
+    input_duration = kwargs.get("input_duration", None)
+    threads = kwargs.get("threads", None)
+
+    command = [get_ffmpeg_binary()]
+
+    if input_offset > 0:
+        command.extend(["-ss", f"{input_offset}"])
+
+    if input_duration is not None:
+        command.extend(["-t", f"{input_duration}"])
+
+    command.extend([
+        "-i", f"{input_file}",
+        "-filter_complex_script", f"{filter_script_file}",
+    ])
+
+    if not render_options.audio_only:
+        command.extend(["-map", "[v]"])
+
+    command.extend(["-map", "[a]"])
+
+    if threads is not None:
+        command.extend(["-threads", str(threads)])
+
+    command.extend([
+        "-nostats",
+        "-loglevel", "error",
+        "-progress", "pipe:1",
+        "-y",
+        f"{output_file}"
+    ])
+
+    return command
+
+
+def parse_progress_line(line: str):
+    """
+    Parses a line of the "-progress pipe:1" output of ffmpeg
+    :param line: The line
+    :return: Tuple of whether the line is part of the progress output (otherwise it is an error message) and the time
+        of the output that is written (in seconds, None if the line does not contain it)
+    """
+    key, _, value = line.strip().partition("=")
+
+    if key in ["out_time_us", "out_time_ms"]:
+        return True, int(value) / 1000000 if value.isdigit() else None
+
+    if key in ["frame", "fps", "bitrate", "total_size", "out_time", "dup_frames", "drop_frames", "speed",
+               "progress"] or key.startswith("stream_"):
+        return True, None
+
+    return False, None
+
+
+def get_render_error(error_output: list):
+    """
+    Creates the exception for a failed filtergraph render
+    :param error_output: The error messages of ffmpeg (lines)
+    :return: ValueError if the render options were invalid, IOError otherwise
+    """
+    error_message = "\n".join(error_output)
+    if "Error initializing complex filter" in error_message or "Error reinitializing filters" in error_message:
+        return ValueError("Invalid render options")
+
+    return IOError(f"Rendering the filtergraph failed:\n{error_message}")
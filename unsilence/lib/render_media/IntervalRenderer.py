@@ -0,0 +1,317 @@
+import pathlib
+import subprocess
+from types import SimpleNamespace
+from unsilence.lib.intervals.Interval import Interval
+from unsilence.lib.media_index.MediaIndex import MediaIndex
+from unsilence.lib.render_media.SegmentCache import SegmentCache
+from unsilence.lib.tools.encoder_arguments import get_matching_encoder_arguments
+from unsilence.lib.tools.toolchain import get_ffmpeg_binary, get_ffprobe_binary
+
+
+class IntervalRenderer:
+    """
+    Renders/processes single intervals based on defined options, render() is safe to be called from multiple
+    worker threads at the same time
+    """
+
+    __MINIMUM_STREAM_COPY_DURATION = 1
+
+    def __init__(self, input_file: pathlib.Path, render_options: SimpleNamespace, media_index: MediaIndex = None,
+                 segment_cache: SegmentCache = None, codec_arguments: list = None, ffmpeg_threads: int = None):
+        """
+        Initializes a new IntervalRenderer
+        :param input_file: The file the renderer should work on
+        :param render_options: The parameters on how the video should be processed
+        :param media_index: Index of the input file, it is required for the smart_cut option
+        :param segment_cache: Cache of previously rendered segments, segments that are cached are not rendered again
+        :param codec_arguments: ffmpeg arguments that select the codecs of re-encoded intervals, required if the
+            intervals are written in another container than the output (see lib.render_media.SegmentFormat)
+        :param ffmpeg_threads: Number of threads every ffmpeg process may use (None lets ffmpeg decide, see
+            lib.render_media.RenderScheduler.get_worker_plan)
+        """
+        self.__input_file = input_file
+        self.__render_options = render_options
+        self.__segment_cache = segment_cache
+        self.__codec_arguments = codec_arguments if codec_arguments is not None else []
+        self.__ffmpeg_threads = ffmpeg_threads
+        self.__media_index = None
+
+        if getattr(render_options, "smart_cut", False) and not render_options.audio_only:
+            self.__media_index = media_index
+
+    def render(self, task: SimpleNamespace):
+        """
+        Renders the interval of a task to the output file of the task. With the smart_cut option the interval can be
+        rendered into multiple parts instead, the files that have to be concatenated are stored in task.output_files
+        :param task: Task with an interval and an interval_output_file
+        :raises: **IOError** -- If the input file is corrupted in this interval and it could not be recovered
+        :raises: **ValueError** -- If the render options are invalid
+        :return: Tuple of the task and whether it was completed (False if the interval was corrupted and dropped)
+        """
+        task.output_files = [task.interval_output_file]
+        completed = None
+
+        smart_cut_parts = self.__split_at_keyframes(task.interval, task.interval_output_file)
+        if smart_cut_parts is not None:
+            completed = self.__render_smart_cut(task, smart_cut_parts)
+
+        if completed is None:
+            task.output_files = [task.interval_output_file]
+            completed = self.__render_interval(
+                task.interval_output_file,
+                task.interval,
+                drop_corrupted_intervals=self.__render_options.drop_corrupted_intervals
+            )
+
+        if completed and self.__render_options.check_intervals:
+            for output_file in task.output_files:
+                probe_output = subprocess.run(
+                    [
+                        get_ffprobe_binary(),
+                        "-loglevel", "quiet",
+                        f"{output_file}"
+                    ],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.STDOUT
+                )
+                completed = completed and probe_output.returncode == 0
+
+        return task, completed
+
+    def __split_at_keyframes(self, interval: Interval, interval_output_file: pathlib.Path):
+        """
+        Splits an interval that is neither sped up nor changed in volume at the first and the last keyframe inside
+        of it, so the part between the keyframes can be stream-copied instead of re-encoded (smart cut)
+        :param interval: The interval that should be rendered
+        :param interval_output_file: Where the interval should be saved
+        :return: List of (part interval, whether it can be stream-copied) tuples, or None if the interval has to be
+            re-encoded completely
+        """
+        if self.__media_index is None or get_matching_encoder_arguments(
+                self.__media_index.streams, interval_output_file) is None:
+            return None
+
+        speed, volume = IntervalRenderer.get_speed_and_volume(interval, self.__render_options)
+        if speed != 1 or volume != 1:
+            return None
+
+        keyframes = self.__media_index.keyframes_between(interval.start, interval.end)
+        if len(keyframes) < 2:
+            return None
+
+        first_keyframe = keyframes[0]
+        last_keyframe = keyframes[-1]
+
+        # Short copies save less time than the additional ffmpeg processes cost
+        if last_keyframe - first_keyframe < IntervalRenderer.__MINIMUM_STREAM_COPY_DURATION:
+            return None
+
+        parts = []
+
+        if first_keyframe > interval.start:
+            parts.append((Interval(interval.start, first_keyframe, interval.is_silent), False))
+
+        parts.append((Interval(first_keyframe, last_keyframe, interval.is_silent), True))
+
+        if interval.end > last_keyframe:
+            parts.append((Interval(last_keyframe, interval.end, interval.is_silent), False))
+
+        return parts
+
+    def __render_smart_cut(self, task: SimpleNamespace, parts: list):
+        """
+        Renders the parts of a smart cut interval, the edges are re-encoded with the codec parameters of the input and
+        the part between the keyframes is stream-copied
+        :param task: Task with an interval and an interval_output_file
+        :param parts: List of (part interval, whether it can be stream-copied) tuples
+        :return: Whether the parts were completed (False if a part was corrupted and dropped), or None if the stream
+            could not be copied and the interval has to be re-encoded completely
+        """
+        output_file = task.interval_output_file
+        task.output_files = []
+
+        for i, (part, stream_copy) in enumerate(parts):
+            part_output_file = output_file.with_name(f"{output_file.stem}_{i}{output_file.suffix}")
+            task.output_files.append(part_output_file)
+
+            if stream_copy:
+                if not self.__copy_interval(part_output_file, part):
+                    return None
+            elif not self.__render_interval(
+                    part_output_file,
+                    part,
+                    drop_corrupted_intervals=self.__render_options.drop_corrupted_intervals):
+                return False
+
+        return True
+
+    def __copy_interval(self, interval_output_file: pathlib.Path, interval: Interval):
+        """
+        Copies the packets of an interval that starts at a keyframe without decoding them
+        :param interval_output_file: Where the media interval should be saved
+        :param interval: The interval that should be copied (it has to start at a keyframe)
+        :return: Whether copying succeeded
+        """
+        ffmpeg_binary = get_ffmpeg_binary()
+
+        command = [
+            ffmpeg_binary,
+            "-ss", f"{interval.start}",
+            "-i", f"{self.__input_file}",
+            "-t", f"{interval.duration}",
+            "-map", "0:v:0",
+            "-map", "0:a:0?",
+            "-c", "copy",
+            "-avoid_negative_ts", "make_zero",
+            "-y",
+            str(interval_output_file)
+        ]
+
+        if self.__segment_cache is not None and self.__segment_cache.load(self.__input_file, command):
+            return True
+
+        console_output = subprocess.run(
+            command,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+
+        if console_output.returncode != 0:
+            return False
+
+        if self.__segment_cache is not None:
+            self.__segment_cache.save(self.__input_file, command)
+
+        return True
+
+    def __render_interval(self, interval_output_file: pathlib.Path, interval: Interval,
+                          apply_filter=True, drop_corrupted_intervals=False):
+        """
+        Renders an interval with the given render options
+        :param interval_output_file: Where the current output file should be saved
+        :param interval: The current Interval that should be processed
+        :param apply_filter: Whether the AV-Filter should be applied or if the media interval should be left untouched
+        :param drop_corrupted_intervals: Whether to remove corrupted frames from the video or keep them in unedited
+        :return: Whether it is corrupted or not
+        """
+
+        command = self.__generate_command(interval_output_file, interval, apply_filter)
+
+        if self.__segment_cache is not None and self.__segment_cache.load(self.__input_file, command):
+            return True
+
+        console_output = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+
+        conversion_failed = "Conversion failed!" in str(console_output.stdout).splitlines()[-1]
+
+        if conversion_failed:
+            if drop_corrupted_intervals:
+                return False
+            if apply_filter:
+                self.__render_interval(
+                    interval_output_file,
+                    interval,
+                    apply_filter=False,
+                    drop_corrupted_intervals=drop_corrupted_intervals
+                )
+            else:
+                raise IOError(f"Input file is corrupted between {interval.start} and {interval.end} (in seconds)")
+
+        if "Error initializing complex filter" in str(console_output.stdout):
+            raise ValueError("Invalid render options")
+
+        if not conversion_failed and self.__segment_cache is not None:
+            self.__segment_cache.save(self.__input_file, command)
+
+        return True
+
+    def __generate_command(self, interval_output_file: pathlib.Path, interval: Interval, apply_filter: bool):
+        """
+        Generates the ffmpeg command to process the video
+        :param interval_output_file: Where the media interval should be saved
+        :param interval: The current interval
+        :param apply_filter: Whether a filter should be applied or not
+        :return: ffmpeg console command
+        """
+        ffmpeg_binary = get_ffmpeg_binary()
+        command = [
+            ffmpeg_binary,
+            "-ss", f"{interval.start}",
+            "-to", f"{interval.end}",
+            "-i", f"{self.__input_file}",
+            "-vsync", "1",
+            "-async", "1",
+            "-safe", "0",
+            "-ignore_unknown", "-y",
+        ]
+
+        if apply_filter:
+            complex_filter = []
+
+            current_speed, current_volume = IntervalRenderer.get_speed_and_volume(interval, self.__render_options)
+
+            if not self.__render_options.audio_only:
+                complex_filter.extend([
+                    f"[0:v]setpts={round(1 / current_speed, 4)}*PTS[v]",
+                ])
+
+            complex_filter.extend([
+                f"[0:a]atempo={round(current_speed, 4)},volume={current_volume}[a]",
+            ])
+
+            command.extend(
+                ["-filter_complex", ";".join(complex_filter)]
+            )
+
+            if not self.__render_options.audio_only:
+                command.extend(["-map", "[v]"])
+
+            command.extend(["-map", "[a]"])
+        else:
+            if self.__render_options.audio_only:
+                command.append("-vn")
+
+        # Re-encoded intervals have to match the stream-copied ones, otherwise they can not be concatenated
+        encoder_arguments = None
+        if self.__media_index is not None:
+            encoder_arguments = get_matching_encoder_arguments(self.__media_index.streams, interval_output_file)
+
+        command.extend(encoder_arguments if encoder_arguments is not None else self.__codec_arguments)
+
+        if self.__ffmpeg_threads is not None:
+            command.extend(["-threads", str(self.__ffmpeg_threads)])
+
+        command.append(str(interval_output_file))
+
+        return command
+
+    @staticmethod
+    def get_speed_and_volume(interval: Interval, render_options: SimpleNamespace):
+        """
+        Gets the speed and volume an interval should be rendered with, the speed is clamped so the interval does not
+        get shorter than the minimum interval duration
+        :param interval: The interval that should be rendered
+        :param render_options: The parameters on how the media should be processed
+        :return: Tuple of speed and volume
+        """
+        if interval.is_silent:
+            speed = render_options.silent_speed
+            volume = render_options.silent_volume
+        else:
+            speed = render_options.audible_speed
+            volume = render_options.audible_volume
+
+        speed = IntervalRenderer.clamp_speed(interval.duration, speed, render_options.minimum_interval_duration)
+
+        return speed, volume
+
+    @staticmethod
+    def clamp_speed(duration: float, speed: float, minimum_interval_duration=0.25):
+        if duration / speed < minimum_interval_duration:
+            return duration / minimum_interval_duration
+        else:
+            return speed
@@ -1,15 +1,25 @@
+import collections
 import queue
 import shutil
 import subprocess
 import threading
-import time
 import uuid
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
 from pathlib import Path
 from types import SimpleNamespace
 import os
-import sys
+from unsilence.lib.intervals.Interval import Interval
 from unsilence.lib.intervals.Intervals import Intervals
-from unsilence.lib.render_media.RenderIntervalThread import RenderIntervalThread
+from unsilence.lib.media_index.MediaIndex import MediaIndex
+from unsilence.lib.media_index.MediaIndexCache import get_media_index
+from unsilence.lib.render_media.FilterGraph import render_filter_graph
+from unsilence.lib.render_media.IntervalRenderer import IntervalRenderer
+from unsilence.lib.render_media.RenderScheduler import estimate_render_cost, get_pixel_count, get_worker_plan, \
+    order_by_cost
+from unsilence.lib.render_media.SegmentCache import SegmentCache
+from unsilence.lib.render_media.SegmentFormat import choose_segment_format
+from unsilence.lib.render_media.StreamingConcatenator import StreamingConcatenator
+from unsilence.lib.tools.toolchain import get_ffmpeg_binary
 
 
 class MediaRenderer:
@@ -41,24 +51,194 @@ class MediaRenderer:
             audible_volume: The volume at which the audible intervals get played back at (float)
             silent_volume: The volume at which the silent intervals get played back at (float)
             drop_corrupted_intervals: Whether corrupted video intervals should be discarded or tried to recover (bool)
-            threads: Number of threads to render simultaneously (int > 0)
+            threads: Number of ffmpeg processes to render simultaneously, the available CPUs (respecting the CPU
+                quota of a container) are split evenly between them as ffmpeg threads (int > 0, default None: one
+                process per available CPU, at most one per interval or chunk)
+            filter_graph_threads: Number of threads of the single ffmpeg process of the "filtergraph" render engine
+                (int > 0, default None: one per available CPU)
+            render_engine: How the intervals should be rendered, "interval" renders every interval in its own ffmpeg
+                process and concatenates them afterwards, "filtergraph" renders all intervals in a single ffmpeg
+                process that decodes the input and encodes the output only once, "chunked" splits the intervals into
+                chunks of roughly equal output duration and renders every chunk as a filtergraph, the chunks are
+                rendered simultaneously, "pcm" (audio only) decodes the input to PCM once, changes the speed and
+                volume of the intervals in process and pipes the result into a single ffmpeg encoder, so no
+                temporary files are written, "cut" drops the silent intervals and stream-copies the audible ones
+                into the output in a single pass without re-encoding (requires an audible speed and volume of 1, the
+                cuts are moved back to keyframes unless smart_cut is set) (default "interval")
+            chunk_count: Number of chunks the "chunked" render engine should split the intervals into
+                (int > 0, default: twice the number of processes)
+            smart_cut: Whether the "interval" render engine should stream-copy the part between the first and the last
+                keyframe of intervals that are neither sped up nor changed in volume, only their edges and the other
+                intervals are re-encoded (with the codec parameters of the input), the "cut" render engine cuts exactly
+                instead of at keyframes by re-encoding the start of every audible interval up to its first keyframe
+                (bool, default False)
+            media_index_cache_dir: Directory where the keyframe index of the input is persisted, it is used by the
+                smart_cut option and to choose chunk boundaries (default None, the index is built when needed)
+            segment_cache_dir: Directory where the "interval" render engine persists the rendered interval files, so
+                later renders of the same file only render the intervals whose bounds or options changed
+                (default None, nothing is persisted)
+            max_pending_segments: Maximum number of intervals the "interval" render engine may have in progress, the
+                intervals are concatenated in order while the later ones are rendered and deleted afterwards, so this
+                bounds the temporary disk usage (int > 0, default: four times the number of processes). Within every
+                window of this many intervals, the most expensive ones are rendered first, so no long interval that is
+                started last delays the end of the render
+            segment_cache_size: Maximum size of the segment cache (in bytes), the least recently used segments are
+                evicted first (default 1 GiB)
+            executor: concurrent.futures.Executor the "interval" and "chunked" render engines submit their tasks to
+                instead of starting their own worker threads, so several renders can share one pool (default None)
             on_render_progress_update: Function that should be called on render progress update
                 (called like: func(current, total))
             on_concat_progress_update: Function that should be called on concat progress update
                 (called like: func(current, total))
         """
-        video_temp_path = self.__temp_path / str(uuid.uuid4())
-        os.makedirs(video_temp_path, exist_ok=True)
+        if not input_file.exists():
+            raise FileNotFoundError(f"Input file {input_file} does not exist!")
 
-        concat_file = video_temp_path / "concat_list.txt"
-        final_output = video_temp_path / f"out_final{output_file.suffix}"
+        render_engine = kwargs.get("render_engine", "interval")
+        if render_engine not in ["interval", "filtergraph", "chunked", "pcm", "cut"]:
+            raise ValueError(f"Unknown render engine {render_engine}")
+
+        render_options = MediaRenderer.get_render_options(**kwargs)
+
+        if render_engine == "pcm" and not render_options.audio_only:
+            raise ValueError("The pcm render engine can only render audio only outputs")
+
+        intervals = intervals.remove_short_intervals_from_start(
+            render_options.audible_speed,
+            render_options.silent_speed
+        )
 
         os.makedirs(output_file.parent, exist_ok=True)
 
+        video_temp_path = self.__temp_path / str(uuid.uuid4())
+        video_temp_path.mkdir(parents=True)
+
+        final_output = video_temp_path / f"out_final{output_file.suffix}"
+
+        # The temporary files are removed even if an engine fails
+        try:
+            if render_engine == "filtergraph":
+                render_filter_graph(
+                    input_file,
+                    final_output,
+                    intervals.intervals,
+                    render_options,
+                    video_temp_path / "filter_graph.txt",
+                    threads=kwargs.get("filter_graph_threads", None) or get_worker_plan(1).ffmpeg_threads,
+                    on_progress_update=kwargs.get("on_render_progress_update", None)
+                )
+
+                on_concat_progress_update = kwargs.get("on_concat_progress_update", None)
+                if on_concat_progress_update is not None:
+                    on_concat_progress_update(1, 1)
+            elif render_engine == "pcm":
+                # The pcm and cut engines are only imported when they are used, so they do not slow down the start
+                from unsilence.lib.render_media.PcmRenderer import render_pcm
+
+                render_pcm(
+                    input_file,
+                    final_output,
+                    intervals,
+                    render_options,
+                    on_progress_update=kwargs.get("on_render_progress_update", None)
+                )
+
+                on_concat_progress_update = kwargs.get("on_concat_progress_update", None)
+                if on_concat_progress_update is not None:
+                    on_concat_progress_update(1, 1)
+            elif render_engine == "cut":
+                from unsilence.lib.render_media.CutRenderer import render_cut
+
+                media_index = None
+                if not render_options.audio_only:
+                    media_index = get_media_index(input_file, kwargs.get("media_index_cache_dir", None))
+
+                render_cut(
+                    input_file,
+                    final_output,
+                    intervals,
+                    render_options,
+                    video_temp_path,
+                    media_index=media_index,
+                    threads=get_worker_plan(processes=kwargs.get("threads", None)).processes,
+                    on_progress_update=kwargs.get("on_render_progress_update", None)
+                )
+
+                on_concat_progress_update = kwargs.get("on_concat_progress_update", None)
+                if on_concat_progress_update is not None:
+                    on_concat_progress_update(1, 1)
+            elif render_engine == "chunked":
+                self.__render_chunks(
+                    input_file,
+                    final_output,
+                    intervals,
+                    render_options,
+                    video_temp_path,
+                    **kwargs
+                )
+            else:
+                self.__render_intervals_separately(
+                    input_file,
+                    final_output,
+                    intervals.intervals,
+                    render_options,
+                    video_temp_path,
+                    order_by_render_cost=True,
+                    **kwargs
+                )
+
+            shutil.move(final_output, output_file)
+        finally:
+            shutil.rmtree(video_temp_path, ignore_errors=True)
+
+    def render_stream(self, input_file: Path, output_file: Path, interval_iterator, **kwargs):
+        """
+        Renders an input_file like render(), but takes the intervals as a stream (e.g. from
+        lib.DetectSilence.detect_silence_stream), so every interval is rendered as soon as it arrives. Every interval is
+        rendered in its own ffmpeg process
+        :param input_file: The file that should be processed
+        :param output_file: Where the processed file should be saved
+        :param interval_iterator: Iterable of the intervals that should be processed (in timeline order)
+        :param kwargs: Keyword Args, see render() (render_engine has to be "interval" if it is given)
+        :return: None
+        """
         if not input_file.exists():
             raise FileNotFoundError(f"Input file {input_file} does not exist!")
 
-        render_options = SimpleNamespace(
+        if kwargs.get("render_engine", "interval") != "interval":
+            raise ValueError("Only the interval render engine can render a stream of intervals")
+
+        render_options = MediaRenderer.get_render_options(**kwargs)
+
+        os.makedirs(output_file.parent, exist_ok=True)
+
+        video_temp_path = self.__temp_path / str(uuid.uuid4())
+        video_temp_path.mkdir(parents=True)
+
+        final_output = video_temp_path / f"out_final{output_file.suffix}"
+
+        try:
+            self.__render_intervals_separately(
+                input_file,
+                final_output,
+                MediaRenderer.__remove_short_intervals_from_start(interval_iterator, render_options),
+                render_options,
+                video_temp_path,
+                **kwargs
+            )
+
+            shutil.move(final_output, output_file)
+        finally:
+            shutil.rmtree(video_temp_path, ignore_errors=True)
+
+    @staticmethod
+    def get_render_options(**kwargs):
+        """
+        Collects the render options from the keyword args of render()
+        :param kwargs: Keyword Args, see render()
+        :return: The parameters on how the media should be processed
+        """
+        return SimpleNamespace(
             audio_only=kwargs.get("audio_only", False),
             audible_speed=kwargs.get("audible_speed", 1),
             silent_speed=kwargs.get("silent_speed", 6),
@@ -66,106 +246,386 @@ class MediaRenderer:
             silent_volume=kwargs.get("silent_volume", 0.5),
             drop_corrupted_intervals=kwargs.get("drop_corrupted_intervals", False),
             check_intervals=kwargs.get("check_intervals", False),
-            minimum_interval_duration=kwargs.get("minimum_interval_duration", 0.25)
+            minimum_interval_duration=kwargs.get("minimum_interval_duration", 0.25),
+            smart_cut=kwargs.get("smart_cut", False)
         )
 
-        intervals = intervals.remove_short_intervals_from_start(
-            render_options.audible_speed,
-            render_options.silent_speed
+    @staticmethod
+    def __remove_short_intervals_from_start(interval_iterator, render_options: SimpleNamespace):
+        """
+        Skips the intervals at the start of a stream that are shorter than 0.5 seconds after the speedup, like
+        lib.Intervals.Intervals.remove_short_intervals_from_start
+        :param interval_iterator: Iterable of intervals
+        :param render_options: The parameters on how the media should be processed
+        :return: Generator of the remaining intervals
+        """
+        found_long_interval = False
+
+        for interval in interval_iterator:
+            if not found_long_interval:
+                speed = render_options.silent_speed if interval.is_silent else render_options.audible_speed
+                found_long_interval = interval.duration / speed > 0.5
+
+            if found_long_interval:
+                yield interval
+
+        if not found_long_interval:
+            raise Exception("No interval has a length over 0.5 seconds after speed changes! This is required.")
+
+    def __render_intervals_separately(self, input_file: Path, output_file: Path, interval_iterator,
+                                      render_options: SimpleNamespace, video_temp_path: Path,
+                                      order_by_render_cost: bool = False, **kwargs):
+        """
+        Renders every interval in its own ffmpeg process and concatenates the interval files in order while the later
+        intervals are still being rendered
+        :param input_file: The file that should be processed
+        :param output_file: Where the concatenated file should be saved
+        :param interval_iterator: Iterable of the intervals that should be processed, every interval is submitted to
+            the workers as soon as it arrives
+        :param render_options: The parameters on how the media should be processed
+        :param video_temp_path: The temp path where the interval files should be stored
+        :param order_by_render_cost: Whether the most expensive of the upcoming intervals should be rendered first,
+            within a window of max_pending_segments minus the number of processes (they are still concatenated in
+            timeline order)
+        :param kwargs: Keyword Args, see render()
+        :return: None
+        """
+        media_index = None
+        if render_options.smart_cut and not render_options.audio_only:
+            media_index = get_media_index(input_file, kwargs.get("media_index_cache_dir", None))
+
+        segment_cache = None
+        if kwargs.get("segment_cache_dir", None) is not None:
+            segment_cache = SegmentCache(
+                kwargs["segment_cache_dir"],
+                kwargs.get("segment_cache_size", 1024 * 1024 * 1024)
+            )
+
+        segment_format = choose_segment_format(output_file, render_options.audio_only)
+
+        worker_plan = get_worker_plan(
+            len(interval_iterator) if isinstance(interval_iterator, list) else None,
+            kwargs.get("threads", None)
         )
 
-        video_temp_path = self.__temp_path / str(uuid.uuid4())
-        video_temp_path.mkdir(parents=True)
+        renderer = IntervalRenderer(
+            input_file,
+            render_options,
+            media_index,
+            segment_cache,
+            segment_format.arguments,
+            worker_plan.ffmpeg_threads
+        )
+        on_render_progress_update = kwargs.get("on_render_progress_update", None)
+        max_pending_segments = kwargs.get("max_pending_segments", None)
+        if max_pending_segments is None:
+            max_pending_segments = 4 * worker_plan.processes
+
+        concatenator = StreamingConcatenator(
+            output_file,
+            max_pending_segments,
+            kwargs.get("on_concat_progress_update", None)
+        )
 
-        concat_file = video_temp_path / "concat_list.txt"
-        final_output = video_temp_path / f"out_final{output_file.suffix}"
+        submitted_tasks = []
+
+        def task_iterator():
+            """
+            Nested generator that creates a task for every interval as soon as it arrives
+            :return: Generator of tasks
+            """
+            for i, interval in enumerate(interval_iterator):
+                current_path = video_temp_path / f"out_{i}{segment_format.suffix}"
+                task = SimpleNamespace(task_id=i, interval_output_file=current_path, interval=interval)
+                submitted_tasks.append(task)
+                yield task
+
+        pixel_count = get_pixel_count(media_index.streams if media_index is not None else None)
+        tasks = task_iterator()
+        if order_by_render_cost:
+            # The reorder window stays below the capacity of the concatenation, so taking an expensive task early
+            # never blocks the submission while the workers are still busy with earlier tasks
+            tasks = order_by_cost(
+                tasks,
+                lambda task: estimate_render_cost(task.interval, render_options, pixel_count),
+                max(1, max_pending_segments - worker_plan.processes)
+            )
+
+        def submitted_task_iterator():
+            """
+            Nested generator that hands the tasks to the workers, it waits while too many rendered intervals are not
+            concatenated yet
+            :return: Generator of tasks
+            """
+            for task in tasks:
+                concatenator.wait_for_capacity()
+                yield task
 
-        file_list = []
+        def render_task(task):
+            """
+            Nested function that renders a task on a worker thread and passes its files on to the concatenation
+            :param task: The task that should be rendered
+            :return: Tuple of the task and whether it was completed (False if it was corrupted)
+            """
+            try:
+                rendered_task, completed = renderer.render(task)
+            except BaseException as error:
+                concatenator.abort(error)
+                raise
+
+            concatenator.add(rendered_task.task_id, rendered_task.output_files if completed else [])
+            return rendered_task, completed
 
-        thread_lock = threading.Lock()
-        task_queue = queue.Queue()
-        thread_list = []
         completed_tasks = []
-        corrupted_intervals = []
 
-        def handle_thread_completed_task(completed_task, corrupted):
+        def handle_completed_task(result):
             """
-            Nested function that is called when a thread completes it current task
-            :param completed_task: The completed task
-            :param corrupted: If the task contained a corrupted media part
+            Nested function that is called when a task is completed
+            :param result: Tuple of the completed task and whether it was completed (False if it was corrupted)
             :return: None
             """
-            func = kwargs.get("on_render_progress_update", None)
-
-            thread_lock.acquire()
+            completed_task, completed = result
 
-            if not corrupted:
+            if completed:
                 completed_tasks.append(completed_task)
-                if func is not None:
-                    func(len(completed_tasks), len(intervals.intervals))
-            else:
-                corrupted_intervals.append(completed_task)
-
-            thread_lock.release()
-
-        for i in range(kwargs.get("threads", 2)):
-            thread = RenderIntervalThread(i, input_file, render_options, task_queue, thread_lock,
-                                          on_task_completed=handle_thread_completed_task)
-            thread.start()
-            thread_list.append(thread)
+                if on_render_progress_update is not None:
+                    on_render_progress_update(len(completed_tasks), len(submitted_tasks))
+
+        try:
+            results = MediaRenderer.__run_tasks(
+                render_task,
+                submitted_task_iterator(),
+                worker_plan.processes,
+                handle_completed_task,
+                kwargs.get("executor", None)
+            )
+            streamed = concatenator.finish(len(submitted_tasks))
+        except BaseException as error:
+            concatenator.abort(error)
+            raise
+
+        # Codecs that can not be carried in the MPEG-TS stream are concatenated after all intervals are rendered
+        if not streamed:
+            results.sort(key=lambda result: result[0].task_id)
+            completed_file_list = [
+                output_file for task, completed in results if completed for output_file in task.output_files
+            ]
+
+            MediaRenderer.__concat_intervals(
+                completed_file_list,
+                video_temp_path / "concat_list.txt",
+                output_file,
+                kwargs.get("on_concat_progress_update", None)
+            )
+
+    def __render_chunks(self, input_file: Path, output_file: Path, intervals: Intervals,
+                        render_options: SimpleNamespace, video_temp_path: Path, **kwargs):
+        """
+        Splits the intervals into contiguous chunks, renders every chunk as a filtergraph in its own ffmpeg process
+        (multiple chunks simultaneously) and concatenates the chunk files afterwards
+        :param input_file: The file that should be processed
+        :param output_file: Where the concatenated file should be saved
+        :param intervals: The Intervals that should be processed
+        :param render_options: The parameters on how the media should be processed
+        :param video_temp_path: The temp path where the chunk files should be stored
+        :param kwargs: Keyword Args, see render()
+        :return: None
+        """
+        chunk_count = kwargs.get("chunk_count", None)
+        if chunk_count is None:
+            chunk_count = 2 * get_worker_plan(processes=kwargs.get("threads", None)).processes
 
-        for i, interval in enumerate(intervals.intervals):
-            current_file_name = f"out_{i}{output_file.suffix}"
-            current_path = video_temp_path / current_file_name
+        # Without a persistent index, probing the input would cost more than the snapped chunk boundaries save
+        media_index = None
+        if kwargs.get("media_index_cache_dir", None) is not None and not render_options.audio_only:
+            media_index = get_media_index(input_file, kwargs["media_index_cache_dir"])
 
-            file_list.append(current_path)
+        chunks = MediaRenderer.split_into_chunks(intervals, render_options, chunk_count, media_index)
+        worker_plan = get_worker_plan(len(chunks), kwargs.get("threads", None))
 
-            task = SimpleNamespace(task_id=i, interval_output_file=current_path, interval=interval)
+        on_render_progress_update = kwargs.get("on_render_progress_update", None)
+        progress_lock = threading.Lock()
+        chunk_progress = [0] * len(chunks)
+        chunk_totals = [0] * len(chunks)
 
-            thread_lock.acquire()
-            task_queue.put(task)
-            thread_lock.release()
+        def update_chunk_progress(chunk_id):
+            """
+            Creates a progress handler for a single chunk that reports the combined progress of all chunks
+            :param chunk_id: ID of the chunk
+            :return: Handler function
+            """
+            def handler(current, total):
+                with progress_lock:
+                    chunk_progress[chunk_id] = current
+                    chunk_totals[chunk_id] = total
 
-        while len(completed_tasks) < (len(intervals.intervals) - len(corrupted_intervals)):
-            time.sleep(0.5)
+                    if on_render_progress_update is not None and all(chunk_totals):
+                        on_render_progress_update(sum(chunk_progress), sum(chunk_totals))
 
-        for thread in thread_list:
-            thread.stop()
+            return handler
 
-        completed_file_list = [task.interval_output_file for task in sorted(completed_tasks, key=lambda x: x.task_id)]
+        def render_chunk(task):
+            """
+            Renders a single chunk, the input is seeked to the start of the first interval of the chunk
+            :param task: Task with a task_id and a list of contiguous intervals
+            :return: The task with the path of the rendered chunk (output_file)
+            """
+            chunk_start = task.intervals[0].start
+            chunk_end = task.intervals[-1].end
+            chunk_output_file = video_temp_path / f"chunk_{task.task_id}{output_file.suffix}"
+
+            render_filter_graph(
+                input_file,
+                chunk_output_file,
+                [Interval(interval.start - chunk_start, interval.end - chunk_start, interval.is_silent)
+                 for interval in task.intervals],
+                render_options,
+                video_temp_path / f"filter_graph_{task.task_id}.txt",
+                input_offset=chunk_start,
+                input_duration=chunk_end - chunk_start,
+                threads=worker_plan.ffmpeg_threads,
+                on_progress_update=update_chunk_progress(task.task_id)
+            )
+
+            task.output_file = chunk_output_file
+            return task
+
+        # The longest chunks are rendered first, the chunks are concatenated in timeline order afterwards
+        tasks = order_by_cost(
+            [SimpleNamespace(task_id=i, intervals=chunk) for i, chunk in enumerate(chunks)],
+            lambda task: sum(estimate_render_cost(interval, render_options) for interval in task.intervals)
+        )
+        rendered_tasks = MediaRenderer.__run_tasks(
+            render_chunk,
+            tasks,
+            worker_plan.processes,
+            executor=kwargs.get("executor", None)
+        )
+        chunk_file_list = [task.output_file for task in sorted(rendered_tasks, key=lambda task: task.task_id)]
 
         MediaRenderer.__concat_intervals(
-            completed_file_list,
-            concat_file,
-            final_output,
+            chunk_file_list,
+            video_temp_path / "concat_list.txt",
+            output_file,
             kwargs.get("on_concat_progress_update", None)
         )
 
-        shutil.move(final_output, output_file)
-        shutil.rmtree(video_temp_path)
+    @staticmethod
+    def split_into_chunks(intervals: Intervals, render_options: SimpleNamespace, chunk_count: int,
+                          media_index: MediaIndex = None):
+        """
+        Splits the intervals into contiguous chunks of roughly equal output duration (after the speed changes)
+        :param intervals: The Intervals that should be split
+        :param render_options: The parameters on how the media should be processed
+        :param chunk_count: The maximum number of chunks
+        :param media_index: Index of the input file, if it is given every chunk boundary is moved by up to one
+            interval to where the least has to be decoded after seeking
+        :return: List of chunks (lists of intervals)
+        """
+        output_durations = []
+        for interval in intervals.intervals:
+            speed, _ = IntervalRenderer.get_speed_and_volume(interval, render_options)
+            output_durations.append(interval.duration / speed)
+
+        chunk_duration = sum(output_durations) / chunk_count
+
+        chunks = []
+        current_chunk_id = None
+        elapsed = 0
+        for interval, output_duration in zip(intervals.intervals, output_durations):
+            # An interval belongs to the chunk its center falls into after the speed changes
+            chunk_id = min(int((elapsed + output_duration / 2) / chunk_duration), chunk_count - 1)
+            elapsed += output_duration
+
+            if chunk_id != current_chunk_id:
+                chunks.append([])
+                current_chunk_id = chunk_id
+
+            chunks[-1].append(interval)
+
+        if media_index is not None:
+            for i in range(1, len(chunks)):
+                # Candidates: keep the boundary, move it one interval back or one interval forward
+                candidates = {0: chunks[i][0].start}
+                if len(chunks[i - 1]) > 1:
+                    candidates[-1] = chunks[i - 1][-1].start
+                if len(chunks[i]) > 1:
+                    candidates[1] = chunks[i][1].start
+
+                shift = min(candidates, key=lambda candidate: media_index.get_seek_cost(candidates[candidate]))
+                if shift == -1:
+                    chunks[i].insert(0, chunks[i - 1].pop())
+                elif shift == 1:
+                    chunks[i - 1].append(chunks[i].pop(0))
+
+        return chunks
+
+    @staticmethod
+    def __run_tasks(function, task_iterator, threads: int, on_task_completed=None, executor: Executor = None):
+        """
+        Runs a function for every task on a pool of worker threads, exceptions raised by a worker are passed on to the
+        caller and the tasks that were not started yet get cancelled
+        :param function: Function that processes a single task (called like: func(task))
+        :param task_iterator: Iterable of tasks, tasks are submitted as soon as they arrive (it can be a generator that
+            is still producing tasks while the first ones are processed)
+        :param threads: Number of worker threads
+        :param on_task_completed: Function that should be called when a task is completed, in order of completion
+            and always from the calling thread (called like: func(result))
+        :param executor: Executor the tasks are submitted to (default None: a pool with the given number of
+            worker threads is started)
+        :return: List of the results, in the same order as the tasks
+        """
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                return MediaRenderer.__run_tasks(function, task_iterator, threads, on_task_completed, executor)
+
+        futures = []
+        done_futures = queue.SimpleQueue()
+        handled_futures = []
+
+        def handle_done_future():
+            handled_futures.append(done_futures.get())
+            result = handled_futures[-1].result()
+            if on_task_completed is not None:
+                on_task_completed(result)
+
+        try:
+            for task in task_iterator:
+                future = executor.submit(function, task)
+                future.add_done_callback(done_futures.put)
+                futures.append(future)
+
+                while not done_futures.empty():
+                    handle_done_future()
+
+            while len(handled_futures) < len(futures):
+                handle_done_future()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            # Like leaving a pool of our own, the tasks that are already running are waited for
+            wait(futures)
+            raise
+
+        return [future.result() for future in futures]
 
     @staticmethod
-    def __concat_intervals(file_list: list, concat_file: Path, output_file: Path, update_concat_progress):
+    def generate_concat_command(file_list: list, concat_file: Path, output_file: Path):
         """
-        Concatenates all interval files to create a finished file
+        Writes the list of the interval files and generates the ffmpeg command that concatenates them
         :param file_list: List of interval files
         :param concat_file: Where the ffmpeg concat filter file should be saved
         :param output_file: Where the final output file should be saved
-        :param update_concat_progress: A function that is called when a step is finished
-            (called like function(current, total))
-        :return: None
+        :return: ffmpeg console command
         """
-        total_files = len(file_list)
-    
         os.makedirs(output_file.parent, exist_ok=True)
 
         with open(str(concat_file), "w+") as file:
             lines = [f"file {interval_file.name}\n" for interval_file in file_list]
             file.writelines(lines)
 
-        ffmpeg_path = getattr(sys, '_MEIPASS', os.getcwd())
-        ffmpeg_binary = os.path.join(ffmpeg_path, 'ffmpeg')
-        command = [
+        ffmpeg_binary = get_ffmpeg_binary()
+        return [
             ffmpeg_binary,
             "-f", "concat",
             "-safe", "0",
@@ -176,6 +636,21 @@ class MediaRenderer:
             f"{output_file.as_posix()}"
         ]
 
+    @staticmethod
+    def __concat_intervals(file_list: list, concat_file: Path, output_file: Path, update_concat_progress):
+        """
+        Concatenates all interval files to create a finished file
+        :param file_list: List of interval files
+        :param concat_file: Where the ffmpeg concat filter file should be saved
+        :param output_file: Where the final output file should be saved
+        :param update_concat_progress: A function that is called when a step is finished
+            (called like function(current, total))
+        :raises: **IOError** -- If ffmpeg failed
+        :return: None
+        """
+        total_files = len(file_list)
+        command = MediaRenderer.generate_concat_command(file_list, concat_file, output_file)
+
         console_output = subprocess.Popen(
             command,
             stdout=subprocess.PIPE,
@@ -184,8 +659,17 @@ class MediaRenderer:
         )
 
         current_file = 0
+        last_lines = collections.deque(maxlen=20)
         for line in console_output.stdout:
+            last_lines.append(line.strip())
+
             if "Auto-inserting" in line:
                 if update_concat_progress is not None:
                     current_file += 1
                     update_concat_progress(current_file, total_files)
+
+        console_output.wait()
+
+        if console_output.returncode != 0:
+            error_message = "\n".join(last_lines)
+            raise IOError(f"Concatenating the intervals failed:\n{error_message}")
@@ -0,0 +1,232 @@
+import json
+import pathlib
+import subprocess
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+
+from unsilence.lib.intervals.Intervals import Intervals
+from unsilence.lib.render_media.IntervalRenderer import IntervalRenderer
+from unsilence.lib.render_media.TimeStretcher import TimeStretcher
+from unsilence.lib.tools.toolchain import get_ffmpeg_binary, get_ffprobe_binary
+
+
+def render_pcm(input_file: pathlib.Path, output_file: pathlib.Path, intervals: Intervals,
+               render_options: SimpleNamespace, **kwargs):
+    """
+    Renders the audio of a file without temporary files: the input is decoded to PCM once, the speed and volume of
+    every interval are changed in process and the result is piped into a single ffmpeg process that encodes the output
+    :param input_file: The file that should be processed
+    :param output_file: Where the rendered audio should be saved
+    :param intervals: The contiguous Intervals that should be rendered
+    :param render_options: The parameters on how the media should be processed (audio_only has to be set)
+    :param kwargs: Keyword Args, see below
+    :return: None
+
+    kwargs:
+        block_duration: Length of the blocks that are read from the decoder (default 1) (in seconds)
+        on_progress_update: Function that should be called on progress update
+            (called like: func(current, total), both in seconds of the output file)
+    """
+    if not render_options.audio_only:
+        raise ValueError("Only audio can be rendered from PCM")
+
+    if len(intervals) == 0:
+        raise ValueError("At least one interval is required to render PCM")
+
+    on_progress_update = kwargs.get("on_progress_update", None)
+    sample_rate, channels = probe_audio_format(input_file)
+    frame_size = channels * np.dtype(np.float32).itemsize
+    block_size = max(1, int(sample_rate * kwargs.get("block_duration", 1))) * frame_size
+
+    speeds_and_volumes = [
+        IntervalRenderer.get_speed_and_volume(interval, render_options) for interval in intervals.intervals
+    ]
+    interval_ends = np.round(intervals.ends * sample_rate).astype(np.int64)
+    first_sample = int(round(intervals.starts[0] * sample_rate))
+    output_duration = float(np.sum(intervals.durations / np.array([speed for speed, _ in speeds_and_volumes])))
+
+    ffmpeg_binary = get_ffmpeg_binary()
+
+    decoder = subprocess.Popen(
+        [
+            ffmpeg_binary,
+            "-nostats",
+            "-loglevel", "error",
+            "-i", f"{input_file}",
+            "-vn",
+            "-ac", str(channels),
+            "-ar", str(sample_rate),
+            "-f", "f32le",
+            "-"
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+
+    encoder = subprocess.Popen(
+        [
+            ffmpeg_binary,
+            "-nostats",
+            "-loglevel", "error",
+            "-f", "f32le",
+            "-ar", str(sample_rate),
+            "-ac", str(channels),
+            "-i", "-",
+            "-y",
+            f"{output_file}"
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+
+    # The error outputs have to be consumed simultaneously, otherwise ffmpeg blocks as soon as the pipe is full
+    error_lines = SimpleNamespace(decoder=[], encoder=[])
+
+    def collect_errors(process, lines):
+        """
+        Nested function that reads the error output of a process
+        :param process: The ffmpeg process
+        :param lines: List the lines are appended to
+        :return: None
+        """
+        for line in process.stderr:
+            lines.append(line.decode(errors="replace"))
+
+    error_threads = [
+        threading.Thread(target=collect_errors, args=(decoder, error_lines.decoder), daemon=True),
+        threading.Thread(target=collect_errors, args=(encoder, error_lines.encoder), daemon=True)
+    ]
+    for thread in error_threads:
+        thread.start()
+
+    state = SimpleNamespace(interval_id=0, stretcher=None, output_samples=0, decoded_completely=False)
+
+    def write(samples: np.ndarray):
+        """
+        Nested function that applies the volume of the current interval and passes the samples to the encoder
+        :param samples: Output samples of the current interval
+        :return: None
+        """
+        if len(samples) == 0:
+            return
+
+        _, volume = speeds_and_volumes[state.interval_id]
+        if volume != 1:
+            samples = np.clip(samples * volume, -1, 1)
+
+        encoder.stdin.write(np.ascontiguousarray(samples, dtype=np.float32).tobytes())
+        state.output_samples += len(samples)
+
+        if on_progress_update is not None:
+            on_progress_update(min(state.output_samples / sample_rate, output_duration), output_duration)
+
+    def finish_interval():
+        """
+        Nested function that writes the rest of the current interval and moves on to the next one
+        :return: None
+        """
+        if state.stretcher is not None:
+            write(state.stretcher.flush())
+        state.stretcher = None
+        state.interval_id += 1
+
+    try:
+        position = 0
+        remainder = b""
+
+        while state.interval_id < len(intervals):
+            data = decoder.stdout.read(block_size)
+            if not data:
+                state.decoded_completely = True
+                break
+
+            data = remainder + data
+            usable_size = len(data) - len(data) % frame_size
+            remainder = data[usable_size:]
+            block = np.frombuffer(data[:usable_size], dtype=np.float32).reshape(-1, channels)
+
+            # Samples before the first interval are skipped
+            if position < first_sample:
+                skipped = min(first_sample - position, len(block))
+                block = block[skipped:]
+                position += skipped
+
+            while len(block) > 0 and state.interval_id < len(intervals):
+                if state.stretcher is None:
+                    speed, _ = speeds_and_volumes[state.interval_id]
+                    state.stretcher = TimeStretcher(speed, sample_rate, channels)
+
+                # The last interval lasts until the end of the stream
+                is_last_interval = state.interval_id == len(intervals) - 1
+                interval_end = len(block) + position if is_last_interval else interval_ends[state.interval_id]
+                used = min(max(interval_end - position, 0), len(block))
+
+                write(state.stretcher.process(block[:used]))
+                block = block[used:]
+                position += used
+
+                if not is_last_interval and position >= interval_end:
+                    finish_interval()
+
+        if state.interval_id < len(intervals):
+            finish_interval()
+
+        decoder.stdout.close()
+        encoder.stdin.close()
+    except BrokenPipeError:
+        # The encoder failed, its error output is reported below
+        decoder.kill()
+    except BaseException:
+        decoder.kill()
+        encoder.kill()
+        raise
+    finally:
+        decoder.wait()
+        encoder.wait()
+        for thread in error_threads:
+            thread.join()
+
+    if encoder.returncode != 0:
+        raise IOError(f"Encoding the audio failed:\n{''.join(error_lines.encoder[-10:])}")
+
+    # The decoder is stopped early if the intervals end before the input does
+    if decoder.returncode != 0 and state.decoded_completely:
+        raise IOError(f"Decoding the audio of {input_file} failed:\n{''.join(error_lines.decoder[-10:])}")
+
+    if on_progress_update is not None:
+        on_progress_update(output_duration, output_duration)
+
+
+def probe_audio_format(input_file: pathlib.Path):
+    """
+    Gets the sample rate and the number of channels of the first audio stream of a file
+    :param input_file: The media file
+    :return: Tuple of the sample rate (in Hz) and the number of channels
+    """
+    ffprobe_binary = get_ffprobe_binary()
+
+    console_output = subprocess.run(
+        [
+            ffprobe_binary,
+            "-loglevel", "error",
+            "-select_streams", "a:0",
+            "-show_entries", "stream=sample_rate,channels",
+            "-of", "json",
+            f"{input_file}"
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+
+    if console_output.returncode != 0:
+        raise IOError(f"Probing {input_file} failed:\n{console_output.stderr}")
+
+    streams = json.loads(console_output.stdout).get("streams", [])
+    if len(streams) == 0:
+        raise IOError(f"{input_file} does not contain an audio stream")
+
+    return int(streams[0]["sample_rate"]), int(streams[0]["channels"])
@@ -0,0 +1,191 @@
+import pathlib
+import re
+
+import numpy as np
+
+from unsilence.lib.render_media.TimeMapping import TimeMapping
+
+# Timestamps of SRT (00:00:01,000) and WebVTT (00:00:01.000 or 00:01.000) files
+SUBTITLE_TIMESTAMP_PATTERN = re.compile(r"(?:(\d+):)?(\d{2}):(\d{2})[,.](\d{3})")
+CUE_TIMING_PATTERN = re.compile(
+    rf"^\s*({SUBTITLE_TIMESTAMP_PATTERN.pattern})\s*-->\s*({SUBTITLE_TIMESTAMP_PATTERN.pattern})(.*)$"
+)
+INLINE_TIMESTAMP_PATTERN = re.compile(rf"<({SUBTITLE_TIMESTAMP_PATTERN.pattern})>")
+
+
+def remap_subtitle_file(input_file: pathlib.Path, output_file: pathlib.Path, time_mapping: TimeMapping):
+    """
+    Rewrites the timestamps of a subtitle or chapter file so they match the rendered output. SRT and WebVTT files are
+    detected by their extension, ffmetadata files (e.g. chapters exported with "ffmpeg -i input -f ffmetadata") by
+    their header
+    :param input_file: The file with timestamps of the input media
+    :param output_file: Where the remapped file should be saved
+    :param time_mapping: The mapping of the render
+    :return: None
+    """
+    input_file = pathlib.Path(input_file)
+
+    with open(input_file, "r", encoding="utf-8-sig") as file:
+        content = file.read()
+
+    if content.startswith(";FFMETADATA"):
+        remapped_content = remap_ffmetadata(content, time_mapping)
+    elif input_file.suffix.lower() == ".srt":
+        remapped_content = remap_srt(content, time_mapping)
+    elif input_file.suffix.lower() == ".vtt":
+        remapped_content = remap_vtt(content, time_mapping)
+    else:
+        raise ValueError(f"Unknown subtitle format of {input_file.name}")
+
+    with open(output_file, "w", encoding="utf-8") as file:
+        file.write(remapped_content)
+
+
+def remap_srt(content: str, time_mapping: TimeMapping):
+    """
+    Remaps the cues of an SRT file, cues that end up without a duration (they were dropped) are removed and the rest
+    is renumbered
+    :param content: Content of the SRT file
+    :param time_mapping: The mapping of the render
+    :return: The remapped SRT content
+    """
+    cues = remap_cues(content, time_mapping, ",")
+
+    blocks = []
+    for lines in cues:
+        # The first line of a cue is its number
+        if len(lines) > 1 and lines[0].strip().isdigit():
+            lines = lines[1:]
+        blocks.append("\n".join([str(len(blocks) + 1)] + lines))
+
+    return "\n\n".join(blocks) + "\n"
+
+
+def remap_vtt(content: str, time_mapping: TimeMapping):
+    """
+    Remaps the cues (and the timestamps inside of them) of a WebVTT file, cues that end up without a duration (they
+    were dropped) are removed
+    :param content: Content of the WebVTT file
+    :param time_mapping: The mapping of the render
+    :return: The remapped WebVTT content
+    """
+    return "\n\n".join("\n".join(lines) for lines in remap_cues(content, time_mapping, ".")) + "\n"
+
+
+def remap_ffmetadata(content: str, time_mapping: TimeMapping):
+    """
+    Remaps the chapters of an ffmetadata file, chapters that end up without a duration (they were dropped) are removed
+    :param content: Content of the ffmetadata file
+    :param time_mapping: The mapping of the render
+    :return: The remapped ffmetadata content
+    """
+    sections = re.split(r"(?m)^(?=\[)", content)
+    chapters = []
+    timestamps = []
+
+    for section in sections:
+        if not section.startswith("[CHAPTER]"):
+            continue
+
+        values = dict(re.findall(r"(?m)^(TIMEBASE|START|END)=(\S+)$", section))
+        numerator, _, denominator = values.get("TIMEBASE", "1/1000").partition("/")
+        time_base = int(numerator) / int(denominator or 1)
+
+        chapters.append((section, time_base))
+        timestamps.extend([int(values.get("START", 0)) * time_base, int(values.get("END", 0)) * time_base])
+
+    remapped_timestamps = time_mapping.to_output_array(timestamps)
+
+    remapped_sections = []
+    chapter_id = 0
+    for section in sections:
+        if not section.startswith("[CHAPTER]"):
+            remapped_sections.append(section)
+            continue
+
+        _, time_base = chapters[chapter_id]
+        start, end = (int(round(time / time_base)) for time in remapped_timestamps[2 * chapter_id:2 * chapter_id + 2])
+        chapter_id += 1
+
+        if end <= start:
+            continue
+
+        section = re.sub(r"(?m)^START=\S+$", f"START={start}", section)
+        section = re.sub(r"(?m)^END=\S+$", f"END={end}", section)
+        remapped_sections.append(section)
+
+    return "".join(remapped_sections)
+
+
+def remap_cues(content: str, time_mapping: TimeMapping, decimal_separator: str):
+    """
+    Remaps the timings and inline timestamps of the cues of an SRT or WebVTT file, all timestamps are remapped at once
+    :param content: Content of the file
+    :param time_mapping: The mapping of the render
+    :param decimal_separator: Separator of the seconds and the milliseconds in the output ("," for SRT, "." for VTT)
+    :return: List of the remapped blocks (lists of lines), blocks without a cue (e.g. the WebVTT header) are kept
+    """
+    blocks = [block.split("\n") for block in re.split(r"\n[ \t]*\n", content.replace("\r\n", "\n").strip())]
+    timestamps = []
+
+    for lines in blocks:
+        for line in lines:
+            capture = CUE_TIMING_PATTERN.match(line)
+            if capture is not None:
+                timestamps.extend([parse_subtitle_timestamp(capture[1]), parse_subtitle_timestamp(capture[6])])
+            else:
+                timestamps.extend(
+                    parse_subtitle_timestamp(match[1]) for match in INLINE_TIMESTAMP_PATTERN.finditer(line)
+                )
+
+    remapped_timestamps = iter(time_mapping.to_output_array(timestamps).tolist())
+
+    remapped_blocks = []
+    for lines in blocks:
+        remapped_lines = []
+        dropped = False
+
+        for line in lines:
+            capture = CUE_TIMING_PATTERN.match(line)
+            if capture is not None:
+                start = next(remapped_timestamps)
+                end = next(remapped_timestamps)
+                dropped = end - start < 0.001
+
+                start = format_subtitle_timestamp(start, decimal_separator)
+                end = format_subtitle_timestamp(end, decimal_separator)
+                remapped_lines.append(f"{start} --> {end}{capture[11]}")
+            else:
+                remapped_lines.append(INLINE_TIMESTAMP_PATTERN.sub(
+                    lambda match: f"<{format_subtitle_timestamp(next(remapped_timestamps), decimal_separator)}>",
+                    line
+                ))
+
+        if not dropped:
+            remapped_blocks.append(remapped_lines)
+
+    return remapped_blocks
+
+
+def parse_subtitle_timestamp(timestamp: str):
+    """
+    Parses an SRT or WebVTT timestamp
+    :param timestamp: Timestamp (e.g. "00:01:02,500" or "01:02.500")
+    :return: Time in seconds
+    """
+    hours, minutes, seconds, milliseconds = SUBTITLE_TIMESTAMP_PATTERN.fullmatch(timestamp.strip()).groups()
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(milliseconds) / 1000
+
+
+def format_subtitle_timestamp(time: float, decimal_separator: str = ","):
+    """
+    Formats a time as an SRT or WebVTT timestamp
+    :param time: Time in seconds
+    :param decimal_separator: Separator of the seconds and the milliseconds ("," for SRT, "." for VTT)
+    :return: Timestamp (HH:MM:SS,mmm)
+    """
+    milliseconds = int(np.round(max(time, 0) * 1000))
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{decimal_separator}{milliseconds:03d}"
@@ -0,0 +1,106 @@
+import heapq
+from types import SimpleNamespace
+
+from unsilence.lib.intervals.Interval import Interval
+from unsilence.lib.render_media.IntervalRenderer import IntervalRenderer
+from unsilence.lib.tools.cpu_count import get_available_cpu_count
+
+
+def get_worker_plan(task_count: int = None, processes: int = None):
+    """
+    Splits the available CPUs between parallel ffmpeg processes, so the machine is neither oversubscribed (every
+    process starting one thread per CPU) nor idle (few processes with one thread each)
+    :param task_count: Number of tasks that will be rendered (None if unknown, e.g. for a stream of intervals)
+    :param processes: Number of parallel processes (None chooses it from the available CPUs)
+    :return: Plan with the number of processes and the number of threads (ffmpeg -threads) of every process
+    """
+    cpu_count = get_available_cpu_count()
+
+    if processes is None:
+        processes = cpu_count
+        if task_count is not None:
+            processes = min(processes, task_count)
+
+    processes = max(1, processes)
+
+    return SimpleNamespace(processes=processes, ffmpeg_threads=max(1, cpu_count // processes))
+
+
+def estimate_render_cost(interval: Interval, render_options: SimpleNamespace, pixel_count: int = 1):
+    """
+    Estimates how long rendering an interval takes (relative to other intervals): the output duration times the
+    number of pixels of a frame
+    :param interval: The interval that should be rendered
+    :param render_options: The parameters on how the media should be processed
+    :param pixel_count: Number of pixels of a video frame (1 for audio)
+    :return: Estimated cost
+    """
+    speed, _ = IntervalRenderer.get_speed_and_volume(interval, render_options)
+    return interval.duration / speed * pixel_count
+
+
+def order_by_cost(task_iterator, cost_function, window: int = None):
+    """
+    Reorders tasks so the most expensive ones are started first and no long task that is started last delays the end.
+    With a window, a sliding priority queue holds the next window // 2 tasks and is refilled as tasks are taken, and a
+    task is taken in order once window later tasks were read, so tasks that are consumed in order (e.g. concatenated)
+    are never held back by more than window tasks
+    :param task_iterator: Iterable of tasks in their original order
+    :param cost_function: Function that estimates the cost of a task (called like: func(task))
+    :param window: Maximum distance (in tasks) between a task and the earliest task that is not taken yet (None
+        reorders all tasks)
+    :return: Generator of the tasks
+    """
+    if window is None:
+        yield from sorted(task_iterator, key=cost_function, reverse=True)
+        return
+
+    window = max(1, window)
+    lookahead = max(1, window // 2)
+
+    task_iterator = iter(task_iterator)
+    exhausted = False
+    read_count = 0
+    oldest_index = 0
+    pending_tasks = {}
+    queue = []
+
+    while True:
+        while not exhausted and len(pending_tasks) < lookahead and read_count - oldest_index < window:
+            try:
+                task = next(task_iterator)
+            except StopIteration:
+                exhausted = True
+                break
+
+            pending_tasks[read_count] = task
+            heapq.heappush(queue, (-cost_function(task), read_count))
+            read_count += 1
+
+        if len(pending_tasks) == 0:
+            return
+
+        if read_count - oldest_index >= window:
+            index = oldest_index
+        else:
+            _, index = heapq.heappop(queue)
+            while index not in pending_tasks:
+                _, index = heapq.heappop(queue)
+
+        yield pending_tasks.pop(index)
+
+        while oldest_index < read_count and oldest_index not in pending_tasks:
+            oldest_index += 1
+
+
+def get_pixel_count(streams: dict):
+    """
+    Gets the number of pixels of a frame of the video stream
+    :param streams: Streams of the input, see lib.media_index.MediaIndex.MediaIndex.streams
+    :return: Number of pixels (1 if there is no video stream)
+    """
+    video_stream = streams.get("video", None) if streams is not None else None
+    if video_stream is None:
+        return 1
+
+    return max(1, int(video_stream.get("width", 1) or 1) * int(video_stream.get("height", 1) or 1))
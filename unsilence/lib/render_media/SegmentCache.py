@@ -0,0 +1,78 @@
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+from unsilence.lib.tools.FileCache import FileCache
+from unsilence.lib.tools.fingerprint import file_fingerprint
+
+
+class SegmentCache:
+    """
+    Caches rendered segments (interval files), keyed by a fingerprint of the input and the ffmpeg command that
+    rendered the segment. The command contains everything that changes the segment: the interval bounds, the
+    effective speed and volume, whether the output is audio only and the encoder settings
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int = 1024 * 1024 * 1024):
+        """
+        Initializes a new SegmentCache
+        :param cache_dir: Directory where the segments should be stored
+        :param max_size: Maximum size of all cached segments together (in bytes), None means unlimited
+        """
+        self.__file_cache = FileCache(cache_dir, max_size)
+        self.__fingerprints = {}
+        self.__lock = threading.Lock()
+
+    def load(self, input_file: Path, command: list):
+        """
+        Copies the cached result of a command to the output file of the command
+        :param input_file: The file the command processes
+        :param command: The ffmpeg command, the output file has to be the last argument
+        :return: Whether the segment was cached
+        """
+        return self.__file_cache.copy_to(self.__get_name(input_file, command), Path(command[-1]))
+
+    def save(self, input_file: Path, command: list):
+        """
+        Adds the output file of a command that completed successfully to the cache
+        :param input_file: The file the command processes
+        :param command: The ffmpeg command, the output file has to be the last argument
+        :return: None
+        """
+        self.__file_cache.put_copy(self.__get_name(input_file, command), Path(command[-1]))
+
+    def get_statistics(self):
+        """
+        Gets the hit/miss statistics and the size of the cache
+        :return: Statistics dict (hits, misses, size, max_size)
+        """
+        return self.__file_cache.get_statistics()
+
+    def __get_name(self, input_file: Path, command: list):
+        """
+        Gets the name of the cache file of a command, the paths of the input and the output and the number of threads
+        are not part of it
+        :param input_file: The file the command processes
+        :param command: The ffmpeg command, the output file has to be the last argument
+        :return: Name of the cache file
+        """
+        with self.__lock:
+            if input_file not in self.__fingerprints:
+                self.__fingerprints[input_file] = file_fingerprint(input_file)
+            fingerprint = self.__fingerprints[input_file]
+
+        output_file = Path(command[-1])
+        arguments = []
+        skip_next = False
+        for argument in command[1:-1]:
+            # The number of threads depends on the machine and does not change the result
+            if skip_next or argument == "-threads":
+                skip_next = not skip_next
+                continue
+
+            arguments.append("{input}" if argument == str(input_file) else argument)
+
+        command_hash = hashlib.blake2b(json.dumps(arguments).encode(), digest_size=16).hexdigest()
+
+        return f"{fingerprint}_{command_hash}{output_file.suffix}"
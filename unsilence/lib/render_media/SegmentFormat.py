@@ -0,0 +1,66 @@
+import pathlib
+from types import SimpleNamespace
+
+from unsilence.lib.tools.encoder_arguments import get_encoder
+from unsilence.lib.tools.ffmpeg_muxers import get_default_codecs, is_muxer_available
+
+# Muxers ffmpeg chooses for the file extensions of the output
+OUTPUT_MUXERS = {
+    ".mp4": "mp4",
+    ".m4v": "mp4",
+    ".m4a": "ipod",
+    ".mov": "mov",
+    ".mkv": "matroska",
+    ".mka": "matroska",
+    ".webm": "webm",
+    ".avi": "avi",
+    ".flv": "flv",
+    ".ts": "mpegts",
+    ".mp3": "mp3",
+    ".wav": "wav",
+    ".flac": "flac",
+    ".ogg": "ogg",
+    ".opus": "opus",
+    ".aac": "adts",
+}
+
+# Codecs that can be carried in an MPEG-TS stream
+TRANSPORT_STREAM_CODECS = [
+    "h264", "hevc", "mpeg1video", "mpeg2video", "mpeg4", "aac", "mp3", "mp2", "ac3", "eac3", "opus"
+]
+
+
+def choose_segment_format(output_file: pathlib.Path, audio_only: bool):
+    """
+    Chooses the container interval files (segments) are written in. Segments are encoded with the codecs the output
+    container would use, but written into a streaming-friendly container without a global header: MPEG-TS if it can
+    carry the codecs, else NUT or Matroska. They are remuxed into the container of the output only once, when they
+    are concatenated
+    :param output_file: Where the final file should be saved
+    :param audio_only: Whether the output is audio only
+    :return: Segment format with a suffix (file extension of the segments) and arguments (ffmpeg arguments that select
+        the codecs), if no intermediate container can be used the suffix of the output is kept without arguments
+    """
+    output_format = SimpleNamespace(suffix=output_file.suffix, arguments=[])
+
+    muxer = OUTPUT_MUXERS.get(output_file.suffix.lower(), None)
+    if muxer is None or not is_muxer_available(muxer):
+        return output_format
+
+    video_codec, audio_codec = get_default_codecs(muxer)
+    if audio_codec is None or (video_codec is None and not audio_only):
+        return output_format
+
+    codecs = [audio_codec] if audio_only else [video_codec, audio_codec]
+    arguments = ["-c:a", get_encoder(audio_codec)]
+    if not audio_only:
+        arguments = ["-c:v", get_encoder(video_codec)] + arguments
+
+    if all(codec in TRANSPORT_STREAM_CODECS for codec in codecs) and is_muxer_available("mpegts"):
+        return SimpleNamespace(suffix=".ts", arguments=arguments)
+
+    for suffix, intermediate_muxer in [(".nut", "nut"), (".mkv", "matroska")]:
+        if is_muxer_available(intermediate_muxer):
+            return SimpleNamespace(suffix=suffix, arguments=arguments)
+
+    return output_format
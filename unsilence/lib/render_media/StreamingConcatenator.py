@@ -0,0 +1,291 @@
+import json
+import os
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+
+from unsilence.lib.render_media.SegmentFormat import TRANSPORT_STREAM_CODECS
+from unsilence.lib.tools.toolchain import get_ffmpeg_binary, get_ffprobe_binary
+
+
+class StreamingConcatenator:
+    """
+    Concatenates interval files in order while the later intervals are still being rendered. Every file is remuxed
+    into an MPEG-TS stream (shifted by the duration of the previous files) that is piped into a single ffmpeg process
+    writing the output file, and it is deleted as soon as it was consumed. Files can be added in any order and from
+    any thread
+    """
+
+    def __init__(self, output_file: Path, max_pending_files: int = None, on_progress_update=None):
+        """
+        Initializes a new StreamingConcatenator
+        :param output_file: Where the concatenated file should be saved
+        :param max_pending_files: Maximum number of tasks that may be submitted but not concatenated yet, see
+            wait_for_capacity() (None means unlimited)
+        :param on_progress_update: Function that should be called when a task was concatenated
+            (called like: func(current, total), total is the number of tasks added so far until finish() is called)
+        """
+        self.__output_file = Path(output_file)
+        self.__max_pending_files = max_pending_files
+        self.__on_progress_update = on_progress_update
+
+        self.__condition = threading.Condition()
+        self.__pending_files = {}
+        self.__next_task_id = 0
+        self.__submitted_task_count = 0
+        self.__task_count = None
+        self.__error = None
+        self.__streaming = None
+
+        self.__process = None
+        self.__error_lines = []
+        self.__error_thread = None
+        self.__output_offset = 0
+
+        self.__thread = threading.Thread(target=self.__concatenate, daemon=True)
+        self.__thread.start()
+
+    def add(self, task_id: int, file_list: list):
+        """
+        Adds the rendered files of a task, tasks are concatenated in the order of their IDs (starting at 0)
+        :param task_id: ID of the task
+        :param file_list: The files of the task (empty if the task was dropped)
+        :return: None
+        """
+        with self.__condition:
+            self.__pending_files[task_id] = file_list
+            self.__condition.notify_all()
+
+    def abort(self, error: BaseException):
+        """
+        Stops the concatenation, e.g. because a task failed. Threads that wait for capacity are woken up
+        :param error: The reason, it is raised by wait_for_capacity() and finish()
+        :return: None
+        """
+        with self.__condition:
+            if self.__error is None:
+                self.__error = error
+            self.__condition.notify_all()
+
+        if self.__process is not None and self.__process.poll() is None:
+            self.__process.kill()
+
+        self.__thread.join()
+
+    def wait_for_capacity(self):
+        """
+        Blocks while the maximum number of submitted tasks are not concatenated yet, so the number of rendered files
+        on disk stays bounded. Has to be called before every task is submitted
+        :return: None
+        """
+        with self.__condition:
+            while self.__error is None and self.__streaming is not False and self.__max_pending_files is not None \
+                    and self.__submitted_task_count - self.__next_task_id >= self.__max_pending_files:
+                self.__condition.wait()
+
+            if self.__error is not None:
+                raise self.__error
+
+            self.__submitted_task_count += 1
+
+    def finish(self, task_count: int):
+        """
+        Waits until all tasks are concatenated and the output file is written
+        :param task_count: Number of tasks that were added
+        :raises: **IOError** -- If concatenating failed
+        :return: Whether the files were concatenated, False if their codecs can not be streamed and the files were
+            left untouched (they have to be concatenated afterwards)
+        """
+        with self.__condition:
+            self.__task_count = task_count
+            self.__condition.notify_all()
+
+        self.__thread.join()
+
+        if self.__error is not None:
+            raise self.__error
+
+        return self.__streaming is not False
+
+    def __concatenate(self):
+        """
+        Concatenation thread, consumes the files of the tasks in order
+        :return: None
+        """
+        try:
+            while True:
+                with self.__condition:
+                    while self.__error is None and self.__next_task_id not in self.__pending_files \
+                            and self.__next_task_id != self.__task_count:
+                        self.__condition.wait()
+
+                    if self.__error is not None or self.__next_task_id == self.__task_count:
+                        break
+
+                    file_list = self.__pending_files[self.__next_task_id]
+                    task_count = self.__task_count
+
+                for file in file_list:
+                    if self.__streaming is not False:
+                        self.__append_file(file)
+
+                with self.__condition:
+                    if self.__streaming is not False:
+                        del self.__pending_files[self.__next_task_id]
+                    self.__next_task_id += 1
+                    self.__condition.notify_all()
+
+                    if task_count is None:
+                        task_count = self.__submitted_task_count
+
+                if self.__on_progress_update is not None and self.__streaming is not False:
+                    self.__on_progress_update(self.__next_task_id, task_count)
+
+            if self.__error is None and self.__process is not None:
+                self.__close_output()
+        except BaseException as error:
+            with self.__condition:
+                if self.__error is None:
+                    self.__error = error
+                self.__condition.notify_all()
+
+    def __append_file(self, file: Path):
+        """
+        Remuxes a file into the MPEG-TS stream of the output and deletes it afterwards
+        :param file: The file that should be appended
+        :return: None
+        """
+        duration, codecs = StreamingConcatenator.__probe_file(file)
+
+        if self.__streaming is None:
+            self.__streaming = all(codec in TRANSPORT_STREAM_CODECS for codec in codecs)
+
+            if not self.__streaming:
+                with self.__condition:
+                    self.__condition.notify_all()
+                return
+
+            self.__open_output()
+
+        ffmpeg_binary = get_ffmpeg_binary()
+
+        remux_process = subprocess.Popen(
+            [
+                ffmpeg_binary,
+                "-loglevel", "error",
+                "-i", f"{file}",
+                "-map", "0",
+                "-c", "copy",
+                "-muxdelay", "0",
+                "-muxpreload", "0",
+                "-output_ts_offset", f"{self.__output_offset}",
+                "-f", "mpegts",
+                "-"
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+
+        try:
+            shutil.copyfileobj(remux_process.stdout, self.__process.stdin)
+        except BrokenPipeError:
+            remux_process.kill()
+            remux_process.wait()
+            raise IOError(f"Concatenating the intervals failed:\n{self.__read_output_errors()}")
+
+        error_output = remux_process.stderr.read().decode(errors="replace")
+        remux_process.wait()
+
+        if remux_process.returncode != 0:
+            raise IOError(f"Remuxing {file.name} failed:\n{error_output}")
+
+        self.__output_offset += duration
+        os.remove(file)
+
+    def __open_output(self):
+        """
+        Starts the ffmpeg process that reads the MPEG-TS stream and writes the output file
+        :return: None
+        """
+        os.makedirs(self.__output_file.parent, exist_ok=True)
+
+        ffmpeg_binary = get_ffmpeg_binary()
+
+        self.__process = subprocess.Popen(
+            [
+                ffmpeg_binary,
+                "-loglevel", "error",
+                "-f", "mpegts",
+                "-i", "-",
+                "-map", "0",
+                "-c", "copy",
+                "-y",
+                f"{self.__output_file}"
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+
+        # The error output has to be consumed simultaneously, otherwise ffmpeg blocks as soon as the pipe is full
+        self.__error_thread = threading.Thread(target=self.__collect_output_errors, daemon=True)
+        self.__error_thread.start()
+
+    def __close_output(self):
+        """
+        Closes the MPEG-TS stream and waits until the output file is written
+        :return: None
+        """
+        self.__process.stdin.close()
+        self.__process.wait()
+
+        if self.__process.returncode != 0:
+            raise IOError(f"Concatenating the intervals failed:\n{self.__read_output_errors()}")
+
+    def __collect_output_errors(self):
+        """
+        Reads the error output of the output process
+        :return: None
+        """
+        for line in self.__process.stderr:
+            self.__error_lines.append(line.decode(errors="replace"))
+
+    def __read_output_errors(self):
+        """
+        Gets the error output of the output process after it exited
+        :return: Error output
+        """
+        self.__process.wait()
+        self.__error_thread.join()
+        return "".join(self.__error_lines[-10:])
+
+    @staticmethod
+    def __probe_file(file: Path):
+        """
+        Gets the duration and the codecs of a file
+        :param file: The file that should be probed
+        :return: Tuple of the duration (in seconds) and the list of codec names
+        """
+        ffprobe_binary = get_ffprobe_binary()
+
+        console_output = subprocess.run(
+            [
+                ffprobe_binary,
+                "-loglevel", "error",
+                "-show_entries", "format=duration:stream=codec_name",
+                "-of", "json",
+                f"{file}"
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+
+        if console_output.returncode != 0:
+            raise IOError(f"Probing {file.name} failed:\n{console_output.stderr}")
+
+        probe = json.loads(console_output.stdout)
+        codecs = [stream.get("codec_name", "") for stream in probe.get("streams", [])]
+
+        return float(probe.get("format", {}).get("duration", 0)), codecs
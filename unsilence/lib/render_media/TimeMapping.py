@@ -0,0 +1,158 @@
+import bisect
+
+import numpy as np
+
+from unsilence.lib.intervals.Intervals import Intervals
+from unsilence.lib.render_media.MediaRenderer import MediaRenderer
+
+
+class TimeMapping:
+    """
+    Maps timestamps of the input to timestamps of the rendered output and back. Every interval of the input is mapped
+    linearly to its part of the output, so timestamps can be looked up with a binary search, and arrays of timestamps
+    can be mapped at once
+    """
+
+    def __init__(self, input_starts, input_ends, output_starts, output_ends):
+        """
+        Initializes a new TimeMapping
+        :param input_starts: Sorted start times of the intervals in the input (in seconds)
+        :param input_ends: End times of the intervals in the input (in seconds)
+        :param output_starts: Start times of the intervals in the output (in seconds)
+        :param output_ends: End times of the intervals in the output (in seconds, the start if the interval was
+            dropped)
+        """
+        self.__input_starts = np.asarray(input_starts, dtype=np.float64)
+        self.__input_ends = np.asarray(input_ends, dtype=np.float64)
+        self.__output_starts = np.asarray(output_starts, dtype=np.float64)
+        self.__output_ends = np.asarray(output_ends, dtype=np.float64)
+
+        # Output seconds per input second, 0 for dropped intervals
+        input_durations = self.__input_ends - self.__input_starts
+        self.__rates = np.divide(
+            self.__output_ends - self.__output_starts,
+            input_durations,
+            out=np.zeros_like(input_durations),
+            where=input_durations > 0
+        )
+
+        self.__input_start_list = self.__input_starts.tolist()
+        self.__output_start_list = self.__output_starts.tolist()
+
+    @staticmethod
+    def from_intervals(intervals: Intervals, **kwargs):
+        """
+        Creates the mapping of a render, with the same speeds the intervals are rendered with: the intervals at the
+        start that are removed before rendering are dropped and the speed of intervals that would get too short is
+        clamped, like lib.render_media.IntervalRenderer.IntervalRenderer.clamp_speed does
+        :param intervals: The Intervals that are rendered
+        :param kwargs: The keyword args of lib.render_media.MediaRenderer.MediaRenderer.render(), the "cut" render
+            engine drops the silent intervals
+        :return: New instance of TimeMapping
+        """
+        render_options = MediaRenderer.get_render_options(**kwargs)
+        rendered_intervals = intervals.remove_short_intervals_from_start(
+            render_options.audible_speed,
+            render_options.silent_speed
+        )
+
+        durations = rendered_intervals.durations
+        speeds = np.where(rendered_intervals.silent_flags, render_options.silent_speed, render_options.audible_speed)
+        speeds = np.where(
+            durations / speeds < render_options.minimum_interval_duration,
+            durations / render_options.minimum_interval_duration,
+            speeds
+        )
+
+        output_durations = np.divide(durations, speeds, out=np.zeros_like(durations), where=speeds > 0)
+        if kwargs.get("render_engine", "interval") == "cut":
+            output_durations[rendered_intervals.silent_flags] = 0
+
+        output_ends = np.cumsum(output_durations)
+        output_starts = output_ends - output_durations
+
+        starts = rendered_intervals.starts
+        ends = rendered_intervals.ends
+
+        # The intervals removed from the start are mapped to the start of the output
+        if len(rendered_intervals) < len(intervals):
+            starts = np.concatenate(([intervals.starts[0]], starts))
+            ends = np.concatenate(([starts[1]], ends))
+            output_starts = np.concatenate(([0.0], output_starts))
+            output_ends = np.concatenate(([0.0], output_ends))
+
+        return TimeMapping(starts, ends, output_starts, output_ends)
+
+    @property
+    def output_duration(self):
+        """
+        Returns the duration of the output
+        :return: Duration in seconds
+        """
+        return float(self.__output_ends[-1]) if len(self.__output_ends) > 0 else 0.0
+
+    def to_output(self, time: float):
+        """
+        Maps a timestamp of the input to the output, timestamps in dropped intervals are mapped to where the interval
+        would have been
+        :param time: Timestamp of the input (in seconds)
+        :return: Timestamp of the output (in seconds)
+        """
+        i = bisect.bisect_right(self.__input_start_list, time) - 1
+        if i < 0:
+            return 0.0
+
+        time = min(time, float(self.__input_ends[i]))
+        return float(self.__output_starts[i] + (time - self.__input_starts[i]) * self.__rates[i])
+
+    def to_input(self, time: float):
+        """
+        Maps a timestamp of the output to the input
+        :param time: Timestamp of the output (in seconds)
+        :return: Timestamp of the input (in seconds)
+        """
+        i = bisect.bisect_right(self.__output_start_list, time) - 1
+        if i < 0:
+            return float(self.__input_starts[0]) if len(self.__input_starts) > 0 else 0.0
+
+        if self.__rates[i] == 0:
+            return float(self.__input_starts[i])
+
+        return float(min(self.__input_starts[i] + (time - self.__output_starts[i]) / self.__rates[i],
+                         self.__input_ends[i]))
+
+    def to_output_array(self, times):
+        """
+        Maps an array of timestamps of the input to the output, see to_output()
+        :param times: Timestamps of the input (in seconds, any order)
+        :return: numpy float64 array of the timestamps of the output (in seconds)
+        """
+        times = np.asarray(times, dtype=np.float64)
+        indices = np.searchsorted(self.__input_starts, times, side="right") - 1
+        before_start = indices < 0
+        indices = np.maximum(indices, 0)
+
+        clamped_times = np.minimum(times, self.__input_ends[indices])
+        output_times = self.__output_starts[indices] + (clamped_times - self.__input_starts[indices]) * \
+            self.__rates[indices]
+
+        return np.where(before_start, 0.0, output_times)
+
+    def to_input_array(self, times):
+        """
+        Maps an array of timestamps of the output to the input, see to_input()
+        :param times: Timestamps of the output (in seconds, any order)
+        :return: numpy float64 array of the timestamps of the input (in seconds)
+        """
+        times = np.asarray(times, dtype=np.float64)
+        indices = np.maximum(np.searchsorted(self.__output_starts, times, side="right") - 1, 0)
+
+        rates = self.__rates[indices]
+        offsets = np.divide(
+            np.maximum(times - self.__output_starts[indices], 0),
+            rates,
+            out=np.zeros_like(times),
+            where=rates > 0
+        )
+
+        return np.minimum(self.__input_starts[indices] + offsets, self.__input_ends[indices])
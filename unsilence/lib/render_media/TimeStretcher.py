@@ -0,0 +1,165 @@
+import numpy as np
+
+
+class TimeStretcher:
+    """
+    Changes the tempo of PCM audio without changing its pitch (WSOLA, waveform similarity overlap-add). Every output
+    frame is cut from the input close to its nominal position, at the offset whose waveform matches the natural
+    continuation of the previous frame best, so the frames overlap without phase cancellation. The audio can be passed
+    in blocks of any size
+    """
+
+    # Fraction of the synthesis hop the frames may be moved to find the best match
+    __SEARCH_FRACTION = 0.5
+
+    # Only every n-th sample is compared while searching, which is precise enough for speech
+    __SEARCH_DECIMATION = 4
+
+    def __init__(self, speed: float, sample_rate: int, channels: int, frame_duration: float = 0.02):
+        """
+        Initializes a new TimeStretcher
+        :param speed: Factor the audio should be sped up by (> 1 makes it shorter)
+        :param sample_rate: Sample rate of the audio (in Hz)
+        :param channels: Number of channels of the audio
+        :param frame_duration: Length of the overlapping frames (in seconds)
+        """
+        self.__speed = speed
+        self.__channels = channels
+
+        self.__frame_length = max(8, 2 * int(round(sample_rate * frame_duration / 2)))
+        self.__synthesis_hop = self.__frame_length // 2
+        self.__analysis_hop = self.__synthesis_hop * speed
+        self.__search_range = int(self.__synthesis_hop * TimeStretcher.__SEARCH_FRACTION)
+
+        # A periodic hann window sums up to exactly one at an overlap of 50%
+        self.__window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(self.__frame_length) / self.__frame_length))
+        self.__window = self.__window.astype(np.float32)[:, np.newaxis]
+
+        # The input starts with half a frame of silence, so the first samples are not faded in. The output that
+        # corresponds to it is skipped
+        self.__input = np.zeros((self.__synthesis_hop, channels), dtype=np.float32)
+        self.__input_offset = 0
+        self.__input_length = 0
+        self.__frame_count = 0
+        self.__previous_position = None
+        self.__overlap = np.zeros((self.__frame_length, channels), dtype=np.float32)
+        self.__skipped_output = 0
+        self.__output_length = 0
+
+    def process(self, samples: np.ndarray):
+        """
+        Stretches the next block of samples
+        :param samples: numpy float32 array of shape (sample count, channels)
+        :return: The output samples that are complete (can be empty, the rest is returned by later calls or flush())
+        """
+        if self.__speed == 1:
+            self.__output_length += len(samples)
+            return samples
+
+        self.__input = np.concatenate((self.__input, samples))
+        self.__input_length += len(samples)
+
+        return self.__synthesize(self.__input_offset + len(self.__input))
+
+    def flush(self):
+        """
+        Stretches the rest of the samples, the stretcher can not be used afterwards
+        :return: The remaining output samples
+        """
+        if self.__speed == 1:
+            return np.empty((0, self.__channels), dtype=np.float32)
+
+        expected_length = int(round(self.__input_length / self.__speed))
+
+        # Silence after the end lets the last frames be synthesized completely
+        padding = np.zeros((self.__frame_length + self.__search_range, self.__channels), dtype=np.float32)
+        output_blocks = []
+        while self.__output_length < expected_length:
+            self.__input = np.concatenate((self.__input, padding))
+            output_blocks.append(self.__synthesize(self.__input_offset + len(self.__input)))
+
+        output = np.concatenate(output_blocks) if output_blocks else np.empty((0, self.__channels), dtype=np.float32)
+        surplus = self.__output_length - expected_length
+        self.__output_length = expected_length
+
+        return output[:len(output) - surplus]
+
+    def __synthesize(self, available_end: int):
+        """
+        Adds frames to the output as long as the input contains all samples they need
+        :param available_end: Absolute position after the last sample of the input buffer
+        :return: The output samples that were completed
+        """
+        frame_length = self.__frame_length
+        synthesis_hop = self.__synthesis_hop
+        output_blocks = []
+
+        while True:
+            nominal_position = int(round(self.__frame_count * self.__analysis_hop))
+            if nominal_position + self.__search_range + frame_length > available_end:
+                break
+
+            position = self.__find_best_position(nominal_position)
+            self.__previous_position = position
+
+            frame = self.__input[position - self.__input_offset:position - self.__input_offset + frame_length]
+            self.__overlap += frame * self.__window
+            output_blocks.append(self.__overlap[:synthesis_hop].copy())
+
+            self.__overlap = np.concatenate(
+                (self.__overlap[synthesis_hop:], np.zeros((synthesis_hop, self.__channels), dtype=np.float32))
+            )
+            self.__frame_count += 1
+
+        # Samples before the start of the next search region are not needed anymore
+        next_position = int(round(self.__frame_count * self.__analysis_hop)) - self.__search_range
+        if self.__previous_position is not None:
+            next_position = min(next_position, self.__previous_position + synthesis_hop)
+        if next_position > self.__input_offset:
+            self.__input = self.__input[next_position - self.__input_offset:]
+            self.__input_offset = next_position
+
+        if len(output_blocks) == 0:
+            return np.empty((0, self.__channels), dtype=np.float32)
+
+        output = np.concatenate(output_blocks)
+
+        # Skip the output of the silence at the start
+        if self.__skipped_output < synthesis_hop:
+            skipped = min(synthesis_hop - self.__skipped_output, len(output))
+            self.__skipped_output += skipped
+            output = output[skipped:]
+
+        self.__output_length += len(output)
+        return output
+
+    def __find_best_position(self, nominal_position: int):
+        """
+        Finds the position around the nominal position where the waveform matches the natural continuation of the
+        previous frame best
+        :param nominal_position: Absolute position the frame would be cut at without the search
+        :return: Absolute position of the frame
+        """
+        if self.__previous_position is None:
+            return nominal_position
+
+        search_start = max(self.__input_offset, nominal_position - self.__search_range)
+        search_end = nominal_position + self.__search_range
+        if search_end <= search_start:
+            return nominal_position
+
+        decimation = TimeStretcher.__SEARCH_DECIMATION
+        relative_continuation = self.__previous_position + self.__synthesis_hop - self.__input_offset
+        relative_start = search_start - self.__input_offset
+
+        # Only the first half of the frame overlaps with the previous frame
+        template = self.__input[relative_continuation:relative_continuation + self.__synthesis_hop:decimation]
+        region = self.__input[relative_start:search_end - self.__input_offset + self.__synthesis_hop:decimation]
+        template = template.sum(axis=1)
+        region = region.sum(axis=1)
+
+        if len(region) < len(template) or not np.any(template):
+            return nominal_position
+
+        similarity = np.correlate(region, template, mode="valid")
+        return search_start + int(np.argmax(similarity)) * decimation
@@ -0,0 +1,245 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+# States of a job, queued jobs are claimed by a worker (running) and end as completed, failed or cancelled
+JOB_STATES = ["queued", "running", "completed", "failed", "cancelled"]
+FINAL_JOB_STATES = ["completed", "failed", "cancelled"]
+
+# Seconds a running job stays claimed without a renew() of its queue, afterwards another queue may claim it again
+LEASE_DURATION = 60
+
+
+class JobQueue:
+    """
+    Persistent queue of render jobs in a SQLite database, jobs survive a restart of the server. Multiple queues (e.g.
+    of multiple servers) can share a database: every running job is leased to the queue that claimed it, and only
+    jobs whose lease expired (because their server stopped) are queued again. All methods can be called from any
+    thread
+    """
+
+    def __init__(self, database_file: Path):
+        """
+        Initializes a new JobQueue
+        :param database_file: The SQLite database file (created if it does not exist)
+        """
+        database_file = Path(database_file)
+        database_file.parent.mkdir(parents=True, exist_ok=True)
+
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(str(database_file), check_same_thread=False, isolation_level=None)
+        self.__connection.row_factory = sqlite3.Row
+        self.__owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        with self.__lock:
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "state TEXT NOT NULL, "
+                "input_file TEXT NOT NULL, "
+                "output_file TEXT NOT NULL, "
+                "options TEXT NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "started_at REAL, "
+                "finished_at REAL, "
+                "error TEXT, "
+                "result TEXT, "
+                "owner TEXT, "
+                "lease_expires_at REAL)"
+            )
+
+            # Databases of earlier versions have no leases yet
+            columns = [row["name"] for row in self.__connection.execute("PRAGMA table_info(jobs)")]
+            for column, column_type in [("owner", "TEXT"), ("lease_expires_at", "REAL")]:
+                if column not in columns:
+                    self.__connection.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id)")
+
+    def submit(self, input_file: Path, output_file: Path, options: dict):
+        """
+        Adds a job to the end of the queue
+        :param input_file: The file that should be processed
+        :param output_file: Where the processed file should be saved
+        :param options: JSON serializable options of the job
+        :return: The job, see get()
+        """
+        with self.__lock:
+            cursor = self.__connection.execute(
+                "INSERT INTO jobs (state, input_file, output_file, options, created_at) VALUES ('queued', ?, ?, ?, ?)",
+                (str(input_file), str(output_file), json.dumps(options), time.time())
+            )
+
+        return self.get(cursor.lastrowid)
+
+    def claim(self):
+        """
+        Takes the oldest queued job (or a running job whose lease expired) and leases it to this queue
+        :return: The job, see get(), or None if no job is queued
+        """
+        with self.__lock:
+            now = time.time()
+
+            self.__connection.execute(
+                "UPDATE jobs SET state = 'queued', started_at = NULL, owner = NULL, lease_expires_at = NULL "
+                "WHERE state = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+                (now,)
+            )
+
+            while True:
+                row = self.__connection.execute(
+                    "SELECT id FROM jobs WHERE state = 'queued' ORDER BY id LIMIT 1"
+                ).fetchone()
+
+                if row is None:
+                    return None
+
+                # Another queue on the same database may claim the job in between, then the next one is tried
+                cursor = self.__connection.execute(
+                    "UPDATE jobs SET state = 'running', started_at = ?, owner = ?, lease_expires_at = ? "
+                    "WHERE id = ? AND state = 'queued'",
+                    (now, self.__owner, now + LEASE_DURATION, row["id"])
+                )
+
+                if cursor.rowcount > 0:
+                    break
+
+        return self.get(row["id"])
+
+    def renew(self):
+        """
+        Extends the leases of all jobs this queue is running, has to be called more often than every LEASE_DURATION
+        seconds
+        :return: None
+        """
+        with self.__lock:
+            self.__connection.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE state = 'running' AND owner = ?",
+                (time.time() + LEASE_DURATION, self.__owner)
+            )
+
+    def complete(self, job_id: int, result: dict):
+        """
+        Marks a running job as completed
+        :param job_id: ID of the job
+        :param result: JSON serializable result of the job
+        :return: None
+        """
+        self.__finish(job_id, "completed", result=json.dumps(result))
+
+    def fail(self, job_id: int, error: str):
+        """
+        Marks a running job as failed
+        :param job_id: ID of the job
+        :param error: Description of the error
+        :return: None
+        """
+        self.__finish(job_id, "failed", error=error)
+
+    def cancel(self, job_id: int):
+        """
+        Cancels a job if it was not claimed by a worker yet
+        :param job_id: ID of the job
+        :return: Whether the job was cancelled
+        """
+        with self.__lock:
+            cursor = self.__connection.execute(
+                "UPDATE jobs SET state = 'cancelled', finished_at = ? WHERE id = ? AND state = 'queued'",
+                (time.time(), job_id)
+            )
+
+        return cursor.rowcount > 0
+
+    def __finish(self, job_id: int, state: str, error: str = None, result: str = None):
+        """
+        Stores the final state of a job, unless its lease expired and another queue claimed it
+        :param job_id: ID of the job
+        :param state: The final state
+        :param error: Description of the error or None
+        :param result: JSON encoded result or None
+        :return: None
+        """
+        with self.__lock:
+            self.__connection.execute(
+                "UPDATE jobs SET state = ?, finished_at = ?, error = ?, result = ?, owner = NULL, "
+                "lease_expires_at = NULL WHERE id = ? AND state = 'running' AND owner = ?",
+                (state, time.time(), error, result, job_id, self.__owner)
+            )
+
+    def get(self, job_id: int):
+        """
+        Gets a job
+        :param job_id: ID of the job
+        :return: dict with id, state, input_file, output_file, options, created_at, started_at, finished_at,
+            queue_latency (seconds between creation and start), error and result, or None if the job does not exist
+        """
+        with self.__lock:
+            row = self.__connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+        return JobQueue.__to_job(row) if row is not None else None
+
+    def list(self, state: str = None, limit: int = 100):
+        """
+        Lists the most recent jobs
+        :param state: Only list jobs in this state (default: all states)
+        :param limit: Maximum number of jobs
+        :return: List of jobs (see get()), the newest first
+        """
+        with self.__lock:
+            if state is None:
+                rows = self.__connection.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+            else:
+                rows = self.__connection.execute(
+                    "SELECT * FROM jobs WHERE state = ? ORDER BY id DESC LIMIT ?",
+                    (state, limit)
+                ).fetchall()
+
+        return [JobQueue.__to_job(row) for row in rows]
+
+    def get_statistics(self):
+        """
+        Counts the jobs per state
+        :return: dict of state to number of jobs
+        """
+        with self.__lock:
+            rows = self.__connection.execute("SELECT state, COUNT(*) AS count FROM jobs GROUP BY state").fetchall()
+
+        counts = {state: 0 for state in JOB_STATES}
+        counts.update({row["state"]: row["count"] for row in rows})
+
+        return counts
+
+    def close(self):
+        """
+        Closes the database connection
+        :return: None
+        """
+        with self.__lock:
+            self.__connection.close()
+
+    @staticmethod
+    def __to_job(row: sqlite3.Row):
+        """
+        Converts a database row to a job dict
+        :param row: The database row
+        :return: The job dict, see get()
+        """
+        return {
+            "id": row["id"],
+            "state": row["state"],
+            "input_file": row["input_file"],
+            "output_file": row["output_file"],
+            "options": json.loads(row["options"]),
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "queue_latency": row["started_at"] - row["created_at"] if row["started_at"] is not None else None,
+            "error": row["error"],
+            "result": json.loads(row["result"]) if row["result"] is not None else None,
+        }
@@ -0,0 +1,259 @@
+import atexit
+import shutil
+import threading
+import traceback
+from pathlib import Path
+from types import SimpleNamespace
+
+from unsilence.lib.server.JobQueue import FINAL_JOB_STATES, LEASE_DURATION, JobQueue
+from unsilence.lib.tools.cache_dir import resolve_cache_dir
+from unsilence.lib.tools.cpu_count import get_available_cpu_count
+
+# Options a job may set, they are passed to the silence detection or to the renderer
+DETECT_OPTIONS = ["silence_level", "silence_time_threshold", "short_interval_threshold", "stretch_time",
+                  "detection_engine"]
+RENDER_OPTIONS = ["audio_only", "audible_speed", "silent_speed", "audible_volume", "silent_volume",
+                  "drop_corrupted_intervals", "check_intervals", "minimum_interval_duration", "render_engine",
+                  "chunk_count", "smart_cut", "max_pending_segments"]
+
+
+class JobRunner:
+    """
+    Runs the jobs of a JobQueue on a bounded number of worker threads. All jobs share the detection and segment caches,
+    so a file that was processed before is not detected again and unchanged segments are not rendered again
+    """
+
+    def __init__(self, job_queue: JobQueue, temp_dir: Path = Path(".tmp"), cache_dir: Path = None,
+                 workers: int = 2, threads: int = None):
+        """
+        Initializes a new JobRunner
+        :param job_queue: The queue the jobs are taken from
+        :param temp_dir: The temp dir where temporary files can be saved
+        :param cache_dir: The dir where data that can be reused by later jobs is persisted (default None: the
+            directory of lib.tools.cache_dir.get_cache_dir(), False disables caching)
+        :param workers: Number of jobs that run at the same time
+        :param threads: Number of ffmpeg processes of all running jobs together, they are split evenly between the
+            workers (default None: one per available CPU)
+        """
+        self.__job_queue = job_queue
+        self.__temp_dir = Path(temp_dir)
+        self.__cache_dir = resolve_cache_dir(cache_dir)
+        self.__threads = threads if threads is not None else get_available_cpu_count()
+        self.__workers = max(1, min(workers, self.__threads))
+
+        self.__progress = {}
+        self.__condition = threading.Condition()
+        self.__stopped = False
+        self.__worker_threads = []
+
+    @property
+    def workers(self):
+        """
+        Number of jobs that run at the same time
+        :return: int
+        """
+        return self.__workers
+
+    @property
+    def stopped(self):
+        """
+        Whether the runner was stopped
+        :return: bool
+        """
+        return self.__stopped
+
+    @staticmethod
+    def check_options(options: dict):
+        """
+        Checks the options of a new job
+        :param options: The options of the job
+        :return: None
+        :raises ValueError: If an option is unknown
+        """
+        unknown_options = [key for key in options.keys() if key not in DETECT_OPTIONS + RENDER_OPTIONS]
+        if len(unknown_options) > 0:
+            raise ValueError(f"Unknown options: {', '.join(unknown_options)}")
+
+    def start(self):
+        """
+        Starts the worker threads and the thread that renews the leases of the running jobs
+        :return: None
+        """
+        for i in range(self.__workers):
+            worker_thread = threading.Thread(target=self.__run_worker, name=f"unsilence-worker-{i}", daemon=True)
+            worker_thread.start()
+            self.__worker_threads.append(worker_thread)
+
+        lease_thread = threading.Thread(target=self.__renew_leases, name="unsilence-leases", daemon=True)
+        lease_thread.start()
+        self.__worker_threads.append(lease_thread)
+
+    def stop(self):
+        """
+        Stops the worker threads after their current job and removes the temp dir, unfinished jobs stay in the queue
+        :return: None
+        """
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+
+        for worker_thread in self.__worker_threads:
+            worker_thread.join()
+
+        if self.__temp_dir.exists():
+            shutil.rmtree(self.__temp_dir, ignore_errors=True)
+
+    def notify(self):
+        """
+        Wakes up the workers and the progress listeners, has to be called after a job was submitted or cancelled
+        :return: None
+        """
+        with self.__condition:
+            self.__condition.notify_all()
+
+    def get_progress(self, job_id: int):
+        """
+        Gets the progress of a running job
+        :param job_id: ID of the job
+        :return: SimpleNamespace with stage, current and total or None if the job is not running
+        """
+        with self.__condition:
+            return self.__progress.get(job_id, None)
+
+    def wait_for_update(self, job_id: int, last_progress=None, timeout: float = None):
+        """
+        Waits until the progress of a job changes, any other update of the runner (e.g. a job of the queue was
+        cancelled) or the timeout also end the wait, so the caller has to compare the returned job and progress
+        :param job_id: ID of the job
+        :param last_progress: The progress the caller already knows (see get_progress())
+        :param timeout: Maximum time to wait (in seconds)
+        :return: Tuple of the job (see JobQueue.get()) and its progress
+        """
+        with self.__condition:
+            if not self.__stopped and self.__progress.get(job_id, None) is last_progress:
+                self.__condition.wait(timeout)
+
+            progress = self.__progress.get(job_id, None)
+
+        return self.__job_queue.get(job_id), progress
+
+    def __renew_leases(self):
+        """
+        Renews the leases of the running jobs until the runner is stopped, so other servers on the same database do not
+        take them over
+        :return: None
+        """
+        while True:
+            with self.__condition:
+                self.__condition.wait_for(lambda: self.__stopped, LEASE_DURATION / 4)
+                if self.__stopped:
+                    return
+
+                has_running_jobs = len(self.__progress) > 0
+
+            if has_running_jobs:
+                self.__job_queue.renew()
+
+    def __run_worker(self):
+        """
+        Processes queued jobs until the runner is stopped
+        :return: None
+        """
+        while True:
+            with self.__condition:
+                job = None
+                while not self.__stopped:
+                    job = self.__job_queue.claim()
+                    if job is not None:
+                        break
+
+                    # Submitting calls notify(), the timeout only guards against jobs added by other processes
+                    self.__condition.wait(5)
+
+                if job is None:
+                    return
+
+                self.__progress[job["id"]] = SimpleNamespace(stage="detect", current=0, total=1)
+                self.__condition.notify_all()
+
+            try:
+                result = self.__run_job(job)
+            except Exception as error:
+                self.__job_queue.fail(job["id"], "".join(traceback.format_exception_only(type(error), error)).strip())
+            else:
+                self.__job_queue.complete(job["id"], result)
+
+            with self.__condition:
+                del self.__progress[job["id"]]
+                self.__condition.notify_all()
+
+    def __run_job(self, job: dict):
+        """
+        Detects silence in the input file of a job and renders it
+        :param job: The job, see JobQueue.get()
+        :return: JSON serializable result of the job
+        """
+        from unsilence.Unsilence import Unsilence
+
+        job_id = job["id"]
+        options = job["options"]
+        threads = max(1, self.__threads // self.__workers)
+
+        def update_progress(stage):
+            """
+            Creates a progress handler for a stage of the job
+            :param stage: Name of the stage
+            :return: Handler function
+            """
+            def handler(current, total):
+                with self.__condition:
+                    self.__progress[job_id] = SimpleNamespace(stage=stage, current=current, total=total)
+                    self.__condition.notify_all()
+
+            return handler
+
+        unsilence = Unsilence(job["input_file"], self.__temp_dir, self.__cache_dir or False)
+
+        try:
+            unsilence.detect_silence(
+                on_silence_detect_progress_update=update_progress("detect"),
+                threads=threads,
+                **{key: value for key, value in options.items() if key in DETECT_OPTIONS}
+            )
+
+            cache_statistics = unsilence.get_cache_statistics()
+            render_options = {key: value for key, value in options.items() if key in RENDER_OPTIONS}
+
+            unsilence.render_media(
+                Path(job["output_file"]),
+                on_render_progress_update=update_progress("render"),
+                on_concat_progress_update=update_progress("concat"),
+                threads=threads,
+                **render_options
+            )
+
+            time_data = unsilence.estimate_time(
+                render_options.get("audible_speed", 1),
+                render_options.get("silent_speed", 6)
+            )
+        finally:
+            # The temp dir is shared with the other workers and removed in stop(), the server would otherwise keep
+            # every Unsilence object (of completed and failed jobs) alive until it exits
+            atexit.unregister(unsilence.cleanup)
+
+        return {
+            "output_file": job["output_file"],
+            "intervals": len(unsilence.get_intervals().intervals),
+            "duration_before": time_data["before"]["all"][0],
+            "duration_after": time_data["after"]["all"][0],
+            "detection_cache_hit": cache_statistics is not None and cache_statistics["hits"] > 0,
+        }
+
+    @staticmethod
+    def is_final(job: dict):
+        """
+        Checks whether a job will not change anymore
+        :param job: The job, see JobQueue.get()
+        :return: Whether the job is completed, failed or cancelled
+        """
+        return job["state"] in FINAL_JOB_STATES
@@ -0,0 +1,388 @@
+import json
+import os
+import re
+import socketserver
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from unsilence.lib.server.JobQueue import JOB_STATES, JobQueue
+from unsilence.lib.server.JobRunner import JobRunner
+from unsilence.lib.tools.cache_dir import get_cache_dir
+
+# Seconds after which an idle event stream sends a comment, so proxies and clients do not time out
+EVENT_STREAM_KEEP_ALIVE = 15
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    HTTP server on a Unix domain socket, every request is handled in its own thread
+    """
+    daemon_threads = True
+
+
+class JobServer:
+    """
+    Local HTTP server that queues render jobs persistently and runs them on a bounded worker pool. It is reachable over
+    TCP or a Unix domain socket and never connects anywhere itself
+
+    Endpoints (all responses are JSON):
+        GET /status: Number of jobs per state, workers and uptime
+        GET /jobs?state=queued&limit=100: The most recent jobs
+        POST /jobs: Submits a job, the body is {"input_file": ..., "output_file": ..., "options": {...}}
+        GET /jobs/<id>: A job and its progress
+        GET /jobs/<id>/events: Server-sent events ("progress" while the job is queued or running, "done" at the end)
+        DELETE /jobs/<id>: Cancels a job that was not started yet
+
+    Requests from web pages are rejected: the Host header has to name the listen address (so DNS rebinding does not
+    work), an Origin header has to be the server itself and POST bodies have to be sent as application/json (which a
+    page can not send cross-origin without a preflight)
+    """
+
+    def __init__(self, database_file: Path = None, temp_dir: Path = Path(".tmp"), cache_dir: Path = None,
+                 workers: int = 2, threads: int = None, output_dir: Path = None, verbose: bool = False):
+        """
+        Initializes a new JobServer
+        :param database_file: The SQLite database file of the job queue (default None: jobs.sqlite3 in the directory
+            of lib.tools.cache_dir.get_cache_dir())
+        :param temp_dir: The temp dir where temporary files can be saved
+        :param cache_dir: The dir where data that can be reused by later jobs is persisted (default None: the
+            directory of lib.tools.cache_dir.get_cache_dir(), False disables caching)
+        :param workers: Number of jobs that run at the same time
+        :param threads: Number of ffmpeg processes of all running jobs together (default None: one per available CPU)
+        :param output_dir: Directory the output files of all jobs have to be in, relative output files are relative to
+            it (default None: output files can be anywhere)
+        :param verbose: Whether every request should be logged to stderr
+        """
+        if database_file is None:
+            database_file = get_cache_dir() / "jobs.sqlite3"
+
+        self.job_queue = JobQueue(database_file)
+        self.job_runner = JobRunner(self.job_queue, temp_dir, cache_dir, workers, threads)
+        self.output_dir = Path(output_dir).absolute() if output_dir is not None else None
+        self.verbose = verbose
+        self.start_time = None
+        self.allowed_hosts = None
+        self.__http_server = None
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8080, socket_path: Path = None, on_started=None):
+        """
+        Starts the workers and handles requests until shutdown() is called
+        :param host: The address the server should listen on
+        :param port: The port the server should listen on (0 chooses a free port)
+        :param socket_path: Path of a Unix domain socket the server should listen on instead of host and port
+        :param on_started: Function that should be called once the server accepts connections
+            (called like: func(address), address is a URL or the socket path)
+        :return: None
+        """
+        if socket_path is not None:
+            socket_path = Path(socket_path)
+            if socket_path.exists():
+                socket_path.unlink()
+
+            self.__http_server = ThreadingUnixHTTPServer(str(socket_path), JobRequestHandler)
+            address = str(socket_path)
+            self.allowed_hosts = None
+        else:
+            self.__http_server = ThreadingHTTPServer((host, port), JobRequestHandler)
+            self.__http_server.daemon_threads = True
+            port = self.__http_server.server_address[1]
+            address = f"http://{host}:{port}"
+            host_names = [host.lower(), f"[{host.lower()}]", "localhost", "127.0.0.1", "[::1]"]
+            self.allowed_hosts = {f"{name}:{port}" for name in host_names}
+            if port == 80:
+                self.allowed_hosts.update(host_names)
+
+        self.__http_server.job_server = self
+        self.start_time = time.time()
+        self.job_runner.start()
+
+        try:
+            if on_started is not None:
+                on_started(address)
+
+            self.__http_server.serve_forever()
+        finally:
+            self.job_runner.stop()
+            self.__http_server.server_close()
+            self.job_queue.close()
+
+            if socket_path is not None and socket_path.exists():
+                socket_path.unlink()
+
+    def shutdown(self):
+        """
+        Stops serve(), the running jobs are finished first and the queued jobs are kept for the next start
+        :return: None
+        """
+        if self.__http_server is not None:
+            self.__http_server.shutdown()
+
+    def get_status(self):
+        """
+        Gets the state of the server
+        :return: dict with the number of jobs per state, the number of workers and the uptime (in seconds)
+        """
+        return {
+            "jobs": self.job_queue.get_statistics(),
+            "workers": self.job_runner.workers,
+            "uptime": time.time() - self.start_time,
+        }
+
+    def get_job(self, job_id: int):
+        """
+        Gets a job including its progress
+        :param job_id: ID of the job
+        :return: The job (see lib.server.JobQueue.JobQueue.get) with progress or None if the job does not exist
+        """
+        job = self.job_queue.get(job_id)
+        if job is not None:
+            job["progress"] = JobServer.format_progress(self.job_runner.get_progress(job_id))
+
+        return job
+
+    def submit_job(self, request: dict):
+        """
+        Validates and queues a job
+        :param request: The decoded body of the request (input_file, output_file and optionally options)
+        :return: The queued job
+        :raises ValueError: If the request is invalid
+        """
+        if not isinstance(request, dict):
+            raise ValueError("The body has to be a JSON object")
+
+        for key in ["input_file", "output_file"]:
+            if not isinstance(request.get(key, None), str) or request[key] == "":
+                raise ValueError(f"{key} is required")
+
+        options = request.get("options", {})
+        if not isinstance(options, dict):
+            raise ValueError("options has to be a JSON object")
+
+        JobRunner.check_options(options)
+
+        input_file = Path(request["input_file"]).absolute()
+        if not input_file.is_file():
+            raise ValueError(f"Input file {input_file} does not exist")
+
+        output_file = Path(request["output_file"])
+        if self.output_dir is not None:
+            output_file = Path(os.path.abspath(self.output_dir / output_file))
+            if self.output_dir not in output_file.parents:
+                raise ValueError(f"The output file has to be in {self.output_dir}")
+        else:
+            output_file = output_file.absolute()
+
+        job = self.job_queue.submit(input_file, output_file, options)
+        self.job_runner.notify()
+        job["progress"] = None
+
+        return job
+
+    def cancel_job(self, job_id: int):
+        """
+        Cancels a job that was not started yet
+        :param job_id: ID of the job
+        :return: Whether the job was cancelled
+        """
+        cancelled = self.job_queue.cancel(job_id)
+        self.job_runner.notify()
+
+        return cancelled
+
+    @staticmethod
+    def format_progress(progress):
+        """
+        Converts the progress of a job to a JSON serializable dict
+        :param progress: The progress, see lib.server.JobRunner.JobRunner.get_progress
+        :return: dict with stage, current and total or None
+        """
+        if progress is None:
+            return None
+
+        return {"stage": progress.stage, "current": progress.current, "total": progress.total}
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles the requests of a JobServer, see JobServer for the endpoints
+    """
+    server_version = "unsilence"
+
+    def do_GET(self):
+        if not self.check_request():
+            return
+
+        url = urlparse(self.path)
+        job_server = self.server.job_server
+
+        if url.path == "/status":
+            self.send_json(200, job_server.get_status())
+            return
+
+        if url.path == "/jobs":
+            query = parse_qs(url.query)
+            state = query.get("state", [None])[0]
+            limit = query.get("limit", ["100"])[0]
+
+            if state is not None and state not in JOB_STATES:
+                self.send_json(400, {"error": f"state has to be one of {', '.join(JOB_STATES)}"})
+            elif not limit.isdigit():
+                self.send_json(400, {"error": "limit has to be a number"})
+            else:
+                self.send_json(200, {"jobs": job_server.job_queue.list(state, int(limit))})
+            return
+
+        match = re.fullmatch(r"/jobs/(\d+)(/events)?", url.path)
+        if match is None:
+            self.send_json(404, {"error": "Not found"})
+            return
+
+        job_id = int(match.group(1))
+        job = job_server.get_job(job_id)
+
+        if job is None:
+            self.send_json(404, {"error": f"Job {job_id} does not exist"})
+        elif match.group(2) is None:
+            self.send_json(200, job)
+        else:
+            self.send_events(job_id)
+
+    def do_POST(self):
+        if not self.check_request():
+            return
+
+        if urlparse(self.path).path != "/jobs":
+            self.send_json(404, {"error": "Not found"})
+            return
+
+        if self.headers.get_content_type() != "application/json":
+            self.send_json(415, {"error": "The body has to be sent as application/json"})
+            return
+
+        try:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            job = self.server.job_server.submit_job(json.loads(body))
+        except ValueError as error:
+            self.send_json(400, {"error": str(error)})
+            return
+
+        self.send_json(201, job)
+
+    def do_DELETE(self):
+        if not self.check_request():
+            return
+
+        match = re.fullmatch(r"/jobs/(\d+)", urlparse(self.path).path)
+        if match is None:
+            self.send_json(404, {"error": "Not found"})
+            return
+
+        job_server = self.server.job_server
+        job_id = int(match.group(1))
+
+        if job_server.job_queue.get(job_id) is None:
+            self.send_json(404, {"error": f"Job {job_id} does not exist"})
+        elif not job_server.cancel_job(job_id):
+            self.send_json(409, {"error": f"Job {job_id} was already started"})
+        else:
+            self.send_json(200, job_server.get_job(job_id))
+
+    def check_request(self):
+        """
+        Rejects requests that were sent by a web page instead of a local client, see JobServer
+        :return: Whether the request may be handled (an error was sent otherwise)
+        """
+        allowed_hosts = self.server.job_server.allowed_hosts
+
+        # Browsers can not connect to a Unix domain socket, so only requests over TCP have to name the listen address
+        host = self.headers.get("Host", "")
+        if allowed_hosts is not None and host.lower() not in allowed_hosts:
+            self.send_json(403, {"error": f"Host {host} is not allowed"})
+            return False
+
+        origin = self.headers.get("Origin", None)
+        if origin is not None and (allowed_hosts is None or urlparse(origin).netloc.lower() not in allowed_hosts):
+            self.send_json(403, {"error": f"Requests from {origin} are not allowed"})
+            return False
+
+        return True
+
+    def send_json(self, status: int, data):
+        """
+        Sends a JSON response
+        :param status: HTTP status code
+        :param data: JSON serializable response
+        :return: None
+        """
+        body = json.dumps(data).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_events(self, job_id: int):
+        """
+        Streams the progress of a job as server-sent events until the job is done or the client disconnects
+        :param job_id: ID of the job
+        :return: None
+        """
+        job_server = self.server.job_server
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        progress = job_server.job_runner.get_progress(job_id)
+        job = job_server.job_queue.get(job_id)
+        last_state, last_progress = None, None
+        last_write = time.time()
+
+        try:
+            while True:
+                if JobRunner.is_final(job):
+                    job["progress"] = None
+                    self.send_event("done", job)
+                    return
+
+                if job["state"] != last_state or progress is not last_progress:
+                    self.send_event("progress", {
+                        "id": job_id,
+                        "state": job["state"],
+                        "progress": JobServer.format_progress(progress)
+                    })
+                    last_state, last_progress = job["state"], progress
+                    last_write = time.time()
+                elif time.time() - last_write >= EVENT_STREAM_KEEP_ALIVE:
+                    self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+                    last_write = time.time()
+
+                if job_server.job_runner.stopped:
+                    return
+
+                job, progress = job_server.job_runner.wait_for_update(job_id, last_progress, EVENT_STREAM_KEEP_ALIVE)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def send_event(self, event: str, data):
+        """
+        Sends a single server-sent event
+        :param event: Name of the event
+        :param data: JSON serializable data of the event
+        :return: None
+        """
+        self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def address_string(self):
+        # Clients of a Unix domain socket have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.job_server.verbose:
+            super().log_message(format, *args)
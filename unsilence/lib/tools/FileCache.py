@@ -0,0 +1,209 @@
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+
+
+class FileCache:
+    """
+    Directory of cached files with an optional size cap, the least recently used files are evicted first
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int = None):
+        """
+        Initializes a new FileCache
+        :param cache_dir: Directory where the cached files should be stored
+        :param max_size: Maximum size of all cached files together (in bytes), None means unlimited
+        """
+        self.__cache_dir = Path(cache_dir)
+        self.__max_size = max_size
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str):
+        """
+        Looks up a cached file and marks it as recently used
+        :param name: Name of the cached file
+        :return: Path of the cached file or None if it is not cached
+        """
+        path = self.__cache_dir / name
+
+        try:
+            os.utime(path)
+        except OSError:
+            with self.__lock:
+                self.misses += 1
+            return None
+
+        with self.__lock:
+            self.hits += 1
+
+        return path
+
+    def create_temp_path(self, suffix: str = ""):
+        """
+        Creates a path inside the cache directory where a file can be prepared before it is added with put(), so
+        adding it is atomic. Temporary files are never evicted
+        :param suffix: Suffix of the temporary file
+        :return: Path of the temporary file (not created yet)
+        """
+        os.makedirs(self.__cache_dir, exist_ok=True)
+        return self.__cache_dir / f".tmp-{uuid.uuid4()}{suffix}"
+
+    def put(self, name: str, source_file: Path):
+        """
+        Moves a file into the cache (replacing a cached file with the same name) and evicts old files if necessary
+        :param name: Name of the cached file
+        :param source_file: The file that should be moved into the cache
+        :return: Path of the cached file
+        """
+        os.makedirs(self.__cache_dir, exist_ok=True)
+        path = self.__cache_dir / name
+        source_file = Path(source_file)
+
+        if source_file.parent.absolute() != self.__cache_dir.absolute():
+            temp_path = self.create_temp_path(path.suffix)
+            shutil.move(str(source_file), str(temp_path))
+            source_file = temp_path
+
+        os.replace(source_file, path)
+        self.evict()
+
+        return path
+
+    def put_bytes(self, name: str, data: bytes):
+        """
+        Writes data into the cache (replacing a cached file with the same name) and evicts old files if necessary
+        :param name: Name of the cached file
+        :param data: Content of the cached file
+        :return: Path of the cached file
+        """
+        temp_path = self.create_temp_path()
+
+        with open(temp_path, "wb") as file:
+            file.write(data)
+
+        return self.put(name, temp_path)
+
+    def copy_to(self, name: str, destination: Path):
+        """
+        Copies a cached file to another location (as a hard link if possible) and marks it as recently used
+        :param name: Name of the cached file
+        :param destination: Where the copy should be created
+        :return: Whether the file was cached
+        """
+        path = self.get(name)
+        if path is None:
+            return False
+
+        try:
+            FileCache.__link_or_copy(path, destination)
+        except FileNotFoundError:
+            # The file was evicted in the meantime
+            return False
+
+        return True
+
+    def put_copy(self, name: str, source_file: Path):
+        """
+        Adds a copy of a file to the cache (as a hard link if possible), the file itself is left untouched
+        :param name: Name of the cached file
+        :param source_file: The file that should be copied into the cache
+        :return: Path of the cached file
+        """
+        temp_path = self.create_temp_path(Path(name).suffix)
+        FileCache.__link_or_copy(source_file, temp_path)
+
+        return self.put(name, temp_path)
+
+    def get_size(self):
+        """
+        Gets the size of all cached files together
+        :return: Size in bytes
+        """
+        return sum(size for _, size, _ in self.__list_entries())
+
+    def get_statistics(self):
+        """
+        Gets the hit/miss statistics and the size of the cache
+        :return: Statistics dict (hits, misses, size, max_size)
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": self.get_size(), "max_size": self.__max_size}
+
+    def evict(self):
+        """
+        Removes the least recently used files until the cache is not larger than its maximum size anymore
+        :return: None
+        """
+        if self.__max_size is None:
+            return
+
+        with self.__lock:
+            entries = sorted(self.__list_entries())
+            total_size = sum(size for _, size, _ in entries)
+
+            for _, size, path in entries:
+                if total_size <= self.__max_size:
+                    break
+
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+                total_size -= size
+
+    def clear(self):
+        """
+        Removes all cached files
+        :return: None
+        """
+        with self.__lock:
+            for _, _, path in self.__list_entries():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def __link_or_copy(source_file: Path, destination: Path):
+        """
+        Creates a hard link of a file, or copies it if linking is not possible (e.g. across file systems)
+        :param source_file: The file that should be linked
+        :param destination: Where the link/copy should be created (it is replaced if it exists)
+        :return: None
+        """
+        if os.path.lexists(destination):
+            os.remove(destination)
+
+        try:
+            os.link(source_file, destination)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            shutil.copyfile(source_file, destination)
+
+    def __list_entries(self):
+        """
+        Lists all cached files (without temporary files)
+        :return: List of (last use time, size, path) tuples
+        """
+        entries = []
+
+        if not self.__cache_dir.exists():
+            return entries
+
+        for entry in os.scandir(self.__cache_dir):
+            if entry.name.startswith(".tmp-") or not entry.is_file():
+                continue
+
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+
+        return entries
@@ -0,0 +1,39 @@
+import os
+import sys
+from pathlib import Path
+
+
+def get_cache_dir():
+    """
+    Gets the directory where unsilence can persist cached data between runs, it can be overridden with the
+    UNSILENCE_CACHE_DIR environment variable
+    :return: Path of the cache directory (not created yet)
+    """
+    if "UNSILENCE_CACHE_DIR" in os.environ:
+        return Path(os.environ["UNSILENCE_CACHE_DIR"])
+
+    if os.name == "nt":
+        base_dir = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    elif sys.platform == "darwin":
+        base_dir = Path.home() / "Library" / "Caches"
+    else:
+        base_dir = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+
+    return base_dir / "unsilence"
+
+
+def resolve_cache_dir(cache_dir):
+    """
+    Resolves the cache_dir argument of the classes that persist data between runs, the default directory is looked up
+    when they are created (not when unsilence is imported), so changes of the environment variables are respected
+    :param cache_dir: Path of the cache directory, None for the default directory (see get_cache_dir()) or False to
+        disable caching
+    :return: Path of the cache directory or None if caching is disabled
+    """
+    if cache_dir is False:
+        return None
+
+    if cache_dir is None:
+        return get_cache_dir()
+
+    return Path(cache_dir)
@@ -0,0 +1,49 @@
+import functools
+import math
+import os
+
+
+@functools.lru_cache(maxsize=None)
+def get_available_cpu_count():
+    """
+    Gets the number of CPUs this process can actually use: the CPUs it is allowed to run on, limited by the CPU quota
+    of its cgroup (e.g. the CPU limit of a container), queried only once per process
+    :return: Number of CPUs (at least 1)
+    """
+    cpu_count = os.cpu_count() or 1
+
+    if hasattr(os, "sched_getaffinity"):
+        cpu_count = min(cpu_count, len(os.sched_getaffinity(0)))
+
+    cpu_quota = get_cgroup_cpu_quota()
+    if cpu_quota is not None:
+        cpu_count = min(cpu_count, max(1, math.ceil(cpu_quota)))
+
+    return max(1, cpu_count)
+
+
+def get_cgroup_cpu_quota():
+    """
+    Reads the CPU quota of the cgroup of this process (cgroup v2 cpu.max or cgroup v1 cpu.cfs_quota_us)
+    :return: Number of CPUs the quota allows (float) or None if there is no quota
+    """
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as file:
+            quota, period = file.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as file:
+            quota = int(file.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as file:
+            period = int(file.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+
+    return None
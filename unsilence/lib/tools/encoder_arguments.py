@@ -0,0 +1,85 @@
+import pathlib
+
+from unsilence.lib.tools.ffmpeg_encoders import is_encoder_available
+
+# Encoders that produce streams which can be joined with stream-copied packets of the same codec
+VIDEO_ENCODERS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+    "mpeg4": "mpeg4",
+    "vp8": "libvpx",
+    "vp9": "libvpx-vp9",
+    "av1": "libaom-av1",
+}
+
+AUDIO_ENCODERS = {
+    "aac": "aac",
+    "mp3": "libmp3lame",
+    "opus": "libopus",
+    "vorbis": "libvorbis",
+    "ac3": "ac3",
+    "flac": "flac",
+    "pcm_s16le": "pcm_s16le",
+}
+
+
+def get_encoder(codec_name: str):
+    """
+    Gets the encoder ffmpeg should use for a codec. Selecting a codec by name can pick an experimental native encoder
+    (e.g. for vorbis or opus), so the encoders of the tables are preferred if they are available
+    :param codec_name: Name of the codec (e.g. "vorbis")
+    :return: Name of the encoder (the codec name if no better encoder is known)
+    """
+    encoder = VIDEO_ENCODERS.get(codec_name, AUDIO_ENCODERS.get(codec_name, None))
+    if encoder is not None and is_encoder_available(encoder):
+        return encoder
+
+    return codec_name
+
+
+def get_matching_encoder_arguments(streams: dict, output_file: pathlib.Path):
+    """
+    Gets the ffmpeg output arguments that re-encode media with the same codec parameters as the input, so the
+    re-encoded parts can be concatenated with stream-copied parts of the input
+    :param streams: Streams of the input, see lib.media_index.MediaIndex.MediaIndex.streams
+    :param output_file: A file the arguments are used for (the container decides about the time scale option)
+    :return: List of ffmpeg arguments or None if there is no matching encoder for a stream of the input
+    """
+    video_stream = streams.get("video", None)
+    audio_stream = streams.get("audio", None)
+
+    if video_stream is None:
+        return None
+
+    arguments = []
+
+    video_encoder = VIDEO_ENCODERS.get(video_stream.get("codec_name", None), None)
+    if video_encoder is None or not is_encoder_available(video_encoder):
+        return None
+
+    arguments.extend(["-c:v", video_encoder])
+
+    if video_stream.get("pix_fmt", None) is not None:
+        arguments.extend(["-pix_fmt", video_stream["pix_fmt"]])
+
+    if video_stream.get("r_frame_rate", "0/0") not in ["0/0", None]:
+        arguments.extend(["-r", video_stream["r_frame_rate"]])
+
+    time_base = video_stream.get("time_base", "")
+    if pathlib.Path(output_file).suffix.lower() in [".mp4", ".mov", ".m4v"] and time_base.startswith("1/"):
+        arguments.extend(["-video_track_timescale", time_base[2:]])
+
+    if audio_stream is not None:
+        audio_encoder = AUDIO_ENCODERS.get(audio_stream.get("codec_name", None), None)
+        if audio_encoder is None or not is_encoder_available(audio_encoder):
+            return None
+
+        arguments.extend(["-c:a", audio_encoder])
+
+        if audio_stream.get("sample_rate", None) is not None:
+            arguments.extend(["-ar", audio_stream["sample_rate"]])
+
+        if audio_stream.get("channels", None) is not None:
+            arguments.extend(["-ac", str(audio_stream["channels"])])
+
+    return arguments
@@ -0,0 +1,18 @@
+from unsilence.lib.tools.toolchain import get_toolchain_capabilities
+
+
+def get_available_encoders():
+    """
+    Lists the names of all encoders the ffmpeg binary was built with (see lib.tools.toolchain)
+    :return: frozenset of encoder names
+    """
+    return get_toolchain_capabilities().encoders
+
+
+def is_encoder_available(encoder_name: str):
+    """
+    Checks whether the ffmpeg binary supports a specific encoder
+    :param encoder_name: Name of the encoder (e.g. "libx264")
+    :return: Whether the encoder is available
+    """
+    return encoder_name in get_available_encoders()
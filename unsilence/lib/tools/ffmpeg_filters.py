@@ -0,0 +1,18 @@
+from unsilence.lib.tools.toolchain import get_toolchain_capabilities
+
+
+def get_available_filters():
+    """
+    Lists the names of all filters the ffmpeg binary was built with (see lib.tools.toolchain)
+    :return: frozenset of filter names
+    """
+    return get_toolchain_capabilities().filters
+
+
+def is_filter_available(filter_name: str):
+    """
+    Checks whether the ffmpeg binary supports a specific filter
+    :param filter_name: Name of the filter (e.g. "asegment")
+    :return: Whether the filter is available
+    """
+    return filter_name in get_available_filters()
@@ -0,0 +1,47 @@
+import functools
+import re
+import subprocess
+
+from unsilence.lib.tools.toolchain import get_ffmpeg_binary, get_toolchain_capabilities
+
+
+def get_available_muxers():
+    """
+    Lists the names of all muxers the ffmpeg binary was built with (see lib.tools.toolchain)
+    :return: frozenset of muxer names
+    """
+    return get_toolchain_capabilities().muxers
+
+
+def is_muxer_available(muxer_name: str):
+    """
+    Checks whether the ffmpeg binary supports a specific muxer
+    :param muxer_name: Name of the muxer (e.g. "nut")
+    :return: Whether the muxer is available
+    """
+    return muxer_name in get_available_muxers()
+
+
+@functools.lru_cache(maxsize=None)
+def get_default_codecs(muxer_name: str):
+    """
+    Gets the codecs ffmpeg uses for a muxer if no codec is specified
+    :param muxer_name: Name of the muxer (e.g. "mp4")
+    :return: Tuple of the default video and audio codec names (None if the muxer has no default for a stream type)
+    """
+    try:
+        console_output = subprocess.run(
+            [get_ffmpeg_binary(), "-hide_banner", "-h", f"muxer={muxer_name}"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True
+        ).stdout
+    except FileNotFoundError:
+        return None, None
+
+    default_codecs = []
+    for codec_type in ["video", "audio"]:
+        capture = re.search(rf"Default {codec_type} codec: (\w+)", console_output)
+        default_codecs.append(capture[1] if capture is not None and capture[1] != "none" else None)
+
+    return tuple(default_codecs)
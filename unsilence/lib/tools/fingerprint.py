@@ -0,0 +1,29 @@
+import hashlib
+from pathlib import Path
+
+
+def file_fingerprint(file: Path, block_size=65536, block_count=8):
+    """
+    Generates a fast fingerprint of a file from its size, modification time and a hash of evenly spaced blocks of its
+    content, so large media files do not have to be read completely
+    :param file: The file that should be fingerprinted
+    :param block_size: Size of a sampled block (in bytes)
+    :param block_count: Number of sampled blocks
+    :return: Fingerprint as a hex string
+    """
+    file = Path(file)
+    stat = file.stat()
+
+    file_hash = hashlib.blake2b(digest_size=16)
+    file_hash.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+    with open(file, "rb") as f:
+        if stat.st_size <= block_size * block_count:
+            file_hash.update(f.read())
+        else:
+            step = (stat.st_size - block_size) // max(block_count - 1, 1)
+            for i in range(block_count):
+                f.seek(i * step)
+                file_hash.update(f.read(block_size))
+
+    return file_hash.hexdigest()
@@ -0,0 +1,43 @@
+import re
+import subprocess
+
+from unsilence.lib.tools.toolchain import get_ffmpeg_binary
+
+
+def parse_media_duration(line: str):
+    """
+    Parses the media duration from the "Duration: 00:00:00.00" line that ffmpeg prints for every input
+    :param line: Line of the ffmpeg console output
+    :return: Media duration in seconds or None if the line does not contain a duration
+    """
+    capture = re.search("Duration: ([0-9:]+.?[0-9]*)", line)
+    if capture is None:
+        return None
+    hour, minute, second_millisecond = capture[1].split(":")
+    second, millisecond = second_millisecond.split(".")
+    return float(str(int(second) + 60 * (int(minute) + 60 * int(hour))) + "." + millisecond)
+
+
+def get_media_duration(input_file):
+    """
+    Gets the duration of a media file from the ffmpeg input information (without decoding the file)
+    :param input_file: The media file
+    :return: Media duration in seconds or None if it could not be determined
+    """
+    ffmpeg_binary = get_ffmpeg_binary()
+
+    # ffmpeg exits with an error because no output is given, but the input information is printed anyway
+    console_output = subprocess.run(
+        [ffmpeg_binary, "-hide_banner", "-i", str(input_file)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True
+    ).stdout
+
+    for line in console_output.splitlines():
+        if "Duration" in line:
+            media_duration = parse_media_duration(line)
+            if media_duration is not None:
+                return media_duration
+
+    return None
@@ -0,0 +1,228 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from types import SimpleNamespace
+
+from unsilence.lib.tools.cache_dir import get_cache_dir
+
+# Environment variables that point to the binaries that should be used
+FFMPEG_ENVIRONMENT_VARIABLE = "UNSILENCE_FFMPEG"
+FFPROBE_ENVIRONMENT_VARIABLE = "UNSILENCE_FFPROBE"
+
+# Increased whenever the stored capabilities change, so outdated capability files are ignored
+CAPABILITY_CACHE_VERSION = 1
+
+
+def find_binary(name: str, environment_variable: str):
+    """
+    Resolves a binary: the path in the environment variable, a bundled copy (next to the frozen application or in the
+    working directory) or the binary on the PATH, in this order
+    :param name: Name of the binary (e.g. "ffmpeg")
+    :param environment_variable: Environment variable that can point to the binary
+    :return: Path of the binary (the bundled location if it is not found anywhere, running it raises
+        FileNotFoundError)
+    """
+    if os.environ.get(environment_variable, ""):
+        return os.environ[environment_variable]
+
+    bundled_path = getattr(sys, '_MEIPASS', os.getcwd())
+    binary = shutil.which(name, path=bundled_path) or shutil.which(name)
+    if binary is not None:
+        return binary
+
+    return os.path.join(bundled_path, name)
+
+
+@functools.lru_cache(maxsize=None)
+def get_ffmpeg_binary():
+    """
+    Gets the ffmpeg binary that should be used (resolved only once per process), see find_binary()
+    :return: Path of the ffmpeg binary
+    """
+    return find_binary("ffmpeg", FFMPEG_ENVIRONMENT_VARIABLE)
+
+
+@functools.lru_cache(maxsize=None)
+def get_ffprobe_binary():
+    """
+    Gets the ffprobe binary that should be used (resolved only once per process), see find_binary()
+    :return: Path of the ffprobe binary
+    """
+    return find_binary("ffprobe", FFPROBE_ENVIRONMENT_VARIABLE)
+
+
+@functools.lru_cache(maxsize=None)
+def get_toolchain_capabilities():
+    """
+    Gets what the ffmpeg binary supports. The binary is only probed once, the result is persisted in the cache
+    directory, keyed by the path, size and modification time of the binary, so later processes do not have to start
+    ffmpeg at all
+    :return: SimpleNamespace with detected (whether the binary could be run), version (ffmpeg version string),
+        libavutil_version (tuple of ints), filters, encoders and muxers (frozensets of names)
+    """
+    binary = get_ffmpeg_binary()
+
+    try:
+        stat = os.stat(binary)
+    except OSError:
+        return probe_toolchain_capabilities(binary)
+
+    key = f"{CAPABILITY_CACHE_VERSION}:{os.path.realpath(binary)}:{stat.st_size}:{stat.st_mtime_ns}"
+    cache_file = get_cache_dir() / "toolchain" / f"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}.json"
+
+    try:
+        with open(cache_file, "r", encoding="utf-8") as file:
+            return deserialize_capabilities(json.load(file))
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    capabilities = probe_toolchain_capabilities(binary)
+
+    if capabilities.detected:
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temporary_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(temporary_file, "w", encoding="utf-8") as file:
+                json.dump(serialize_capabilities(capabilities), file)
+            os.replace(temporary_file, cache_file)
+        except OSError:
+            pass
+
+    return capabilities
+
+
+def probe_toolchain_capabilities(binary: str):
+    """
+    Runs the ffmpeg binary to find out its version and which filters, encoders and muxers it was built with
+    :param binary: Path of the ffmpeg binary
+    :return: Capabilities, see get_toolchain_capabilities()
+    """
+    console_outputs = {}
+
+    for option in ["-version", "-filters", "-encoders", "-muxers"]:
+        try:
+            console_outputs[option] = subprocess.run(
+                [binary, "-hide_banner", option],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                universal_newlines=True
+            ).stdout
+        except OSError:
+            return SimpleNamespace(
+                detected=False,
+                version=None,
+                libavutil_version=None,
+                filters=frozenset(),
+                encoders=frozenset(),
+                muxers=frozenset()
+            )
+
+    version, libavutil_version = parse_version_output(console_outputs["-version"])
+
+    return SimpleNamespace(
+        detected=True,
+        version=version,
+        libavutil_version=libavutil_version,
+        filters=parse_filter_list(console_outputs["-filters"]),
+        encoders=parse_encoder_list(console_outputs["-encoders"]),
+        muxers=parse_muxer_list(console_outputs["-muxers"])
+    )
+
+
+def serialize_capabilities(capabilities: SimpleNamespace):
+    """
+    Converts capabilities to a JSON serializable dict
+    :param capabilities: Capabilities, see get_toolchain_capabilities()
+    :return: dict
+    """
+    return {
+        "detected": capabilities.detected,
+        "version": capabilities.version,
+        "libavutil_version": capabilities.libavutil_version,
+        "filters": sorted(capabilities.filters),
+        "encoders": sorted(capabilities.encoders),
+        "muxers": sorted(capabilities.muxers)
+    }
+
+
+def deserialize_capabilities(serialized_capabilities: dict):
+    """
+    Converts a dict created by serialize_capabilities() back to capabilities
+    :param serialized_capabilities: dict
+    :return: Capabilities, see get_toolchain_capabilities()
+    """
+    libavutil_version = serialized_capabilities["libavutil_version"]
+
+    return SimpleNamespace(
+        detected=serialized_capabilities["detected"],
+        version=serialized_capabilities["version"],
+        libavutil_version=tuple(libavutil_version) if libavutil_version is not None else None,
+        filters=frozenset(serialized_capabilities["filters"]),
+        encoders=frozenset(serialized_capabilities["encoders"]),
+        muxers=frozenset(serialized_capabilities["muxers"])
+    )
+
+
+def parse_version_output(console_output: str):
+    """
+    Parses the output of "ffmpeg -version"
+    :param console_output: The console output
+    :return: Tuple of the ffmpeg version string and the libavutil version (tuple of ints), None if they are missing
+    """
+    version = re.search(r"ffmpeg version (\S+)", console_output)
+    libavutil_version = re.search(r"libavutil\s*(\d+)\.\s*(\d+)\.\s*(\d+)", console_output)
+
+    return (
+        version[1] if version is not None else None,
+        tuple(int(part) for part in libavutil_version.groups()) if libavutil_version is not None else None
+    )
+
+
+def parse_filter_list(console_output: str):
+    """
+    Parses the output of "ffmpeg -filters"
+    :param console_output: The console output
+    :return: frozenset of filter names
+    """
+    filters = set()
+    for line in console_output.splitlines():
+        capture = re.match(r"\s*[TSC.]{2,3}\s+(\w+)\s+\S+->\S+", line)
+        if capture is not None:
+            filters.add(capture[1])
+
+    return frozenset(filters)
+
+
+def parse_encoder_list(console_output: str):
+    """
+    Parses the output of "ffmpeg -encoders"
+    :param console_output: The console output
+    :return: frozenset of encoder names
+    """
+    encoders = set()
+    for line in console_output.splitlines():
+        capture = re.match(r"\s*[VAS][F.][S.][X.][B.][D.]\s+(\S+)\s", line)
+        if capture is not None and capture[1] != "=":
+            encoders.add(capture[1])
+
+    return frozenset(encoders)
+
+
+def parse_muxer_list(console_output: str):
+    """
+    Parses the output of "ffmpeg -muxers"
+    :param console_output: The console output
+    :return: frozenset of muxer names
+    """
+    muxers = set()
+    for line in console_output.splitlines():
+        capture = re.match(r"\s*D?E[d.]?\s+(\S+)\s", line)
+        if capture is not None:
+            muxers.update(capture[1].split(","))
+
+    return frozenset(muxers)
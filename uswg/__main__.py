@@ -280,20 +280,18 @@ class UnsilenceGUI:
               temp_dir=Path(process_temp_dir)
           )
           
-          # Detect silence with parameters
-          unsilence.detect_silence(
-              silence_level=options['silence_level'],
-              silence_time_threshold=options['silence_time_threshold'],
-              short_interval_threshold=options['short_interval_threshold'],
-              stretch_time=options['stretch_time'],
-              minimum_interval_duration=options['minimum_interval_duration'],
-              threads=options['threads'],
-              on_silence_detect_progress_update=self.update_progress
-          )
-          
-          # Render media with parameters
-          unsilence.render_media(
+          # Detect silence and render the intervals as soon as they are detected
+          unsilence.detect_silence_and_render_media(
               output_path,
+              detect_options=dict(
+                  silence_level=options['silence_level'],
+                  silence_time_threshold=options['silence_time_threshold'],
+                  short_interval_threshold=options['short_interval_threshold'],
+                  stretch_time=options['stretch_time'],
+                  minimum_interval_duration=options['minimum_interval_duration'],
+                  threads=options['threads'],
+                  on_silence_detect_progress_update=self.update_progress
+              ),
               audible_speed=options['audible_speed'],
               silent_speed=options['silent_speed'],
               audible_volume=options['audible_volume'],
@@ -301,7 +299,6 @@ class UnsilenceGUI:
               audio_only=options['audio_only'],
               drop_corrupted_intervals=options['drop_corrupted_intervals'],
               check_intervals=options['check_intervals'],
-              on_render_progress_update=self.update_progress,
               on_concat_progress_update=self.update_progress
           )
           